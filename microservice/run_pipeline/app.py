@@ -3,6 +3,7 @@ Flask application for the run_pipeline microservice.
 """
 import logging
 import json
+import atexit
 from flask import Flask, request, jsonify
 from apscheduler.schedulers.background import BackgroundScheduler
 import db_utils
@@ -31,6 +32,56 @@ def health_check():
         'service': 'run_pipeline'
     })
 
+@app.route('/stats', methods=['GET'])
+def stats():
+    """
+    Cache statistics endpoint.
+    
+    Returns:
+    - JSON response with hit/miss counters for the in-process caches
+    """
+    return jsonify({
+        'success': True,
+        'caches': pipeline_executor.get_cache_stats()
+    })
+
+def execute_in_worker_pool(pipeline_id, pipeline_config):
+    """
+    Run a pipeline on the shared worker pool and wait for its result.
+    
+    Going through the pool keeps a pipeline from running twice at once,
+    whether it was started by a request or by the scheduler.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        pipeline_config (dict): Pipeline configuration
+        
+    Returns:
+    - JSON response with the result of the pipeline execution, 409 if the
+      pipeline is already running or 504 if it timed out
+    """
+    future = pipeline_executor.worker_pool.submit(pipeline_id, pipeline_executor.execute_pipeline, pipeline_config)
+    if future is None:
+        return jsonify({
+            'success': False,
+            'error': f'Pipeline is already running: {pipeline_id}'
+        }), 409
+    
+    completed, timed_out = pipeline_executor.worker_pool.wait_for(
+        {pipeline_id: future},
+        timeout=config.PIPELINE_TIMEOUT_SECONDS
+    )
+    if timed_out:
+        return jsonify({
+            'success': False,
+            'error': f'Timed out after {config.PIPELINE_TIMEOUT_SECONDS} seconds'
+        }), 504
+    
+    result = completed[pipeline_id]
+    if isinstance(result, Exception):
+        raise result
+    return jsonify(result)
+
 @app.route('/run', methods=['GET'])
 def run_pipeline():
     """
@@ -40,7 +91,8 @@ def run_pipeline():
     - pipeline_id: The ID of the pipeline to run
     
     Returns:
-    - JSON response with the result of the pipeline execution
+    - JSON response with the result of the pipeline execution, or 409 if the
+      pipeline is already running
     """
     pipeline_id = request.args.get('pipeline_id')
     
@@ -61,9 +113,7 @@ def run_pipeline():
             }), 404
         
         # Execute pipeline
-        result = pipeline_executor.execute_pipeline(pipeline_config)
-        
-        return jsonify(result)
+        return execute_in_worker_pool(pipeline_id, pipeline_config)
     except Exception as e:
         logging.error(f"Error running pipeline {pipeline_id}: {str(e)}")
         return jsonify({
@@ -80,7 +130,8 @@ def run_new_pipeline():
     - pipeline_id: The ID of the pipeline to run
     
     Returns:
-    - JSON response with the result of the pipeline execution
+    - JSON response with the result of the pipeline execution, or 409 if the
+      pipeline is already running
     """
     pipeline_id = request.args.get('pipeline_id')
     
@@ -101,9 +152,7 @@ def run_new_pipeline():
             }), 404
         
         # Execute pipeline
-        result = pipeline_executor.execute_pipeline(pipeline_config)
-        
-        return jsonify(result)
+        return execute_in_worker_pool(pipeline_id, pipeline_config)
     except Exception as e:
         logging.error(f"Error running new pipeline {pipeline_id}: {str(e)}")
         return jsonify({
@@ -140,16 +189,73 @@ def schedule_job():
         except Exception as e:
             logging.error(f"Error in scheduled job: {str(e)}")
 
+def resync_job():
+    """
+    Job to reload all active pipelines into the in-memory scheduler.
+    """
+    with app.app_context():
+        try:
+            logging.info("Resyncing in-memory pipeline scheduler")
+            pipeline_executor.sync_scheduled_pipelines()
+        except Exception as e:
+            logging.error(f"Error in resync job: {str(e)}")
+
 def init_scheduler():
     """
-    Initialize the scheduler to run the schedule_job function every minute.
+    Initialize pipeline scheduling.
+    
+    In 'heap' mode pipelines are dispatched by the in-memory scheduler at
+    their due times and the full pipeline list is reloaded every
+    SCHEDULER_RESYNC_MINUTES. In 'poll' mode the schedule_job function runs
+    every minute.
     """
     if scheduler.running:
         scheduler.shutdown()
     
-    scheduler.add_job(schedule_job, 'interval', minutes=1)
+    if config.SCHEDULER_MODE == 'heap':
+        pipeline_executor.sync_scheduled_pipelines()
+        pipeline_executor.pipeline_scheduler.start()
+        scheduler.add_job(resync_job, 'interval', minutes=config.SCHEDULER_RESYNC_MINUTES, max_instances=1, coalesce=True)
+    else:
+        scheduler.add_job(schedule_job, 'interval', minutes=1, max_instances=1, coalesce=True)
     scheduler.start()
-    logging.info("Scheduler started")
+    logging.info(f"Scheduler started in {config.SCHEDULER_MODE} mode")
+
+@app.route('/pipeline_updated', methods=['GET'])
+def pipeline_updated():
+    """
+    Notify the service that a pipeline's config was created or changed.
+    
+    Query Parameters:
+    - pipeline_id: The ID of the pipeline
+    
+    Returns:
+    - JSON response stating whether the pipeline is scheduled
+    """
+    pipeline_id = request.args.get('pipeline_id')
+    
+    if not pipeline_id:
+        return jsonify({
+            'success': False,
+            'error': 'Missing required parameter: pipeline_id'
+        }), 400
+    
+    try:
+        scheduled = pipeline_executor.refresh_scheduled_pipeline(pipeline_id)
+        response = jsonify({
+            'success': True,
+            'pipeline_id': pipeline_id,
+            'scheduled': scheduled
+        })
+        # Called from the dashboard in the browser after a config change
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+    except Exception as e:
+        logging.error(f"Error refreshing pipeline {pipeline_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 @app.before_first_request
 def before_first_request():
@@ -158,11 +264,12 @@ def before_first_request():
     """
     init_scheduler()
 
-@app.teardown_appcontext
-def teardown_appcontext(exception=None):
+@atexit.register
+def shutdown_scheduler():
     """
-    Shutdown the scheduler when the application context is torn down.
+    Shutdown the schedulers when the process exits.
     """
+    pipeline_executor.pipeline_scheduler.stop()
     if scheduler.running:
         scheduler.shutdown()
         logging.info("Scheduler shutdown")
@@ -0,0 +1,133 @@
+"""
+Recall benchmark for the BM25 prefilter ahead of the post selector.
+"""
+import sys
+import os
+import logging
+import argparse
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+# Import required modules
+from reddit_retrieval import retrieve_reddit_posts
+from reddit_pipeline.agents.post_selector import select_posts
+from reddit_pipeline.agents.prefilter import prefilter_posts
+from reddit_pipeline.agents.prompt_packer import estimate_tokens
+import db_utils
+import config
+
+"""
+1. Retrieve posts from Reddit for a pipeline
+2. Run the post selector on every post (the behaviour without a prefilter)
+3. For each top-N, prefilter the posts and measure:
+   - recall: share of the posts selected in step 2 that the prefilter keeps
+   - end-to-end recall (with --rerun): share of the posts selected in step 2
+     that the selector also selects from the prefiltered posts
+   - post tokens sent to the selector and selection time
+"""
+
+def selected_ids(post_groups):
+    """
+    Get the IDs of every selected post.
+
+    Args:
+        post_groups (list): Post groups returned by the post selector
+
+    Returns:
+        set: Selected post IDs without the t3_ prefix
+    """
+    return {
+        post_id.replace('t3_', '')
+        for group in post_groups
+        for post_id in group.get('related_post_ids', [])
+    }
+
+def benchmark_prefilter(pipeline_id, top_ns, rerun=False):
+    """
+    Benchmark the prefilter recall for a pipeline.
+
+    Args:
+        pipeline_id (str): The ID of the pipeline to use
+        top_ns (list): Values of top-N to measure
+        rerun (bool): Also run the selector on the prefiltered posts
+    """
+    pipeline_config = db_utils.get_pipeline_config(pipeline_id)
+
+    if not pipeline_config:
+        print(f"Error: Pipeline not found: {pipeline_id}")
+        return
+
+    focus = pipeline_config.get('focus', '')
+    posts = retrieve_reddit_posts(
+        subreddits=pipeline_config.get('subreddits', []),
+        schedule=pipeline_config.get('schedule', 'daily'),
+        comment_threshold=config.DEFAULT_COMMENT_THRESHOLD
+    )
+    print(f"Number of posts retrieved: {len(posts)}")
+
+    if not posts:
+        print("WARNING: No posts retrieved. Check subreddit names and Reddit API credentials.")
+        return
+
+    post_data = [
+        {
+            'post_id': post['post_id'],
+            'post_content': post['post_content'],
+            'score': post.get('score', 0),
+            'num_comments': post.get('num_comments', 0)
+        }
+        for post in posts
+    ]
+
+    # Baseline: every post goes to the selector
+    start_time = time.time()
+    baseline = selected_ids(select_posts(post_data, focus))
+    baseline_time = time.time() - start_time
+    baseline_tokens = sum(estimate_tokens(post['post_content']) for post in post_data)
+    print(f"\nBaseline: {len(baseline)} posts selected from {len(post_data)}, "
+          f"~{baseline_tokens} post tokens, {baseline_time:.1f}s")
+
+    if not baseline:
+        print("WARNING: The selector selected no posts, recall is undefined.")
+        return
+
+    print(f"\n{'top-n':>6} {'kept':>5} {'recall':>7} {'e2e':>7} {'tokens':>8} {'time':>7}")
+    for top_n in top_ns:
+        filtered = prefilter_posts(post_data, focus, top_n)
+        kept = {post['post_id'].replace('t3_', '') for post in filtered}
+        recall = len(baseline & kept) / len(baseline)
+        tokens = sum(estimate_tokens(post['post_content']) for post in filtered)
+
+        e2e = ''
+        elapsed = ''
+        if rerun:
+            start_time = time.time()
+            reselected = selected_ids(select_posts(filtered, focus))
+            elapsed = f"{time.time() - start_time:.1f}s"
+            e2e = f"{len(baseline & reselected) / len(baseline):.2f}"
+
+        print(f"{top_n:>6} {len(filtered):>5} {recall:>7.2f} {e2e:>7} {tokens:>8} {elapsed:>7}")
+
+def main():
+    """
+    Main function.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the prefilter recall for a pipeline ID.')
+    parser.add_argument('pipeline_id', type=str, help='The ID of the pipeline to use')
+    parser.add_argument('--top-n', type=int, nargs='+', default=[20, 40, 60, 80],
+                        help='Values of top-N to measure')
+    parser.add_argument('--rerun', action='store_true',
+                        help='Also run the selector on the prefiltered posts')
+
+    args = parser.parse_args()
+    benchmark_prefilter(args.pipeline_id, args.top_n, args.rerun)
+
+if __name__ == '__main__':
+    main()
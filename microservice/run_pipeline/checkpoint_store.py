@@ -0,0 +1,118 @@
+"""
+Stage checkpoints for resuming failed pipeline runs.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+class CheckpointStore:
+    """
+    Stores the output of each completed pipeline stage in SQLite.
+
+    Checkpoints are keyed by (pipeline_id, run_id, stage), where run_id is
+    the delivery number being produced. A run that fails part way is retried
+    with the same run_id and picks up the stored outputs instead of repeating
+    the completed stages. Checkpoints of a pipeline are cleared once a run
+    succeeds, and any older than the TTL are ignored and pruned.
+    """
+
+    def __init__(self, path, ttl_seconds=24 * 3600):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): SQLite database file
+            ttl_seconds (int): Seconds a checkpoint stays usable
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+                    pipeline_id TEXT NOT NULL,
+                    run_id INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (pipeline_id, run_id, stage)
+                )
+            """)
+
+    def save(self, pipeline_id, run_id, stage, value):
+        """
+        Record the output of a completed stage.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+            run_id (int): The delivery number of the run
+            stage (str): Name of the stage
+            value: JSON-serializable stage output
+
+        Returns:
+            bool: True if saved, False otherwise (the run continues without it)
+        """
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO pipeline_checkpoints (pipeline_id, run_id, stage, value, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (pipeline_id, run_id, stage, json.dumps(value), time.time())
+                )
+            return True
+        except Exception as e:
+            logging.error(f"Error saving checkpoint {stage} for pipeline {pipeline_id}: {str(e)}")
+            return False
+
+    def load(self, pipeline_id, run_id):
+        """
+        Get the outputs of the completed stages of a run.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+            run_id (int): The delivery number of the run
+
+        Returns:
+            dict: Stage outputs keyed by stage name (empty for a fresh run)
+        """
+        try:
+            with self._lock, self._connection:
+                # Checkpoints of earlier runs or past their TTL are stale
+                self._connection.execute(
+                    "DELETE FROM pipeline_checkpoints WHERE created_at <= ? OR (pipeline_id = ? AND run_id != ?)",
+                    (time.time() - self.ttl_seconds, pipeline_id, run_id)
+                )
+                rows = self._connection.execute(
+                    "SELECT stage, value FROM pipeline_checkpoints WHERE pipeline_id = ? AND run_id = ?",
+                    (pipeline_id, run_id)
+                ).fetchall()
+            return {stage: json.loads(value) for stage, value in rows}
+        except Exception as e:
+            logging.error(f"Error loading checkpoints for pipeline {pipeline_id}: {str(e)}")
+            return {}
+
+    def clear(self, pipeline_id, keep=()):
+        """
+        Remove the checkpoints of a pipeline.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+            keep (tuple): Stages whose checkpoints are kept
+        """
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    f"DELETE FROM pipeline_checkpoints WHERE pipeline_id = ? AND stage NOT IN ({', '.join('?' * len(keep))})",
+                    (pipeline_id, *keep)
+                )
+        except Exception as e:
+            logging.error(f"Error clearing checkpoints for pipeline {pipeline_id}: {str(e)}")
@@ -15,14 +15,87 @@ SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
 REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'OxiNews Pipeline Service')
+REDDIT_TOKEN_CACHE_PATH = os.getenv('REDDIT_TOKEN_CACHE_PATH')  # Optional file to persist the OAuth token in
+REDDIT_TOKEN_REFRESH_MARGIN = int(os.getenv('REDDIT_TOKEN_REFRESH_MARGIN', 300))  # Refresh token this many seconds before expiry
 
-# Comments API configuration
+# Reddit HTTP connection pool configuration
+REDDIT_POOL_CONNECTIONS = int(os.getenv('REDDIT_POOL_CONNECTIONS', 10))  # Number of per-host pools
+REDDIT_POOL_MAXSIZE = int(os.getenv('REDDIT_POOL_MAXSIZE', 20))  # Keep-alive connections per host
+REDDIT_REQUEST_TIMEOUT_SECONDS = float(os.getenv('REDDIT_REQUEST_TIMEOUT_SECONDS', 30))  # Per-request timeout of the Reddit API client
+
+# Reddit API rate limiting (adapts to X-Ratelimit-* headers once responses arrive)
+REDDIT_RATE_LIMIT_REQUESTS = int(os.getenv('REDDIT_RATE_LIMIT_REQUESTS', 60))  # Requests per window
+REDDIT_RATE_LIMIT_WINDOW_SECONDS = float(os.getenv('REDDIT_RATE_LIMIT_WINDOW_SECONDS', 60))
+REDDIT_RATE_LIMIT_BURST = int(os.getenv('REDDIT_RATE_LIMIT_BURST', 10))  # Requests sent back to back
+
+# Concurrent Reddit retrieval
+REDDIT_FETCH_MAX_WORKERS = int(os.getenv('REDDIT_FETCH_MAX_WORKERS', 8))  # Concurrent subreddit fetches (1 = sequential)
+
+# Subreddit listing cache configuration
+LISTING_CACHE_MAX_BYTES = int(os.getenv('LISTING_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+LISTING_CACHE_TTLS = {  # Seconds a listing stays cached, per time filter
+    'hour': 60,
+    'day': 10 * 60,
+    'week': 30 * 60,
+    'month': 3 * 60 * 60,
+    'year': 6 * 60 * 60,
+    'all': 12 * 60 * 60,
+}
+
+# Comments configuration
+COMMENTS_SOURCE = os.getenv('COMMENTS_SOURCE', 'reddit')  # 'reddit' (native API) or 'proxy' (COMMENTS_API_URL)
+COMMENTS_LIMIT = int(os.getenv('COMMENTS_LIMIT', 100))  # Max comments requested per post
+COMMENTS_SORT = os.getenv('COMMENTS_SORT', 'top')
+COMMENT_MIN_SCORE = int(os.getenv('COMMENT_MIN_SCORE', 1))  # Drop comments scoring below this
+COMMENT_TOP_K_CHILDREN = int(os.getenv('COMMENT_TOP_K_CHILDREN', 5))  # Replies kept per comment
+COMMENT_CHAR_BUDGET = int(os.getenv('COMMENT_CHAR_BUDGET', 8000))  # Max characters of comments per post
+POST_BODY_CHAR_LIMIT = int(os.getenv('POST_BODY_CHAR_LIMIT', 2000))  # Max characters of the post body
 COMMENTS_API_URL = 'https://flask-production-6529.up.railway.app/reddit'
 DEFAULT_MAX_COMMENT_DEPTH = 5
+COMMENTS_API_TIMEOUT_SECONDS = int(os.getenv('COMMENTS_API_TIMEOUT_SECONDS', 30))  # Per-request timeout
+COMMENTS_MAX_WORKERS = int(os.getenv('COMMENTS_MAX_WORKERS', 8))  # Concurrent comment requests (1 = sequential)
+COMMENT_CACHE_TTL_SECONDS = int(os.getenv('COMMENT_CACHE_TTL_SECONDS', 10 * 60))  # How long fetched comments are reused
+COMMENT_CACHE_MAX_BYTES = int(os.getenv('COMMENT_CACHE_MAX_BYTES', 128 * 1024 * 1024))
 
 # Pipeline configuration
 DEFAULT_COMMENT_THRESHOLD = 5
+COLLAPSE_NEAR_DUPLICATES = os.getenv('COLLAPSE_NEAR_DUPLICATES', 'True').lower() == 'true'  # Merge cross-posts and near-identical posts
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', 3))  # Max SimHash bits two near-duplicate posts differ in
+NEAR_DUPLICATE_MIN_WORDS = int(os.getenv('NEAR_DUPLICATE_MIN_WORDS', 8))  # Shorter posts are only collapsed on an exact title match
+PREFILTER_TOP_N = int(os.getenv('PREFILTER_TOP_N', 60))  # Posts kept by the BM25 prefilter before selection (0 disables it)
+SPECULATIVE_PREFETCH = os.getenv('SPECULATIVE_PREFETCH', 'False').lower() == 'true'  # Fetch comments of likely picks while the selector runs
+PREFETCH_TOP_K = int(os.getenv('PREFETCH_TOP_K', 10))  # Posts prefetched, by score plus comment count
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv('PREFETCH_TIMEOUT_SECONDS', 60))  # Queued prefetches are cancelled after this
+PUBLISH_TOPICS_INCREMENTALLY = os.getenv('PUBLISH_TOPICS_INCREMENTALLY', 'True').lower() == 'true'  # Save each topic as soon as it is written
+CHECKPOINT_DB_PATH = os.getenv('CHECKPOINT_DB_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'run_pipeline', 'checkpoints.sqlite3'))  # Stage outputs of unfinished runs
+CHECKPOINT_TTL_SECONDS = int(os.getenv('CHECKPOINT_TTL_SECONDS', 24 * 3600))  # Older checkpoints are discarded
+STAGE_MAX_WORKERS = int(os.getenv('STAGE_MAX_WORKERS', 4))  # Independent stages of a run executed concurrently
+DEFAULT_STAGE_TIMEOUT_SECONDS = int(os.getenv('DEFAULT_STAGE_TIMEOUT_SECONDS', 300))  # Per-attempt timeout of stages not listed below
+STAGE_TIMEOUT_SECONDS = {  # Per-attempt timeout, per stage
+    'select_posts': int(os.getenv('SELECT_POSTS_TIMEOUT_SECONDS', 300)),
+    'write_content': int(os.getenv('WRITE_CONTENT_TIMEOUT_SECONDS', 600)),
+    'save_content': 60,
+    'update_delivery_stats': 60,
+}
+# Extra attempts after a failure, per stage (LLM stages retry their own calls). A
+# timed-out attempt is never retried, so only stages that are safe to run again
+# after an error are listed: retrieval and comment fetches only read from Reddit,
+# save_content stores the issue once (IssuePublisher.finish) and
+# update_delivery_stats writes absolute values
+STAGE_RETRIES = {
+    'reddit_posts': 1,
+    'fetch_comments': 1,
+    'save_content': 2,
+    'update_delivery_stats': 2,
+}
+STAGE_RETRY_DELAY_SECONDS = float(os.getenv('STAGE_RETRY_DELAY_SECONDS', 2))  # Doubled on every further retry
 PIPELINE_LEAD_TIME_MINUTES = 30  # Run pipeline 30 minutes before delivery time
+SCHEDULER_BATCH_LIMIT = int(os.getenv('SCHEDULER_BATCH_LIMIT', 100))  # Max due pipelines loaded per tick
+SCHEDULER_MODE = os.getenv('SCHEDULER_MODE', 'heap')  # 'heap' (in-memory due-time heap) or 'poll' (check every minute)
+SCHEDULER_RESYNC_MINUTES = int(os.getenv('SCHEDULER_RESYNC_MINUTES', 15))  # Full reload of the in-memory scheduler
+PIPELINE_RETRY_DELAY_SECONDS = int(os.getenv('PIPELINE_RETRY_DELAY_SECONDS', 60))  # Delay before retrying a failed run
+PIPELINE_MAX_WORKERS = int(os.getenv('PIPELINE_MAX_WORKERS', 4))  # Pipelines executed concurrently
+PIPELINE_TIMEOUT_SECONDS = int(os.getenv('PIPELINE_TIMEOUT_SECONDS', 900))  # Deadline of a pipeline run, also how long /run waits for it
 
 # Flask configuration
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
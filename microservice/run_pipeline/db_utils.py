@@ -2,12 +2,21 @@
 Utility functions for database operations.
 """
 from supabase import create_client
+from datetime import datetime, timedelta
+import pytz
 import config
 import logging
 
 # Initialize Supabase client
 supabase = create_client(config.SUPABASE_URL, config.SUPABASE_ANON_KEY)
 
+# Columns the scheduler needs to decide on and execute a pipeline
+SCHEDULED_PIPELINE_COLUMNS = (
+    'pipeline_id, pipeline_name, user_id, focus, subreddits, source, schedule, '
+    'delivery_time, last_delivered, delivery_count, is_active, next_run_at, prefilter_top_n, '
+    'bypass_llm_cache'
+)
+
 def get_pipeline_config(pipeline_id, delivery_count=None):
     """
     Get pipeline configuration from Supabase.
@@ -34,19 +43,53 @@ def get_pipeline_config(pipeline_id, delivery_count=None):
         logging.error(f"Error getting pipeline config: {str(e)}")
         return None
 
-def get_scheduled_pipelines(lead_time_minutes=30):
+def get_active_pipelines():
+    """
+    Get every active pipeline with the columns the scheduler needs.
+    
+    Returns:
+        list: List of pipeline configurations
+    """
+    try:
+        response = supabase.table('pipeline_configs') \
+            .select(SCHEDULED_PIPELINE_COLUMNS) \
+            .eq('is_active', True) \
+            .execute()
+        
+        return response.data or []
+    except Exception as e:
+        logging.error(f"Error getting active pipelines: {str(e)}")
+        return []
+
+def get_scheduled_pipelines(lead_time_minutes=30, limit=None):
     """
     Get pipelines that are scheduled to run soon.
     
+    Only active pipelines whose next_run_at falls within the lead time are
+    returned, plus those whose next_run_at has not been computed yet.
+    
     Args:
         lead_time_minutes (int): Minutes before delivery time to run the pipeline
+        limit (int, optional): Maximum number of pipelines to return
+            (defaults to config.SCHEDULER_BATCH_LIMIT)
         
     Returns:
-        list: List of pipeline configurations
+        list: List of pipeline configurations, earliest next_run_at first
     """
     try:
-        # Get all active pipelines
-        response = supabase.table('pipeline_configs').select('*').eq('is_active', True).execute()
+        if limit is None:
+            limit = config.SCHEDULER_BATCH_LIMIT
+        
+        cutoff = datetime.now(pytz.UTC) + timedelta(minutes=lead_time_minutes)
+        cutoff = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        response = supabase.table('pipeline_configs') \
+            .select(SCHEDULED_PIPELINE_COLUMNS) \
+            .eq('is_active', True) \
+            .or_(f'next_run_at.is.null,next_run_at.lte.{cutoff}') \
+            .order('next_run_at', nullsfirst=True) \
+            .limit(limit) \
+            .execute()
         
         if not response.data:
             return []
@@ -56,7 +99,27 @@ def get_scheduled_pipelines(lead_time_minutes=30):
         logging.error(f"Error getting scheduled pipelines: {str(e)}")
         return []
 
-def update_pipeline_delivery_stats(pipeline_id, delivery_count, last_delivered):
+def update_pipeline_next_run_at(pipeline_id, next_run_at):
+    """
+    Update the next scheduled delivery time of a pipeline.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        next_run_at (str): ISO format datetime of the next delivery
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        supabase.table('pipeline_configs').update({
+            'next_run_at': next_run_at
+        }).eq('pipeline_id', pipeline_id).execute()
+        return True
+    except Exception as e:
+        logging.error(f"Error updating pipeline next_run_at: {str(e)}")
+        return False
+
+def update_pipeline_delivery_stats(pipeline_id, delivery_count, last_delivered, next_run_at=None):
     """
     Update pipeline delivery statistics.
     
@@ -64,16 +127,21 @@ def update_pipeline_delivery_stats(pipeline_id, delivery_count, last_delivered):
         pipeline_id (str): The ID of the pipeline
         delivery_count (int): New delivery count
         last_delivered (str): ISO format datetime of last delivery
+        next_run_at (str, optional): ISO format datetime of the next delivery
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        supabase.table('pipeline_configs').update({
+        stats = {
             'delivery_count': delivery_count,
             'last_delivered': last_delivered,
             'last_delivered_time': last_delivered
-        }).eq('pipeline_id', pipeline_id).execute()
+        }
+        if next_run_at is not None:
+            stats['next_run_at'] = next_run_at
+        
+        supabase.table('pipeline_configs').update(stats).eq('pipeline_id', pipeline_id).execute()
         return True
     except Exception as e:
         logging.error(f"Error updating pipeline delivery stats: {str(e)}")
@@ -131,3 +199,67 @@ def save_pipeline_content(pipeline_id, pipeline_name, title, content, user_id):
     except Exception as e:
         logging.error(f"Error saving pipeline content: {str(e)}")
         return False
+
+def create_pipeline_issue(pipeline_id, pipeline_name, title, content, user_id, status='generating'):
+    """
+    Create a pipeline issue that is still being written.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        pipeline_name (str): The name of the pipeline
+        title (str): The title of the content
+        content (list): The content written so far
+        user_id (str): The ID of the user
+        status (str): Status of the issue ('generating', 'complete' or 'failed')
+        
+    Returns:
+        int: ID of the new pipeline_reads row, or None on failure
+    """
+    try:
+        issue = get_latest_issue_number(pipeline_id) + 1
+        
+        response = supabase.table('pipeline_reads').insert({
+            'pipeline_id': pipeline_id,
+            'pipeline_name': pipeline_name,
+            'title': title,
+            'content': content,
+            'user_id': user_id,
+            'issue': issue,
+            'status': status
+        }).execute()
+        
+        if response.data and len(response.data) > 0:
+            return response.data[0]['id']
+        return None
+    except Exception as e:
+        logging.error(f"Error creating pipeline issue: {str(e)}")
+        return None
+
+def update_pipeline_issue(read_id, content=None, title=None, status=None):
+    """
+    Update a pipeline issue created by create_pipeline_issue.
+    
+    Args:
+        read_id (int): ID of the pipeline_reads row
+        content (list, optional): The content written so far
+        title (str, optional): The title of the content
+        status (str, optional): Status of the issue ('generating', 'complete' or 'failed')
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        update_data = {}
+        if content is not None:
+            update_data['content'] = content
+        if title is not None:
+            update_data['title'] = title
+        if status is not None:
+            update_data['status'] = status
+        
+        supabase.table('pipeline_reads').update(update_data).eq('id', read_id).execute()
+        
+        return True
+    except Exception as e:
+        logging.error(f"Error updating pipeline issue: {str(e)}")
+        return False
@@ -1,155 +1,410 @@
 """
 Module for retrieving comments for Reddit posts.
 """
-import requests
 import logging
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Add the parent directory to sys.path to import the reddit_api module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_pipeline.reddit_pipeline.reddit_api.session import get_session
+from run_pipeline.reddit_pipeline.reddit_api.cache import TTLCache, HIT, COALESCED, MISS
+from run_pipeline.reddit_pipeline.reddit_api.comments import PostComments
+from run_pipeline.reddit_pipeline.reddit_api.comment_tree import CommentTree
+from run_pipeline.reddit_retrieval import get_reddit_client
 import config
 
-def get_comments_for_post(subreddit, post_id, max_comment_depth=5):
+# Outcome of a fetch that raised; nothing was cached
+FAILED = "failed"
+
+# Comments shared across groups and pipelines, keyed by (post_id, max_comment_depth)
+comment_cache = TTLCache(
+    max_bytes=config.COMMENT_CACHE_MAX_BYTES,
+    default_ttl=config.COMMENT_CACHE_TTL_SECONDS,
+    name='comment_cache'
+)
+
+def format_thread(thread):
+    """
+    Render a post and its pruned comment tree as compact text for the writer.
+    
+    Comments are pruned by score, depth, replies per comment and a total
+    character budget (see the COMMENT_* settings in config).
+    
+    Args:
+        thread (dict): Post and flat comments as returned by PostComments.get_comments
+        
+    Returns:
+        str: Text with the post header, body and one line per kept comment
+    """
+    post = thread.get('post', {})
+    tree = CommentTree.from_comments(thread.get('comments', []))
+    pruned = tree.prune(
+        min_score=config.COMMENT_MIN_SCORE,
+        top_k_children=config.COMMENT_TOP_K_CHILDREN,
+        char_budget=config.COMMENT_CHAR_BUDGET
+    )
+    
+    body = " ".join((post.get('selftext') or '').split())
+    if len(body) > config.POST_BODY_CHAR_LIMIT:
+        body = body[:config.POST_BODY_CHAR_LIMIT] + "..."
+    
+    logging.info(f"Pruned comments of post {post.get('id')} from {len(tree)} to {len(pruned)}")
+    
+    return "\n".join([
+        f"Title: {post.get('title', '')}",
+        f"Subreddit: r/{post.get('subreddit', '')} | Upvotes: {post.get('score', 0)} | Comments: {post.get('num_comments', 0)}",
+        f"Body: {body}",
+        "Comments:",
+        pruned.to_text()
+    ])
+
+def _request_reddit_comments(subreddit, post_id, max_comment_depth):
     """
-    Retrieve comments for a Reddit post using the comments API.
+    Request comments for a Reddit post directly from Reddit's API.
     
     Args:
         subreddit (str): The subreddit name
-        post_id (str): The post ID
+        post_id (str): The post ID without the t3_ prefix
         max_comment_depth (int): Maximum depth of comments to retrieve
         
     Returns:
-        dict: Dictionary containing text and permalink
+        dict: Dictionary containing text (the post and its pruned comment tree) and permalink
     """
-    post_id = post_id[3:]
-    try:
-        # Prepare API request
-        url = config.COMMENTS_API_URL
-        headers = {
-            'subreddit': subreddit,
-            'postid': post_id
-        }
-        params = {
-            'max_comment_depth': max_comment_depth
-        }
+    thread = PostComments(get_reddit_client()).get_comments(
+        post_id,
+        subreddit=subreddit or None,
+        depth=max_comment_depth,
+        limit=config.COMMENTS_LIMIT,
+        sort=config.COMMENTS_SORT
+    )
+    
+    post_permalink = thread['post'].get('permalink')
+    if post_permalink:
+        permalink = f"https://www.reddit.com{post_permalink}"
+    else:
+        permalink = f"https://www.reddit.com/r/{subreddit}/comments/{post_id}"
+    
+    return {
+        "text": format_thread(thread),
+        "permalink": permalink
+    }
+
+def _request_proxy_comments(subreddit, post_id, max_comment_depth):
+    """
+    Request comments for a Reddit post from the external comments API.
+    
+    Args:
+        subreddit (str): The subreddit name
+        post_id (str): The post ID without the t3_ prefix
+        max_comment_depth (int): Maximum depth of comments to retrieve
+        
+    Returns:
+        dict: Dictionary containing text and permalink
         
-        print("url", url)
-        print("headers", headers)
-        print("params", params)
+    Raises:
+        RuntimeError: If the comments API does not return 200
+    """
+    # Prepare API request
+    url = config.COMMENTS_API_URL
+    headers = {
+        'subreddit': subreddit,
+        'postid': post_id
+    }
+    params = {
+        'max_comment_depth': max_comment_depth
+    }
+    
+    logging.debug(f"Requesting comments from {url} with headers {headers} and params {params}")
+
+    # Make the request over the shared keep-alive session
+    response = get_session().get(
+        url,
+        headers=headers,
+        params=params,
+        timeout=config.COMMENTS_API_TIMEOUT_SECONDS
+    )
+    
+
+    # Check if request was successful
+    if response.status_code != 200:
+        logging.error(f"Error retrieving comments: {response.status_code} - {response.text}")
+        raise RuntimeError(str(response.status_code))
+    
+    # Extract permalink from the post data
+    permalink = None
+    for post in response.json().get('posts', []):
+        if post.get('id') == post_id:
+            permalink = f"https://www.reddit.com{post.get('permalink')}"
+            break
+    
+    # If permalink not found in response, construct it
+    if not permalink:
+        permalink = f"https://www.reddit.com/r/{subreddit}/comments/{post_id}"
 
-        # Make the request
-        response = requests.get(url, headers=headers, params=params)
+    return {
+        "text": response.text,
+        "permalink": permalink
+    }
+
+def _request_comments(subreddit, post_id, max_comment_depth):
+    """
+    Request comments for a Reddit post from the configured COMMENTS_SOURCE.
+    
+    Args:
+        subreddit (str): The subreddit name
+        post_id (str): The post ID without the t3_ prefix
+        max_comment_depth (int): Maximum depth of comments to retrieve
         
+    Returns:
+        dict: Dictionary containing text and permalink
+    """
+    if config.COMMENTS_SOURCE == 'proxy':
+        return _request_proxy_comments(subreddit, post_id, max_comment_depth)
+    return _request_reddit_comments(subreddit, post_id, max_comment_depth)
 
-        # Check if request was successful
-        if response.status_code == 200:
-            # Extract permalink from the post data
-            permalink = None
-            for post in response.json().get('posts', []):
-                if post.get('id') == post_id:
-                    permalink = f"https://www.reddit.com{post.get('permalink')}"
-                    break
-            
-            # If permalink not found in response, construct it
-            if not permalink:
-                permalink = f"https://www.reddit.com/r/{subreddit}/comments/{post_id}"
-
-            return {
-                "text": response.text,
-                "permalink": permalink
-            }
-        else:
-            logging.error(f"Error retrieving comments: {response.status_code} - {response.text}")
-            return {
-                "text": f"Error retrieving comments: {response.status_code}",
-                "permalink": f"https://www.reddit.com/r/{subreddit}/comments/{post_id}"
-            }
+def fetch_comments(subreddit, post_id, max_comment_depth=5):
+    """
+    Retrieve comments for a Reddit post, reusing cached and in-flight fetches.
+    
+    Args:
+        subreddit (str): The subreddit name
+        post_id (str): The post ID
+        max_comment_depth (int): Maximum depth of comments to retrieve
+        
+    Returns:
+        tuple: (dict containing text and permalink, cache outcome: 'hit',
+            'coalesced' or 'miss', or 'failed' with an error text). Failed
+            fetches are not cached.
+    """
+    post_id = post_id[3:]
+    try:
+        return comment_cache.fetch(
+            (post_id, max_comment_depth),
+            lambda: _request_comments(subreddit, post_id, max_comment_depth)
+        )
     except Exception as e:
         logging.error(f"Exception in get_comments_for_post: {str(e)}")
         return {
             "text": f"Error retrieving comments: {str(e)}",
             "permalink": f"https://www.reddit.com/r/{subreddit}/comments/{post_id}"
-        }
+        }, FAILED
 
-def get_comments_for_posts(selected_posts, post_data, max_comment_depth=5):
+def get_comments_for_post(subreddit, post_id, max_comment_depth=5):
+    """
+    Retrieve comments for a Reddit post.
+    
+    Args:
+        subreddit (str): The subreddit name
+        post_id (str): The post ID
+        max_comment_depth (int): Maximum depth of comments to retrieve
+        
+    Returns:
+        dict: Dictionary containing text and permalink
+    """
+    return fetch_comments(subreddit, post_id, max_comment_depth)[0]
+
+def prefetch_comments(posts, top_k, max_comment_depth=5, max_workers=None, timeout=None):
+    """
+    Speculatively fetch the comments of the posts most likely to be selected.
+    
+    Meant to run while the post selector is still deciding. The top_k posts
+    by score plus comment count are fetched into comment_cache, so
+    get_comments_for_posts finds them there (or joins their in-flight fetch)
+    once the selection is known. Fetches still queued after timeout seconds
+    are cancelled; running ones finish in the background.
+    
+    Args:
+        posts (list): Candidate posts from reddit_retrieval
+        top_k (int): Number of posts to prefetch
+        max_comment_depth (int): Maximum depth of comments to retrieve
+        max_workers (int, optional): Maximum concurrent comment requests
+            (defaults to config.COMMENTS_MAX_WORKERS)
+        timeout (float, optional): Seconds to wait for the prefetch
+        
+    Returns:
+        list: IDs of the posts whose comments were fetched from the network
+            in time; posts already cached are left out, since dropping them
+            later would waste another pipeline's fetch, and so are failed
+            fetches
+    """
+    ranked = sorted(posts, key=lambda post: -(post.get('score', 0) + post.get('num_comments', 0)))
+    tasks = ranked[:max(0, top_k)]
+    if not tasks:
+        return []
+    
+    def fetch(post):
+        return fetch_comments(post.get('subreddit', ''), post['post_id'], max_comment_depth)
+    
+    if max_workers is None:
+        max_workers = config.COMMENTS_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(tasks)))
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(fetch, post): post for post in tasks}
+    done, not_done = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    outcomes = {futures[future]['post_id']: future.result()[1] for future in done}
+    prefetched = [post['post_id'] for post in tasks if outcomes.get(post['post_id']) == MISS]
+    logging.info(
+        f"Prefetched comments of {len(prefetched)} posts ({list(outcomes.values()).count(HIT)} already cached, "
+        f"{list(outcomes.values()).count(FAILED)} failed, {len(not_done)} not done in time)"
+    )
+    return prefetched
+
+def release_prefetched_comments(prefetched_ids, used_ids, max_comment_depth=5):
+    """
+    Drop the prefetched comments that the selection did not use.
+    
+    Args:
+        prefetched_ids (list): Post IDs returned by prefetch_comments
+        used_ids (list): Post IDs whose comments the pipeline used
+        max_comment_depth (int): Comment depth the posts were prefetched with
+        
+    Returns:
+        dict: Number of posts prefetched, used and wasted, and the wasted ratio
+    """
+    used_ids = set(used_ids)
+    wasted = [post_id for post_id in prefetched_ids if post_id not in used_ids]
+    for post_id in wasted:
+        comment_cache.discard((post_id[3:], max_comment_depth))
+    
+    stats = {
+        'prefetched': len(prefetched_ids),
+        'used': len(prefetched_ids) - len(wasted),
+        'wasted': len(wasted),
+        'wasted_ratio': round(len(wasted) / len(prefetched_ids), 3) if prefetched_ids else 0.0
+    }
+    logging.info(
+        f"Comment prefetch: {stats['prefetched']} prefetched, {stats['used']} used, "
+        f"{stats['wasted']} wasted ({stats['wasted_ratio']:.0%})"
+    )
+    return stats
+
+def resolve_post_key(post_id, post_map):
+    """
+    Find the key of a selected post in the post map.
+    
+    Args:
+        post_id (str): Post ID returned by the post selector
+        post_map (dict): Mapping of post_id to post data
+        
+    Returns:
+        str: Matching key in post_map, or None if not found
+    """
+    # Check if post_id is in post_map
+    if post_id in post_map:
+        return post_id
+    
+    logging.debug(f"Post ID not found in post_map: {post_id}")
+    
+    # Try to find a matching post_id by removing 't3_' prefix
+    clean_post_id = post_id.replace('t3_', '')
+    matching_keys = [k for k in post_map.keys() if clean_post_id in k or k in post_id]
+    
+    if matching_keys:
+        logging.debug(f"Found potential matches for {post_id}: {matching_keys}")
+        # Use the first match
+        return matching_keys[0]
+    
+    logging.warning(f"Selected post {post_id} not found in the retrieved posts")
+    return None
+
+def get_comments_for_posts(selected_posts, post_data, max_comment_depth=5, max_workers=None, run_stats=None):
     """
     Retrieve comments for multiple posts.
     
+    The comments of every selected post are fetched concurrently with a
+    bounded pool; the groups and posts are returned in the selector's order.
+    A post selected in several groups, or already fetched by another
+    pipeline within the cache TTL, costs a single network call.
+    
     Args:
         selected_posts (list): List of selected posts with titles and related_post_ids
         post_data (list): Original post data from reddit_retrieval
         max_comment_depth (int): Maximum depth of comments to retrieve
+        max_workers (int, optional): Maximum concurrent comment requests
+            (defaults to config.COMMENTS_MAX_WORKERS, 1 fetches sequentially)
+        run_stats (dict, optional): Filled with the number of comment lookups,
+            network calls and calls saved by the cache for this run
         
     Returns:
         list: List of posts with comments
     """
     try:
-        # Debug: Print input data
-        print(f"Selected posts: {len(selected_posts)}")
-        print(f"Post data: {len(post_data)}")
+        logging.debug(f"Getting comments for {len(selected_posts)} selected groups of {len(post_data)} posts")
         
         # Create a mapping of post_id to post data
         post_map = {post['post_id']: post for post in post_data}
         
-        # Debug: Print post_map keys
-        print(f"Post map keys: {list(post_map.keys())}")
-        
-        results = []
-        
-        # Process each selected post
+        # Resolve the posts of each group before fetching anything
+        groups = []
         for selected in selected_posts:
             title = selected.get('title', '')
             post_ids = selected.get('related_post_ids', [])
             
-            print(f"\nProcessing group: {title}")
-            print(f"Post IDs in group: {post_ids}")
-            
-            post_comments = []
+            logging.debug(f"Processing group {title} with post IDs {post_ids}")
             
-            # Get comments for each post ID
+            post_keys = []
             for post_id in post_ids:
-                print(f"  Processing post ID: {post_id}")
-                
-                # Check if post_id is in post_map
-                if post_id in post_map:
-                    post = post_map[post_id]
-                    subreddit = post.get('subreddit', '')
-                    print(f"    Found post in map. Subreddit: {subreddit}")
-                    
-                    # Get comments
-                    comments = get_comments_for_post(
-                        subreddit, 
-                        post_id, 
-                        max_comment_depth
-                    )
-                    
-                    post_comments.append({
-                        'post': post,
-                        'comments': comments
-                    })
-                else:
-                    print(f"    Post ID not found in post_map: {post_id}")
-                    
-                    # Try to find a matching post_id by removing 't3_' prefix
-                    clean_post_id = post_id.replace('t3_', '')
-                    matching_keys = [k for k in post_map.keys() if clean_post_id in k or k in post_id]
-                    
-                    if matching_keys:
-                        print(f"    Found potential matches: {matching_keys}")
-                        
-                        # Use the first match
-                        match_key = matching_keys[0]
-                        post = post_map[match_key]
-                        subreddit = post.get('subreddit', '')
-                        print(f"    Using match: {match_key}, Subreddit: {subreddit}")
-                        
-                        # Get comments
-                        comments = get_comments_for_post(
-                            subreddit, 
-                            match_key, 
-                            max_comment_depth
-                        )
-                        
-                        post_comments.append({
-                            'post': post,
-                            'comments': comments
-                        })
+                post_key = resolve_post_key(post_id, post_map)
+                if post_key is not None:
+                    logging.debug(f"Using post {post_key} from r/{post_map[post_key].get('subreddit', '')}")
+                    post_keys.append(post_key)
+            
+            groups.append((title, post_keys))
+        
+        # Fetch the comments of every resolved post at once
+        tasks = [post_key for _, post_keys in groups for post_key in post_keys]
+        
+        def fetch(post_key):
+            return fetch_comments(
+                post_map[post_key].get('subreddit', ''),
+                post_key,
+                max_comment_depth
+            )
+        
+        if max_workers is None:
+            max_workers = config.COMMENTS_MAX_WORKERS
+        max_workers = max(1, min(max_workers, len(tasks)))
+        
+        if max_workers == 1:
+            fetched = [fetch(post_key) for post_key in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = list(executor.map(fetch, tasks))
+        
+        comments_list = [comments for comments, _ in fetched]
+        outcomes = [outcome for _, outcome in fetched]
+        
+        stats = {
+            'lookups': len(outcomes),
+            'network_calls': outcomes.count(MISS) + outcomes.count(FAILED),
+            'failed': outcomes.count(FAILED),
+            'cache_hits': outcomes.count(HIT),
+            'coalesced': outcomes.count(COALESCED),
+        }
+        stats['saved_calls'] = stats['cache_hits'] + stats['coalesced']
+        logging.info(
+            f"Comment fetches: {stats['lookups']} lookups, {stats['network_calls']} network calls, "
+            f"{stats['saved_calls']} saved ({stats['cache_hits']} cached, {stats['coalesced']} coalesced)"
+        )
+        if run_stats is not None:
+            run_stats.update(stats)
+        
+        # Reassemble the groups in their original order
+        results = []
+        comments_iter = iter(comments_list)
+        for title, post_keys in groups:
+            post_comments = [
+                {
+                    'post': post_map[post_key],
+                    'comments': next(comments_iter)
+                }
+                for post_key in post_keys
+            ]
             
             # Add to results
             if post_comments:
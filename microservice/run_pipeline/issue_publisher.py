@@ -0,0 +1,163 @@
+"""
+Incremental publishing of pipeline issues while they are being written.
+"""
+import logging
+import threading
+
+import db_utils
+
+class IssuePublisher:
+    """
+    Persists the topics of an issue as the writer finishes them.
+
+    The issue row is created with status 'generating' when the first topic
+    arrives and updated with every further topic, so readers see the first
+    topic within seconds of it being written. finish() stores the final
+    content and marks the issue complete; fail() marks it failed when the
+    run stops before that, until a resumed run completes it. Both close the
+    publisher: topics arriving later, for example from writer threads of an
+    attempt that timed out, are dropped instead of reopening the issue.
+
+    Topics are kept in group order regardless of the order they complete in.
+    """
+
+    def __init__(self, pipeline_id, pipeline_name, user_id, default_title, read_id=None, on_create=None):
+        """
+        Initialize the publisher.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+            pipeline_name (str): The name of the pipeline
+            user_id (str): The ID of the user
+            default_title (str): Issue title used if no topic has a title
+            read_id (int, optional): ID of an issue row already created by an
+                earlier attempt of the same run, to complete instead of a new one
+            on_create (callable, optional): Called with the ID of the issue row
+                as soon as it is created, so it can be checkpointed
+        """
+        self.pipeline_id = pipeline_id
+        self.pipeline_name = pipeline_name
+        self.user_id = user_id
+        self.default_title = default_title
+        self.read_id = read_id
+        self.on_create = on_create
+        self._topics = {}
+        self._create_failed = False
+        self._finished = False
+        self._lock = threading.Lock()
+        # Set once the issue is finished or failed; also tells the writer to stop
+        self.closed = threading.Event()
+
+    def _content_locked(self):
+        """Get the topics so far in group order. Caller must hold the lock."""
+        return [self._topics[index] for index in sorted(self._topics)]
+
+    def _title(self, content):
+        """Get the issue title for the given content."""
+        if content and content[0].get('title'):
+            return content[0]['title']
+        return self.default_title
+
+    def add_topic(self, index, topic):
+        """
+        Publish a finished topic.
+
+        Safe to call from several writer threads. Does nothing once the
+        publisher is closed.
+
+        Args:
+            index (int): Index of the topic's post group
+            topic (dict): The discussion topic
+        """
+        with self._lock:
+            if self.closed.is_set():
+                logging.info(f"Dropping late topic of pipeline {self.pipeline_id}, the issue is closed")
+                return
+            self._topics[index] = topic
+            content = self._content_locked()
+
+            if self.read_id is None:
+                if self._create_failed:
+                    return
+                self.read_id = db_utils.create_pipeline_issue(
+                    pipeline_id=self.pipeline_id,
+                    pipeline_name=self.pipeline_name,
+                    title=self._title(content),
+                    content=content,
+                    user_id=self.user_id
+                )
+                if self.read_id is None:
+                    self._create_failed = True
+                    logging.error(f"Failed to create issue for pipeline {self.pipeline_id}, publishing it when complete")
+                else:
+                    logging.info(f"Published first topic of pipeline {self.pipeline_id} as issue {self.read_id}")
+                    if self.on_create is not None:
+                        self.on_create(self.read_id)
+                return
+
+            # Also reopens an issue marked failed by an earlier attempt of the run
+            db_utils.update_pipeline_issue(
+                self.read_id,
+                content=content,
+                title=self._title(content),
+                status='generating'
+            )
+
+    def finish(self, content):
+        """
+        Store the complete issue.
+
+        Falls back to creating the complete issue in one go if it was never
+        created incrementally. Safe to call again, for example by a retry
+        after an attempt that timed out: the issue is only stored once.
+
+        Args:
+            content (list): Every topic of the issue, in group order
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._lock:
+            self.closed.set()
+            if self._finished:
+                return True
+            
+            if self.read_id is None:
+                self.read_id = db_utils.create_pipeline_issue(
+                    pipeline_id=self.pipeline_id,
+                    pipeline_name=self.pipeline_name,
+                    title=self._title(content),
+                    content=content,
+                    user_id=self.user_id,
+                    status='complete'
+                )
+                if self.read_id is None:
+                    return False
+                if self.on_create is not None:
+                    self.on_create(self.read_id)
+                self._finished = True
+                return True
+            
+            self._finished = db_utils.update_pipeline_issue(
+                self.read_id,
+                content=content,
+                title=self._title(content),
+                status='complete'
+            )
+            return self._finished
+
+    def fail(self):
+        """
+        Mark a partly published issue as failed.
+
+        Readers stop waiting for more topics; a resumed run of the same
+        delivery reopens and completes the issue.
+
+        Returns:
+            bool: True if successful or there is nothing to mark, False otherwise
+        """
+        with self._lock:
+            self.closed.set()
+            if self.read_id is None or self._finished:
+                return True
+            return db_utils.update_pipeline_issue(self.read_id, status='failed')
@@ -0,0 +1,196 @@
+"""
+Near-duplicate detection for Reddit posts.
+
+Cross-posts and near-identical threads are found with 64-bit SimHash
+fingerprints of each post's content. Fingerprints are bucketed by bands
+(locality-sensitive hashing) so only posts sharing a band are compared, and
+each comparison is against a bounded number of bucket members, which keeps
+the whole pass linear in the number of posts. Link posts and cross-posts,
+whose content is often just a short title, are matched on their exact title.
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+
+SIMHASH_BITS = 64
+
+# Most recent members of a band bucket a fingerprint is compared with
+MAX_BUCKET_COMPARISONS = 32
+
+def _words(text):
+    """Lowercase words of a text."""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def get_shingles(text, size=3):
+    """
+    Get the word shingles of a text.
+
+    Args:
+        text (str): Text to shingle
+        size (int): Number of words per shingle
+
+    Returns:
+        Counter: Shingle counts (single words if the text is shorter than a shingle)
+    """
+    words = _words(text)
+    if len(words) < size:
+        return Counter(words)
+    return Counter(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+def simhash(text):
+    """
+    Compute the 64-bit SimHash fingerprint of a text.
+
+    Similar texts get fingerprints that differ in few bits.
+
+    Args:
+        text (str): Text to fingerprint
+
+    Returns:
+        int: Fingerprint
+    """
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in get_shingles(text).items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def find_near_duplicates(texts, max_distance=3, min_words=8, titles=None):
+    """
+    Group texts whose fingerprints differ in at most max_distance bits.
+
+    Fingerprints are split into max_distance + 1 bands, so by the pigeonhole
+    principle any two fingerprints within max_distance share at least one
+    band exactly; only texts that share a band are compared. A text that
+    matches a bucket member is not added to that bucket, since its group is
+    already represented there, and at most MAX_BUCKET_COMPARISONS members are
+    compared per bucket. Matches are joined transitively with union-find.
+
+    Texts with the same title are also grouped, whatever their length, when
+    at least one of them is nothing but the title, as for link posts and
+    cross-posts.
+
+    Args:
+        texts (list): Texts to group
+        max_distance (int): Maximum Hamming distance between near duplicates
+        min_words (int): Texts with fewer words are never grouped by
+            fingerprint, so short generic titles are not mistaken for duplicates
+        titles (list, optional): Title of each text
+
+    Returns:
+        list: Groups of text indices, each in ascending order, for every
+            group with more than one text
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bands = max_distance + 1
+    band_bits = SIMHASH_BITS // bands
+    band_mask = (1 << band_bits) - 1
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_i] = root_j
+
+    grouped = set()
+
+    # First text with each title, and first one that is only its title
+    first_with_title = {}
+    first_title_only = {}
+    for index, title in enumerate(titles or []):
+        title_words = tuple(_words(title or ""))
+        if not title_words:
+            continue
+        title_only = tuple(_words(texts[index])) == title_words
+        match = first_with_title.get(title_words) if title_only else first_title_only.get(title_words)
+        if match is not None:
+            union(index, match)
+            grouped.update((index, match))
+        first_with_title.setdefault(title_words, index)
+        if title_only:
+            first_title_only.setdefault(title_words, index)
+
+    fingerprints = {}
+    buckets = defaultdict(list)
+    for index, text in enumerate(texts):
+        if len(text.split()) < min_words:
+            continue
+        fingerprint = simhash(text)
+        fingerprints[index] = fingerprint
+        grouped.add(index)
+        for band in range(bands):
+            bucket = buckets[(band, fingerprint >> (band * band_bits) & band_mask)]
+            matched = False
+            for other in bucket[-MAX_BUCKET_COMPARISONS:]:
+                if bin(fingerprint ^ fingerprints[other]).count("1") <= max_distance:
+                    matched = True
+                    union(index, other)
+            if not matched:
+                bucket.append(index)
+
+    groups = defaultdict(list)
+    for index in grouped:
+        groups[find(index)].append(index)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+def collapse_near_duplicates(posts, max_distance=3, min_words=8):
+    """
+    Collapse near-duplicate posts into one representative each.
+
+    Posts are compared on their whole content, and link posts and
+    cross-posts also on their exact title (see find_near_duplicates). The
+    representative is the post with the highest score plus comment count.
+    It carries the summed score and num_comments of its group and the IDs of
+    the posts it replaces in duplicate_post_ids, and takes the position of the
+    group's first post.
+
+    Args:
+        posts (list): Formatted posts with post_id, post_content, score and num_comments
+        max_distance (int): Maximum SimHash Hamming distance between near duplicates
+        min_words (int): Posts with fewer words are only collapsed on an exact title match
+
+    Returns:
+        list: Posts with near duplicates collapsed
+    """
+    groups = find_near_duplicates(
+        [post.get('post_content', '') for post in posts],
+        max_distance=max_distance,
+        min_words=min_words,
+        # post_content is the title, then the selftext on the next line
+        titles=[post.get('post_content', '').split('\n', 1)[0] for post in posts]
+    )
+    if not groups:
+        return posts
+
+    replaced = {}
+    for group in groups:
+        best = max(group, key=lambda i: (posts[i].get('score', 0) + posts[i].get('num_comments', 0), -i))
+        representative = dict(posts[best])
+        representative['score'] = sum(posts[i].get('score', 0) for i in group)
+        representative['num_comments'] = sum(posts[i].get('num_comments', 0) for i in group)
+        representative['duplicate_post_ids'] = [posts[i]['post_id'] for i in group if i != best]
+        replaced[group[0]] = representative
+        for i in group[1:]:
+            replaced[i] = None
+
+    collapsed = []
+    for i, post in enumerate(posts):
+        post = replaced.get(i, post)
+        if post is not None:
+            collapsed.append(post)
+    return collapsed
@@ -5,159 +5,622 @@ import logging
 import sys
 import os
 import json
+import time
 from datetime import datetime
 
 # Add the parent directory to sys.path to import the agents
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import pipeline modules
-from run_pipeline.reddit_retrieval import retrieve_reddit_posts
-from run_pipeline.get_comments import get_comments_for_posts
+from run_pipeline.reddit_retrieval import (
+    retrieve_reddit_posts,
+    fetch_listings,
+    parse_subreddits,
+    get_time_filter,
+    listing_cache
+)
+from run_pipeline.get_comments import (
+    get_comments_for_posts,
+    prefetch_comments,
+    release_prefetched_comments,
+    comment_cache
+)
 from run_pipeline.reddit_pipeline.agents.post_selector import select_posts
+from run_pipeline.reddit_pipeline.agents.prefilter import prefilter_posts
+from run_pipeline.reddit_pipeline.agents.llm_cache import get_llm_cache_stats
 from run_pipeline.reddit_pipeline.agents.writer import generate_content
 import db_utils
 import time_utils
 import config
+from worker_pool import PipelineWorkerPool
+from issue_publisher import IssuePublisher
+from checkpoint_store import CheckpointStore
+from stage_graph import Stage, StageGraph, StageError
+from pipeline_scheduler import PipelineScheduler
 
-def execute_pipeline(pipeline_config):
+# Worker pool shared by all scheduler ticks, so pipelines still running from a
+# previous tick are never started again
+worker_pool = PipelineWorkerPool(max_workers=config.PIPELINE_MAX_WORKERS)
+
+# Outputs of completed stages, so a failed run resumes where it stopped
+checkpoint_store = CheckpointStore(
+    path=config.CHECKPOINT_DB_PATH,
+    ttl_seconds=config.CHECKPOINT_TTL_SECONDS
+)
+
+def get_prefilter_top_n(pipeline_config):
     """
-    Execute the pipeline with the given configuration.
+    Get the number of posts the relevance prefilter keeps for the given pipeline.
     
     Args:
         pipeline_config (dict): Pipeline configuration
         
     Returns:
-        dict: Result of the pipeline execution
+        int: Number of posts to keep (0 disables the prefilter)
     """
-    try:
-        logging.info(f"Starting pipeline execution for {pipeline_config.get('pipeline_id')}")
+    prefilter_top_n = pipeline_config.get('prefilter_top_n')
+    if prefilter_top_n is None:
+        return config.PREFILTER_TOP_N
+    return prefilter_top_n
+
+def retrieve_reddit_source(pipeline_config, listings=None):
+    """
+    Retrieve the Reddit posts of a pipeline.
+    
+    Args:
+        pipeline_config (dict): Pipeline configuration
+        listings (dict, optional): Prefetched subreddit listings
         
-        # Extract pipeline parameters
-        pipeline_id = pipeline_config.get('pipeline_id')
-        pipeline_name = pipeline_config.get('pipeline_name')
-        subreddits = pipeline_config.get('subreddits', [])
-        schedule = pipeline_config.get('schedule', 'daily')
-        focus = pipeline_config.get('focus', '')
-        user_id = pipeline_config.get('user_id')
-        delivery_count = pipeline_config.get('delivery_count', 0)
+    Returns:
+        list: Posts from the pipeline's subreddits
+    """
+    return retrieve_reddit_posts(
+        subreddits=pipeline_config.get('subreddits', []),
+        schedule=pipeline_config.get('schedule', 'daily'),
+        comment_threshold=config.DEFAULT_COMMENT_THRESHOLD,
+        listings=listings
+    )
+
+# Post retrieval per value of pipeline_configs.source; each runs as its own
+# stage, concurrently with the others
+SOURCE_STAGES = {
+    'reddit': retrieve_reddit_source
+}
+
+def get_sources(pipeline_config):
+    """
+    Get the post sources of the given pipeline.
+    
+    Args:
+        pipeline_config (dict): Pipeline configuration
         
-        # Step 1: Retrieve Reddit posts
-        logging.info(f"Step 1: Retrieving Reddit posts for {pipeline_id}")
-        posts = retrieve_reddit_posts(
-            subreddits=subreddits,
-            schedule=schedule,
-            comment_threshold=config.DEFAULT_COMMENT_THRESHOLD
-        )
+    Returns:
+        list: Names of the sources with a retrieval stage (defaults to reddit)
+    """
+    sources = []
+    for source in pipeline_config.get('source') or ['reddit']:
+        source = source.strip().lower()
+        if source not in SOURCE_STAGES:
+            logging.warning(f"Ignoring unknown source {source} of pipeline {pipeline_config.get('pipeline_id')}")
+        elif source not in sources:
+            sources.append(source)
+    return sources or ['reddit']
+
+def make_stage(name, fn, inputs=(), outputs=()):
+    """
+    Create a pipeline stage with its configured timeout and retries.
+    
+    Args:
+        name (str): Name of the stage
+        fn (callable): Stage function
+        inputs (tuple): Names of the values the stage reads
+        outputs (tuple): Names of the values the stage produces
+        
+    Returns:
+        Stage: The stage
+    """
+    return Stage(
+        name,
+        fn,
+        inputs=inputs,
+        outputs=outputs,
+        timeout=config.STAGE_TIMEOUT_SECONDS.get(name, config.DEFAULT_STAGE_TIMEOUT_SECONDS),
+        retries=config.STAGE_RETRIES.get(name, 0),
+        retry_delay=config.STAGE_RETRY_DELAY_SECONDS
+    )
+
+def build_pipeline_graph(pipeline_config, publisher, listings=None):
+    """
+    Build the stage graph of a pipeline run.
+    
+    Source stages retrieve posts concurrently and are merged by
+    collect_posts, followed by the prefilter, selection, comment retrieval,
+    writing, saving and the delivery stats update. With
+    SPECULATIVE_PREFETCH, the comments of the top prefiltered posts are
+    fetched while the selector runs. Comment retrieval never waits for the
+    prefetch and picks up whatever it cached; the unused entries are dropped
+    once both are done. A stage raises StageError when the run cannot
+    continue, such as when no posts were retrieved.
+    
+    Args:
+        pipeline_config (dict): Pipeline configuration
+        publisher (IssuePublisher): Publisher of the issue being written
+        listings (dict, optional): Prefetched subreddit listings
         
+    Returns:
+        StageGraph: The graph
+    """
+    pipeline_id = pipeline_config.get('pipeline_id')
+    focus = pipeline_config.get('focus', '')
+    delivery_count = pipeline_config.get('delivery_count', 0)
+    use_llm_cache = not pipeline_config.get('bypass_llm_cache', False)
+    sources = get_sources(pipeline_config)
+    
+    def source_stage(source):
+        def retrieve():
+            posts = SOURCE_STAGES[source](pipeline_config, listings=listings)
+            logging.info(f"Retrieved {len(posts)} {source} posts for pipeline {pipeline_id}")
+            return posts
+        return make_stage(f"{source}_posts", retrieve, outputs=(f"{source}_posts",))
+    
+    def collect_posts(**source_posts):
+        posts = [post for source in sources for post in source_posts[f"{source}_posts"]]
         if not posts:
             logging.warning(f"No posts retrieved for pipeline {pipeline_id}")
-            return {
-                'success': False,
-                'error': 'No posts retrieved'
+            raise StageError('No posts retrieved')
+        return posts
+    
+    def prefilter(posts):
+        post_data = [
+            {
+                'post_id': post['post_id'],
+                'post_content': post['post_content'],
+                'score': post.get('score', 0),
+                'num_comments': post.get('num_comments', 0)
             }
-        
-        logging.info(f"Retrieved {len(posts)} posts for pipeline {pipeline_id}")
-        
-        # Step 2: Select posts using AI agent
-        logging.info(f"Step 2: Selecting posts for pipeline {pipeline_id}")
-        post_data = [{'post_id': post['post_id'], 'post_content': post['post_content']} for post in posts]
-        selected_posts = select_posts(post_data, focus)
-        
+            for post in posts
+        ]
+        return prefilter_posts(post_data, focus, get_prefilter_top_n(pipeline_config))
+    
+    def select(candidate_posts):
+        selected_posts = select_posts(candidate_posts, focus, use_llm_cache=use_llm_cache)
         if not selected_posts:
             logging.warning(f"No posts selected for pipeline {pipeline_id}")
-            return {
-                'success': False,
-                'error': 'No posts selected'
-            }
-        
+            raise StageError('No posts selected')
         logging.info(f"Selected {len(selected_posts)} post groups for pipeline {pipeline_id}")
-        
-        # Step 3: Get comments for selected posts
-        logging.info(f"Step 3: Getting comments for pipeline {pipeline_id}")
+        return selected_posts
+    
+    def prefetch(posts, candidate_posts):
+        # Speculative, so a failure only costs the overlap
+        candidate_ids = {post['post_id'] for post in candidate_posts}
+        try:
+            return prefetch_comments(
+                [post for post in posts if post['post_id'] in candidate_ids],
+                top_k=config.PREFETCH_TOP_K,
+                max_comment_depth=config.DEFAULT_MAX_COMMENT_DEPTH,
+                timeout=config.PREFETCH_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            logging.error(f"Error prefetching comments for pipeline {pipeline_id}: {str(e)}")
+            return []
+    
+    def release_prefetch(prefetched_post_ids, posts_with_comments):
+        return release_prefetched_comments(
+            prefetched_post_ids,
+            [post['post']['post_id'] for group in posts_with_comments for post in group['posts']],
+            max_comment_depth=config.DEFAULT_MAX_COMMENT_DEPTH
+        )
+    
+    def fetch_comments(posts, selected_posts):
+        comment_stats = {}
         posts_with_comments = get_comments_for_posts(
             selected_posts=selected_posts,
             post_data=posts,
-            max_comment_depth=config.DEFAULT_MAX_COMMENT_DEPTH
+            max_comment_depth=config.DEFAULT_MAX_COMMENT_DEPTH,
+            run_stats=comment_stats
         )
-        
         if not posts_with_comments:
             logging.warning(f"No comments retrieved for pipeline {pipeline_id}")
-            return {
-                'success': False,
-                'error': 'No comments retrieved'
-            }
-        
-        # Step 4: Generate content using writer agent
-        logging.info(f"Step 4: Generating content for pipeline {pipeline_id}")
-        content = generate_content(posts_with_comments, focus)
-        
+            raise StageError('No comments retrieved')
+        return {'posts_with_comments': posts_with_comments, 'comment_fetch_stats': comment_stats}
+    
+    def write_content(posts_with_comments):
+        content = generate_content(
+            posts_with_comments,
+            focus,
+            use_llm_cache=use_llm_cache,
+            on_topic=publisher.add_topic if config.PUBLISH_TOPICS_INCREMENTALLY else None,
+            cancel=publisher.closed
+        )
         if not content:
             logging.warning(f"No content generated for pipeline {pipeline_id}")
-            return {
-                'success': False,
-                'error': 'No content generated'
-            }
-        
-        # Step 5: Update database
-        logging.info(f"Step 5: Updating database for pipeline {pipeline_id}")
-        
-        # Save content to pipeline_reads table
-        content_saved = db_utils.save_pipeline_content(
-            pipeline_id=pipeline_id,
-            pipeline_name=pipeline_name,
-            title=content[0].get('title', f"{pipeline_name} - Issue {delivery_count + 1}"),
-            content=content,
-            user_id=user_id
-        )
-        
-        if not content_saved:
+            raise StageError('No content generated')
+        return {'content': content, 'read_id': publisher.read_id}
+    
+    def save_content(content, read_id):
+        # Completes the issue if its first topics were already published
+        if not publisher.finish(content):
             logging.error(f"Failed to save content for pipeline {pipeline_id}")
-            return {
-                'success': False,
-                'error': 'Failed to save content'
-            }
-        
-        # Update pipeline delivery stats
+            raise RuntimeError('Failed to save content')
+        return True
+    
+    def update_delivery_stats(content_saved):
         current_time = time_utils.get_current_utc_timestamp()
+        next_run_at = time_utils.get_next_run_at(
+            schedule=pipeline_config.get('schedule', 'daily'),
+            delivery_time=pipeline_config.get('delivery_time', '09:00:00'),
+            last_delivered=current_time,
+            lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES
+        )
         stats_updated = db_utils.update_pipeline_delivery_stats(
             pipeline_id=pipeline_id,
             delivery_count=delivery_count + 1,
-            last_delivered=current_time
+            last_delivered=current_time,
+            next_run_at=next_run_at.isoformat() if next_run_at else None
         )
-        
         if not stats_updated:
             logging.error(f"Failed to update delivery stats for pipeline {pipeline_id}")
+            raise RuntimeError('Failed to update delivery stats')
+        return True
+    
+    stages = [source_stage(source) for source in sources]
+    stages += [
+        make_stage('collect_posts', collect_posts,
+                   inputs=tuple(f"{source}_posts" for source in sources), outputs=('posts',)),
+        make_stage('prefilter_posts', prefilter, inputs=('posts',), outputs=('candidate_posts',)),
+        make_stage('select_posts', select, inputs=('candidate_posts',), outputs=('selected_posts',)),
+    ]
+    if config.SPECULATIVE_PREFETCH:
+        stages += [
+            make_stage('prefetch_comments', prefetch,
+                       inputs=('posts', 'candidate_posts'), outputs=('prefetched_post_ids',)),
+            make_stage('release_prefetch', release_prefetch,
+                       inputs=('prefetched_post_ids', 'posts_with_comments'), outputs=('prefetch_stats',))
+        ]
+    stages += [
+        make_stage('fetch_comments', fetch_comments,
+                   inputs=('posts', 'selected_posts'), outputs=('posts_with_comments', 'comment_fetch_stats')),
+        make_stage('write_content', write_content, inputs=('posts_with_comments',), outputs=('content', 'read_id')),
+        make_stage('save_content', save_content, inputs=('content', 'read_id'), outputs=('content_saved',)),
+        make_stage('update_delivery_stats', update_delivery_stats, inputs=('content_saved',), outputs=('delivered',))
+    ]
+    return StageGraph(stages, max_workers=config.STAGE_MAX_WORKERS)
+
+def execute_pipeline(pipeline_config, listings=None):
+    """
+    Execute the pipeline with the given configuration.
+    
+    The run is a graph of stages (see build_pipeline_graph) that start as
+    soon as their inputs are available, each with its own timeout and
+    retries, and the whole run ends within PIPELINE_TIMEOUT_SECONDS so a
+    hung run cannot hold a worker pool slot. The outputs of every completed stage are checkpointed under the
+    delivery number being produced. If the run fails, the next run of the
+    same delivery resumes after the completed stages instead of repeating
+    retrieval, LLM calls and saving. Checkpoints are cleared on success, and
+    when a stage stops the run with StageError (for example no posts were
+    retrieved), since resuming from the same inputs would stop it again.
+    
+    Args:
+        pipeline_config (dict): Pipeline configuration
+        listings (dict, optional): Subreddit listings prefetched for a batch of
+            pipelines (see prefetch_listings)
+        
+    Returns:
+        dict: Result of the pipeline execution, with the time spent in each stage
+    """
+    publisher = None
+    try:
+        logging.info(f"Starting pipeline execution for {pipeline_config.get('pipeline_id')}")
+        
+        # Extract pipeline parameters
+        pipeline_id = pipeline_config.get('pipeline_id')
+        pipeline_name = pipeline_config.get('pipeline_name')
+        delivery_count = pipeline_config.get('delivery_count', 0)
+        
+        # Resume a failed run of this delivery from its checkpoints
+        run_id = delivery_count + 1
+        checkpoint = checkpoint_store.load(pipeline_id, run_id)
+        if checkpoint:
+            logging.info(f"Resuming pipeline {pipeline_id} run {run_id} after: {', '.join(checkpoint)}")
+        
+        # The issue row is checkpointed as soon as it is created, so a resumed
+        # run completes it instead of creating a second one
+        publisher = IssuePublisher(
+            pipeline_id=pipeline_id,
+            pipeline_name=pipeline_name,
+            user_id=pipeline_config.get('user_id'),
+            default_title=f"{pipeline_name} - Issue {delivery_count + 1}",
+            read_id=checkpoint.get('issue', {}).get('read_id'),
+            on_create=lambda read_id: checkpoint_store.save(pipeline_id, run_id, 'issue', {'read_id': read_id})
+        )
+        
+        graph = build_pipeline_graph(pipeline_config, publisher, listings=listings)
+        run = graph.run(
+            checkpoint=checkpoint,
+            save_checkpoint=lambda stage, outputs: checkpoint_store.save(pipeline_id, run_id, stage, outputs),
+            deadline=time.time() + config.PIPELINE_TIMEOUT_SECONDS
+        )
+        
+        if not run['success']:
+            logging.error(f"Pipeline {pipeline_id} stopped at stage {run['failed_stage']}: {run['error']}")
+            if run['stopped']:
+                # Nothing to resume: no posts, selection, comments or content
+                # came out of the checkpointed inputs, so the next run starts
+                # over from retrieval. The issue row is kept to be reused.
+                checkpoint_store.clear(pipeline_id, keep=('issue',))
+            # An issue saved by this or an earlier attempt is complete
+            if 'content_saved' not in run['values']:
+                publisher.fail()
             return {
                 'success': False,
-                'error': 'Failed to update delivery stats'
+                'error': run['error'],
+                'failed_stage': run['failed_stage'],
+                'stage_timings': run['timings']
             }
         
+        checkpoint_store.clear(pipeline_id)
         logging.info(f"Pipeline {pipeline_id} executed successfully")
         
+        comment_stats = dict(run['values']['comment_fetch_stats'])
+        if 'prefetch_stats' in run['values']:
+            comment_stats['prefetch'] = run['values']['prefetch_stats']
+        
         return {
             'success': True,
             'pipeline_id': pipeline_id,
-            'content': content
+            'content': run['values']['content'],
+            'comment_fetch_stats': comment_stats,
+            'resumed_stages': [name for name, timing in run['timings'].items() if timing['status'] == 'resumed'],
+            'stage_timings': run['timings']
         }
     except Exception as e:
         logging.error(f"Error executing pipeline {pipeline_config.get('pipeline_id')}: {str(e)}")
+        if publisher is not None:
+            publisher.fail()
         return {
             'success': False,
             'error': str(e)
         }
 
+def get_cache_stats():
+    """
+    Get statistics for the in-process caches used by the pipeline.
+    
+    Returns:
+        dict: Cache statistics keyed by cache name
+    """
+    return {
+        'listing_cache': listing_cache.stats(),
+        'comment_cache': comment_cache.stats(),
+        'llm_cache': get_llm_cache_stats()
+    }
+
+def get_pipeline_next_run_at(pipeline):
+    """
+    Get the next delivery time of a pipeline, computing and storing it if missing.
+    
+    next_run_at is null for new pipelines and after the schedule or delivery
+    time changes; it is computed from the schedule and persisted so later
+    ticks can filter on it in the database.
+    
+    Args:
+        pipeline (dict): Pipeline configuration
+        
+    Returns:
+        datetime: Next delivery time, or None for an unknown schedule
+    """
+    if pipeline.get('next_run_at'):
+        return time_utils.parse_timestamp(pipeline['next_run_at'])
+    
+    next_run_at = time_utils.get_next_run_at(
+        schedule=pipeline.get('schedule'),
+        delivery_time=pipeline.get('delivery_time'),
+        last_delivered=pipeline.get('last_delivered'),
+        lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES
+    )
+    
+    # Never-delivered pipelines are due now; only persist real schedule slots
+    if next_run_at is not None and pipeline.get('last_delivered'):
+        db_utils.update_pipeline_next_run_at(pipeline.get('pipeline_id'), next_run_at.isoformat())
+    
+    return next_run_at
+
+def prefetch_listings(pipelines):
+    """
+    Fetch the listings needed by a batch of pipelines, each exactly once.
+    
+    The union of every pipeline's subreddits and time filter is fetched up
+    front so pipelines that share subreddits don't refetch them.
+    
+    Args:
+        pipelines (list): Pipeline configurations
+        
+    Returns:
+        dict: Listings keyed by (subreddit, time_filter), see fetch_listings
+    """
+    listing_requests = set()
+    for pipeline in pipelines:
+        time_filter = get_time_filter(pipeline.get('schedule', 'daily'))
+        for subreddit in parse_subreddits(pipeline.get('subreddits', [])):
+            listing_requests.add((subreddit, time_filter))
+    
+    logging.info(f"Prefetching {len(listing_requests)} subreddit listings for {len(pipelines)} pipelines")
+    return fetch_listings(listing_requests)
+
+def submit_pipelines(pipelines, results):
+    """
+    Prefetch the listings of a batch of pipelines and submit them to the worker pool.
+    
+    Args:
+        pipelines (list): Pipeline configurations to run
+        results (list): List that skipped pipelines are reported in
+        
+    Returns:
+        dict: Futures of the submitted executions keyed by pipeline ID
+    """
+    if not pipelines:
+        return {}
+    
+    listings = prefetch_listings(pipelines)
+    
+    futures = {}
+    for pipeline in pipelines:
+        pipeline_id = pipeline.get('pipeline_id')
+        logging.info(f"Running scheduled pipeline {pipeline_id}")
+        future = worker_pool.submit(pipeline_id, execute_pipeline, pipeline, listings=listings)
+        if future is None:
+            results.append({
+                'pipeline_id': pipeline_id,
+                'skipped': 'Pipeline is already running'
+            })
+        else:
+            futures[pipeline_id] = future
+    
+    return futures
+
+def dispatch_scheduled_pipelines(pipelines):
+    """
+    Start pipelines handed over by the in-memory scheduler without waiting for them.
+    
+    When an execution finishes the pipeline is rescheduled: from its updated
+    config after a delivery, or after PIPELINE_RETRY_DELAY_SECONDS on failure.
+    A pipeline skipped because it is already running, for example from a
+    manual /run, is rescheduled the same way once that execution finishes.
+    
+    Args:
+        pipelines (list): Due pipeline configurations
+    """
+    results = []
+    futures = submit_pipelines(pipelines, results)
+    
+    for pipeline_id, future in futures.items():
+        future.add_done_callback(lambda f, pipeline_id=pipeline_id: _reschedule_after_run(pipeline_id, f))
+    
+    for skipped in results:
+        pipeline_id = skipped['pipeline_id']
+        logging.info(f"Skipped scheduled pipeline {pipeline_id}: {skipped['skipped']}")
+        
+        running = worker_pool.get_in_flight(pipeline_id)
+        if running is not None:
+            running.add_done_callback(lambda f, pipeline_id=pipeline_id: _reschedule_after_run(pipeline_id, f))
+        else:
+            # Finished in the meantime
+            refresh_scheduled_pipeline(pipeline_id)
+
+def _reschedule_after_run(pipeline_id, future):
+    """
+    Put a pipeline back on the in-memory scheduler once its execution is done.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        future (Future): The finished execution
+    """
+    try:
+        result = future.result()
+        succeeded = isinstance(result, dict) and result.get('success')
+    except Exception as e:
+        logging.error(f"Error running pipeline {pipeline_id}: {str(e)}")
+        succeeded = False
+    
+    pipeline_config = db_utils.get_pipeline_config(pipeline_id)
+    if not pipeline_config:
+        pipeline_scheduler.remove(pipeline_id)
+        return
+    
+    if succeeded:
+        pipeline_scheduler.upsert(pipeline_config)
+    else:
+        # Retry at the cadence of the old one-minute poll rather than immediately
+        pipeline_scheduler.upsert(pipeline_config, not_before=time.time() + config.PIPELINE_RETRY_DELAY_SECONDS)
+
+def refresh_scheduled_pipeline(pipeline_id):
+    """
+    Reload a pipeline's config into the in-memory scheduler after it changed.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        
+    Returns:
+        bool: True if the pipeline is scheduled, False if it was removed
+    """
+    pipeline_config = db_utils.get_pipeline_config(pipeline_id)
+    if not pipeline_config or not pipeline_config.get('is_active', True):
+        pipeline_scheduler.remove(pipeline_id)
+        return False
+    
+    if not worker_pool.is_in_flight(pipeline_id):
+        pipeline_scheduler.upsert(pipeline_config)
+    return True
+
+def sync_scheduled_pipelines():
+    """
+    Reload every active pipeline into the in-memory scheduler.
+    
+    Run at startup and periodically as a safety net for config changes the
+    service was not notified about. Pipelines in flight at any point since
+    the read started are left as they are: their execution reschedules them
+    from a config read after it finished, which the rows read here may
+    predate.
+    """
+    read_started = time.monotonic()
+    in_flight = set(worker_pool.in_flight())
+    pipelines = db_utils.get_active_pipelines()
+    
+    def ran_since_read(pipeline_id):
+        finished_at = worker_pool.last_finished(pipeline_id)
+        return (
+            pipeline_id in in_flight
+            or worker_pool.is_in_flight(pipeline_id)
+            or (finished_at is not None and finished_at >= read_started)
+        )
+    
+    pipeline_scheduler.load(pipelines, skip=ran_since_read)
+
+# In-memory scheduler that dispatches pipelines at their due times
+pipeline_scheduler = PipelineScheduler(
+    dispatch=dispatch_scheduled_pipelines,
+    lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES
+)
+
+def _log_run_result(pipeline_id, future):
+    """
+    Log the outcome of a pipeline execution started by a polling tick.
+    
+    Args:
+        pipeline_id (str): The ID of the pipeline
+        future (Future): The finished execution
+    """
+    try:
+        result = future.result()
+    except Exception as e:
+        logging.error(f"Error running pipeline {pipeline_id}: {str(e)}")
+        return
+    
+    if isinstance(result, dict) and result.get('success'):
+        logging.info(f"Scheduled pipeline {pipeline_id} delivered")
+    else:
+        error = result.get('error') if isinstance(result, dict) else result
+        logging.error(f"Scheduled pipeline {pipeline_id} failed: {error}")
+
 def run_scheduled_pipelines():
     """
-    Run pipelines that are scheduled to run.
+    Start pipelines that are scheduled to run.
+    
+    Due pipelines are collected first so their subreddit listings can be
+    fetched once for the whole tick and shared between them. They then run
+    concurrently on the shared worker pool; pipelines still in flight from a
+    previous tick are skipped. The tick returns as soon as the pipelines are
+    submitted, so a slow pipeline never delays the next tick, and each
+    result is logged when its execution finishes.
     
     Returns:
-        dict: Results of pipeline executions
+        dict: Pipelines started, and those skipped or that failed to be checked
     """
     try:
         logging.info("Checking for scheduled pipelines")
         
-        # Get all active pipelines
-        pipelines = db_utils.get_scheduled_pipelines()
+        # Get active pipelines whose next run falls within the lead time
+        pipelines = db_utils.get_scheduled_pipelines(lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES)
         
         if not pipelines:
             logging.info("No active pipelines found")
@@ -167,28 +630,16 @@ def run_scheduled_pipelines():
             }
         
         results = []
+        due_pipelines = []
         
         # Check each pipeline to see if it should run
         for pipeline in pipelines:
             try:
-                pipeline_id = pipeline.get('pipeline_id')
-                schedule = pipeline.get('schedule')
-                delivery_time = pipeline.get('delivery_time')
-                last_delivered = pipeline.get('last_delivered')
+                next_run_at = get_pipeline_next_run_at(pipeline)
                 
                 # Check if pipeline should run
-                if time_utils.should_run_pipeline(
-                    schedule=schedule,
-                    delivery_time=delivery_time,
-                    last_delivered=last_delivered,
-                    lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES
-                ):
-                    logging.info(f"Running scheduled pipeline {pipeline_id}")
-                    result = execute_pipeline(pipeline)
-                    results.append({
-                        'pipeline_id': pipeline_id,
-                        'result': result
-                    })
+                if time_utils.is_due(next_run_at, lead_time_minutes=config.PIPELINE_LEAD_TIME_MINUTES):
+                    due_pipelines.append(pipeline)
             except Exception as e:
                 logging.error(f"Error checking pipeline {pipeline.get('pipeline_id')}: {str(e)}")
                 results.append({
@@ -196,8 +647,14 @@ def run_scheduled_pipelines():
                     'error': str(e)
                 })
         
+        futures = submit_pipelines(due_pipelines, results)
+        
+        for pipeline_id, future in futures.items():
+            future.add_done_callback(lambda f, pipeline_id=pipeline_id: _log_run_result(pipeline_id, f))
+        
         return {
             'success': True,
+            'started': list(futures),
             'results': results
         }
     except Exception as e:
@@ -0,0 +1,236 @@
+"""
+In-memory scheduler that dispatches pipelines at their due times.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import time_utils
+
+class PipelineScheduler:
+    """
+    Keeps a min-heap of pipeline run times and dispatches pipelines when due.
+
+    Run times follow time_utils.get_next_run_at: a pipeline is due lead time
+    minutes before its next delivery. The heap is loaded once at startup and
+    updated incrementally when a pipeline config changes or a delivery
+    finishes, so the service sleeps until the next pipeline is due instead of
+    re-checking every pipeline every minute.
+
+    Heap entries are invalidated lazily: each pipeline keeps the run time of
+    its current entry and stale entries are skipped when popped.
+    """
+
+    def __init__(self, dispatch, lead_time_minutes=30, max_sleep_seconds=300):
+        """
+        Initialize the scheduler.
+
+        Args:
+            dispatch (callable): Called with a list of due pipeline configurations
+            lead_time_minutes (int): Minutes before delivery time to run a pipeline
+            max_sleep_seconds (float): Longest time to sleep without re-checking the heap
+        """
+        self.dispatch = dispatch
+        self.lead_time_minutes = lead_time_minutes
+        self.max_sleep_seconds = max_sleep_seconds
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def load(self, pipelines, skip=None):
+        """
+        Replace the scheduled pipelines.
+
+        A retry delay set through upsert's not_before is kept. Pipelines for
+        which skip returns True keep their current entry, or stay
+        unscheduled, for example because a running execution will reschedule
+        them from a fresher config than the one being loaded.
+
+        Args:
+            pipelines (list): Active pipeline configurations
+            skip (callable, optional): Called with a pipeline ID, with the
+                scheduler's lock held
+        """
+        def skipped(pipeline_id):
+            return skip is not None and skip(pipeline_id)
+
+        with self._condition:
+            loaded = set()
+            for pipeline in pipelines:
+                pipeline_id = pipeline.get('pipeline_id')
+                if skipped(pipeline_id):
+                    continue
+                entry = self._entries.get(pipeline_id)
+                self._push_locked(pipeline, entry[2] if entry else None)
+                loaded.add(pipeline_id)
+
+            for pipeline_id in list(self._entries):
+                if pipeline_id not in loaded and not skipped(pipeline_id):
+                    del self._entries[pipeline_id]
+
+            # Drop the entries replaced above instead of leaving them to be skipped
+            self._heap = [item for item in self._heap if self._entries.get(item[2], (None,))[0] == item[1]]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+        logging.info(f"Scheduler loaded {len(self._entries)} pipelines")
+
+    def upsert(self, pipeline, not_before=None):
+        """
+        Add or reschedule a pipeline.
+
+        Args:
+            pipeline (dict): Pipeline configuration
+            not_before (float, optional): Epoch seconds before which the
+                pipeline must not run, e.g. to delay a retry after a failure
+        """
+        with self._condition:
+            if not pipeline.get('is_active', True):
+                self._entries.pop(pipeline.get('pipeline_id'), None)
+            else:
+                self._push_locked(pipeline, not_before)
+            self._condition.notify()
+
+    def remove(self, pipeline_id):
+        """
+        Stop scheduling a pipeline.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+        """
+        with self._condition:
+            self._entries.pop(pipeline_id, None)
+            self._condition.notify()
+
+    def pop_due(self, now=None):
+        """
+        Remove and return every pipeline that is due.
+
+        Args:
+            now (float, optional): Current epoch seconds
+
+        Returns:
+            list: Due pipeline configurations
+        """
+        with self._condition:
+            return self._pop_due_locked(time.time() if now is None else now)
+
+    def next_run_in(self):
+        """
+        Get the number of seconds until the next pipeline is due.
+
+        Returns:
+            float: Seconds until the next run (0 if overdue), or None if nothing is scheduled
+        """
+        with self._condition:
+            run_at = self._peek_locked()
+            return None if run_at is None else max(0.0, run_at - time.time())
+
+    def start(self):
+        """Start dispatching pipelines in a background thread."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='pipeline-scheduler', daemon=True)
+        self._thread.start()
+        logging.info("Pipeline scheduler started")
+
+    def stop(self):
+        """Stop the background thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logging.info("Pipeline scheduler stopped")
+
+    def _run(self):
+        """Sleep until the next pipeline is due, then dispatch every due pipeline."""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                run_at = self._peek_locked()
+                delay = self.max_sleep_seconds if run_at is None else run_at - time.time()
+                if delay > 0:
+                    self._condition.wait(timeout=min(delay, self.max_sleep_seconds))
+                    continue
+                due = self._pop_due_locked(time.time())
+
+            if due:
+                try:
+                    logging.info(f"Scheduler dispatching {len(due)} due pipelines")
+                    self.dispatch(due)
+                except Exception as e:
+                    logging.error(f"Error dispatching scheduled pipelines: {str(e)}")
+
+    def _run_at(self, pipeline):
+        """
+        Get the epoch time at which a pipeline should start.
+
+        Args:
+            pipeline (dict): Pipeline configuration
+
+        Returns:
+            float: Epoch seconds, or None for an unknown schedule
+        """
+        if pipeline.get('next_run_at'):
+            next_run_at = time_utils.parse_timestamp(pipeline['next_run_at'])
+        else:
+            next_run_at = time_utils.get_next_run_at(
+                schedule=pipeline.get('schedule'),
+                delivery_time=pipeline.get('delivery_time'),
+                last_delivered=pipeline.get('last_delivered'),
+                lead_time_minutes=self.lead_time_minutes
+            )
+        if next_run_at is None:
+            return None
+        return next_run_at.timestamp() - self.lead_time_minutes * 60
+
+    def _push_locked(self, pipeline, not_before=None):
+        """Schedule a pipeline. Caller must hold the condition."""
+        pipeline_id = pipeline.get('pipeline_id')
+        try:
+            run_at = self._run_at(pipeline)
+        except Exception as e:
+            logging.error(f"Error scheduling pipeline {pipeline_id}: {str(e)}")
+            run_at = None
+
+        if run_at is None:
+            self._entries.pop(pipeline_id, None)
+            return
+
+        if not_before is not None:
+            run_at = max(run_at, not_before)
+
+        seq = next(self._counter)
+        self._entries[pipeline_id] = (seq, pipeline, not_before)
+        heapq.heappush(self._heap, (run_at, seq, pipeline_id))
+
+    def _peek_locked(self):
+        """Get the run time of the earliest valid entry. Caller must hold the condition."""
+        while self._heap:
+            run_at, seq, pipeline_id = self._heap[0]
+            entry = self._entries.get(pipeline_id)
+            if entry is not None and entry[0] == seq:
+                return run_at
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due_locked(self, now):
+        """Pop every due pipeline. Caller must hold the condition."""
+        due = []
+        while True:
+            run_at = self._peek_locked()
+            if run_at is None or run_at > now:
+                break
+            _, _, pipeline_id = heapq.heappop(self._heap)
+            _, pipeline, _ = self._entries.pop(pipeline_id)
+            due.append(pipeline)
+        return due
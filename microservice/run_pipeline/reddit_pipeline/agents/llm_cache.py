@@ -0,0 +1,381 @@
+"""
+Persistent LLM response cache shared by the agents.
+
+Implements LangChain's cache interface on top of SQLite, so identical LLM
+calls (same model, parameters and rendered prompt) from re-runs and retries
+are answered from disk instead of the provider. Responses the agents fail to
+parse or validate are dropped again, so a retry asks the provider anew.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+
+from .prompt_packer import estimate_tokens
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "run_pipeline", "llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# USD per million input and output tokens, used to report the cost saved by hits
+MODEL_PRICES = {
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# Set while a pipeline that bypasses the cache is calling the LLM
+_bypass = ContextVar("llm_cache_bypass", default=False)
+
+# Keys of the entries served or stored in the current record_llm_cache_keys context
+_recorded_keys = ContextVar("llm_cache_recorded_keys", default=None)
+
+def _record_key(key):
+    """Remember a key served or stored by the current call, if recording."""
+    recorded = _recorded_keys.get()
+    if recorded is not None:
+        recorded.append(key)
+
+def get_model_name(llm_string):
+    """
+    Find the model named in LangChain's serialized LLM parameters.
+
+    Args:
+        llm_string (str): Serialized model and parameters
+
+    Returns:
+        str: Model name from MODEL_PRICES, or None if unknown
+    """
+    for model_name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if f'"{model_name}"' in llm_string or f"'{model_name}'" in llm_string or f"models/{model_name}" in llm_string:
+            return model_name
+    return None
+
+def get_usage(prompt, generations):
+    """
+    Get the prompt and completion tokens of a response.
+
+    Uses the usage reported by the provider when the generations carry it,
+    otherwise a local estimate.
+
+    Args:
+        prompt (str): Serialized prompt
+        generations (list): LangChain generations
+
+    Returns:
+        tuple: (prompt_tokens, completion_tokens)
+    """
+    prompt_tokens = 0
+    completion_tokens = 0
+    for generation in generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        prompt_tokens += usage.get("input_tokens", 0)
+        completion_tokens += usage.get("output_tokens", 0)
+
+    if not prompt_tokens:
+        prompt_tokens = estimate_tokens(prompt)
+    if not completion_tokens:
+        completion_tokens = sum(estimate_tokens(generation.text) for generation in generations)
+    return prompt_tokens, completion_tokens
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain LLM cache persisted in SQLite with TTL and size-based eviction.
+
+    Entries are keyed by the SHA-256 of the serialized model parameters and
+    the rendered prompt. Expired entries are never returned, and when the
+    cache grows beyond max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_bytes=LLM_CACHE_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite database file
+            ttl_seconds (int): Seconds an entry stays valid
+            max_bytes (int): Maximum total size of the cached responses
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evictions = 0
+        self._saved_prompt_tokens = 0
+        self._saved_completion_tokens = 0
+        self._saved_cost = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at_idx ON llm_cache (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(prompt, llm_string):
+        """
+        Hash the model parameters and rendered prompt into a cache key.
+
+        Args:
+            prompt (str): Serialized prompt
+            llm_string (str): Serialized model and parameters
+
+        Returns:
+            str: Hex digest
+        """
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        """Get the cached generations for a prompt, or None on a miss."""
+        if _bypass.get():
+            with self._lock:
+                self._bypassed += 1
+            return None
+
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT model, value, prompt_tokens, completion_tokens, expires_at FROM llm_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or row[4] <= now:
+                self._misses += 1
+                if row is not None:
+                    with self._connection:
+                        self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+
+            model, value, prompt_tokens, completion_tokens, _ = row
+            with self._connection:
+                self._connection.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+            self._hits += 1
+            _record_key(key)
+            self._saved_prompt_tokens += prompt_tokens
+            self._saved_completion_tokens += completion_tokens
+            input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+            self._saved_cost += (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+        try:
+            return [loads(generation) for generation in json.loads(value)]
+        except Exception as e:
+            logging.error(f"Error loading cached LLM response: {str(e)}")
+            return None
+
+    def update(self, prompt, llm_string, return_val):
+        """Store the generations for a prompt."""
+        if _bypass.get():
+            return
+
+        try:
+            value = json.dumps([dumps(generation) for generation in return_val])
+        except Exception as e:
+            logging.error(f"Error serializing LLM response for the cache: {str(e)}")
+            return
+
+        prompt_tokens, completion_tokens = get_usage(prompt, return_val)
+        key = self.make_key(prompt, llm_string)
+        _record_key(key)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, value, size, prompt_tokens, completion_tokens, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    get_model_name(llm_string),
+                    value,
+                    len(value),
+                    prompt_tokens,
+                    completion_tokens,
+                    now + self.ttl_seconds,
+                    now
+                )
+            )
+            self._evict_locked(now)
+
+    def _evict_locked(self, now):
+        """Drop expired entries, then least recently used ones above max_bytes. Caller must hold the lock."""
+        self._evictions += self._connection.execute(
+            "DELETE FROM llm_cache WHERE expires_at <= ?", (now,)
+        ).rowcount
+
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cursor = self._connection.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at")
+        evicted = []
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        self._evictions += len(evicted)
+
+    def discard(self, keys):
+        """
+        Remove entries by key.
+
+        Args:
+            keys (list): Keys from make_key
+        """
+        if not keys:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM llm_cache WHERE key = ?", [(key,) for key in keys])
+
+    def clear(self, **kwargs):
+        """Remove every entry."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        """
+        Get cache statistics for this process.
+
+        Returns:
+            dict: Entry count and size, hits, misses, bypassed lookups, hit
+                rate, evictions and the tokens and estimated cost saved by hits
+        """
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "saved_prompt_tokens": self._saved_prompt_tokens,
+                "saved_completion_tokens": self._saved_completion_tokens,
+                "saved_cost_usd": round(self._saved_cost, 6),
+            }
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """
+    Get the process-wide LLM cache, creating it on first use.
+
+    Returns:
+        SQLiteLLMCache: The cache, or None if LLM_CACHE_ENABLED is false
+    """
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = SQLiteLLMCache()
+    return _llm_cache
+
+def install_llm_cache():
+    """Make the process-wide cache LangChain's global LLM cache."""
+    try:
+        set_llm_cache(get_llm_cache())
+    except Exception as e:
+        logging.error(f"Error opening LLM cache, continuing without it: {str(e)}")
+        set_llm_cache(None)
+
+def get_llm_cache_stats():
+    """
+    Get the statistics of the process-wide LLM cache.
+
+    Returns:
+        dict: Cache statistics, empty if the cache is disabled
+    """
+    return _llm_cache.stats() if _llm_cache is not None else {}
+
+@contextmanager
+def llm_cache_bypass(bypass=True):
+    """
+    Skip the LLM cache for calls made in this context.
+
+    Used for pipelines that must always get a fresh response.
+
+    Args:
+        bypass (bool): Whether to bypass the cache
+    """
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+@contextmanager
+def record_llm_cache_keys():
+    """
+    Collect the keys of the cache entries served or stored in this context.
+
+    Lets a caller drop a response it rejects (see discard_llm_cache_entries),
+    so retries and later runs ask the provider again instead of getting the
+    same unusable response back from the cache. Keys recorded in a nested
+    context are also added to the enclosing one.
+
+    Yields:
+        list: Keys, filled as LLM calls are made
+    """
+    keys = []
+    enclosing = _recorded_keys.get()
+    token = _recorded_keys.set(keys)
+    try:
+        yield keys
+    finally:
+        _recorded_keys.reset(token)
+        if enclosing is not None:
+            enclosing.extend(keys)
+
+def discard_llm_cache_entries(keys):
+    """
+    Remove entries recorded by record_llm_cache_keys from the process-wide cache.
+
+    Args:
+        keys (list): Keys of the entries to remove
+    """
+    if _llm_cache is None or not keys:
+        return
+    try:
+        _llm_cache.discard(keys)
+        logging.info(f"Dropped {len(keys)} rejected LLM responses from the cache")
+    except Exception as e:
+        logging.error(f"Error dropping rejected LLM responses from the cache: {str(e)}")
@@ -1,8 +1,9 @@
 
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 import langchain
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableSequence
@@ -11,23 +12,50 @@ from typing import List, Dict, Any
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from .llm_cache import (
+    install_llm_cache,
+    llm_cache_bypass,
+    record_llm_cache_keys,
+    discard_llm_cache_entries
+)
+from .registry import get_model, get_chain
+from .structured_output import parse_structured, STRUCTURED_OUTPUT_JSON_MODE
+from .prompt_packer import (
+    estimate_tokens,
+    get_prompt_budget,
+    pack_posts,
+    shard_posts,
+    log_budget_usage,
+    MAX_POST_TOKENS
+)
+
 load_dotenv()
 
 # Configure langchain settings
 langchain.verbose = False
 langchain.debug = False
-langchain.llm_cache = False
+
+# Answer repeated identical LLM calls from the persistent cache
+install_llm_cache()
 
 
 MODEL_NAME = "gemini-2.0-flash-lite"
 
-def choose_model(model_name):
-    if "gemini" in model_name:
-        llm = ChatGoogleGenerativeAI(temperature=0, model=MODEL_NAME)
-    else:
-        llm = ChatOpenAI(model_name=MODEL_NAME)
+# "single" sends all posts in one prompt, "chunked" always shards them and
+# "auto" shards only when the posts exceed one shard
+SELECTOR_MODE = os.getenv("SELECTOR_MODE", "auto")
+
+# Estimated post tokens per selector shard
+SELECTOR_SHARD_TOKENS = int(os.getenv("SELECTOR_SHARD_TOKENS", 6000))
 
-    return llm
+# Maximum shards selected concurrently
+SELECTOR_MAX_WORKERS = int(os.getenv("SELECTOR_MAX_WORKERS", 4))
+
+# Word overlap (Jaccard) above which groups from different shards are merged
+SELECTOR_MERGE_SIMILARITY = float(os.getenv("SELECTOR_MERGE_SIMILARITY", 0.6))
+
+def choose_model(model_name):
+    return get_model(model_name)
 
 # ================================
 # Post Selector
@@ -54,28 +82,58 @@ post_selector_prompt = ChatPromptTemplate.from_messages([
     ("human", "Focus Topic: {focus}\nList of {{post_id: post_content}} pairs:\n{posts_objects}"),
 ])
 
+def build_post_selector_chain(llm):
+    """
+    Build the post selector chain on a model.
+    """
+    return RunnableSequence(
+        {
+            "format_instructions": lambda x: x["format_instructions"],
+            "focus": lambda x: x["focus"],
+            "tone": lambda x: x["tone"],
+            "posts_objects": lambda x: x["posts_objects"]
+        } | post_selector_prompt | llm
+    )
+
 def parse_chain_output(llm_output, parser):
     """
     Parse the output of a chain.
+
+    Near-valid JSON is repaired locally and fields that fail validation are
+    re-asked on their own (see structured_output.parse_structured).
     """
     content = llm_output.content if hasattr(llm_output, 'content') else str(llm_output)
-    return parser.parse(content)
+    return parse_structured(content, parser.pydantic_object, MODEL_NAME)
 
-def aggregate_posts(posts, focus, tone="Professional"):
+def aggregate_posts(posts, focus, tone="Professional", use_llm_cache=True):
     """
     Aggregate posts into a list of related post groups.
 
+    Posts are packed into the model's prompt budget first: duplicates are
+    dropped, long posts truncated and, if needed, the lowest scoring posts left out.
+
     Args:
         posts (List[Dict]): A list of dictionaries containing post data
+            (post_id, post_content and optionally score and num_comments)
         focus (str): The focus topic
         tone (str): The tone of the posts
+        use_llm_cache (bool): Reuse a cached response to an identical prompt
         
     Returns:
         Dict with:
             - themes: ThemeSelectorFormat object containing output attribute
             - post_groups: PostSelectorFormat object containing output attribute
     """
-    llm = choose_model(MODEL_NAME)
+    format_instructions = post_selector_parser.get_format_instructions()
+
+    # Fit the posts into what is left of the budget after the fixed prompt
+    budget = get_prompt_budget(MODEL_NAME)
+    fixed_prompt = post_selector_prompt.format(
+        format_instructions=format_instructions,
+        focus=focus,
+        posts_objects=""
+    )
+    posts = pack_posts(posts, budget - estimate_tokens(fixed_prompt))
 
     # Extract post contents for the theme selector
     post_contents = [post["post_content"] for post in posts]
@@ -107,23 +165,33 @@ def aggregate_posts(posts, focus, tone="Professional"):
     # themes_data = parse_chain_output(theme_chain_output, theme_selector_parser)
     
     # Run the post selector chain
-    post_chain = RunnableSequence(
-        {
-            "format_instructions": lambda _: post_selector_parser.get_format_instructions(),
-            "focus": lambda x: x["focus"],
-            "tone": lambda x: x["tone"],
-            "posts_objects": lambda _: post_objects
-        } | post_selector_prompt | llm
-    )
-    with get_openai_callback() as cb:
+    post_chain = get_chain("post_selector", MODEL_NAME, build_post_selector_chain, json_mode=STRUCTURED_OUTPUT_JSON_MODE)
+    with get_openai_callback() as cb, llm_cache_bypass(not use_llm_cache), record_llm_cache_keys() as cache_keys:
         post_chain_output = post_chain.invoke({
+            "format_instructions": format_instructions,
             "focus": focus,
             "tone": tone,
             "posts_objects": post_objects
         })
+        # Fragment re-asks made while parsing are not part of the packed prompt
+        prompt_tokens = cb.prompt_tokens
+
+        # Parse the post selector output and keep the Pydantic model. Parsing
+        # stays in the block so re-asks follow the bypass and are recorded too
+        try:
+            post_groups_data = parse_chain_output(post_chain_output, post_selector_parser)
+        except Exception:
+            # Never serve a rejected response to a retry or a later run
+            discard_llm_cache_entries(cache_keys)
+            raise
     
-    # Parse the post selector output and keep the Pydantic model
-    post_groups_data = parse_chain_output(post_chain_output, post_selector_parser)
+    log_budget_usage(
+        "post_selector",
+        MODEL_NAME,
+        estimate_tokens(fixed_prompt) + estimate_tokens(str(post_objects)),
+        budget,
+        prompt_tokens
+    )
     
     # Return the Pydantic models with their output attributes intact
     result = post_groups_data.model_dump().get("output")
@@ -135,4 +203,108 @@ def aggregate_posts(posts, focus, tone="Professional"):
     print(f"Total Cost (USD): ${cb.total_cost}")
     print("-"*100)
 
-    return result
\ No newline at end of file
+    return result
+
+def _title_words(title):
+    """Lowercase words of a group title, for comparing groups across shards."""
+    return set(re.findall(r"[a-z0-9]+", title.lower()))
+
+def merge_post_groups(shard_groups, similarity=SELECTOR_MERGE_SIMILARITY):
+    """
+    Merge the post groups selected from several shards.
+
+    Groups are visited in shard order; a group joins the first earlier group
+    whose title shares at least `similarity` of its words (Jaccard), otherwise
+    it starts a new group. Post IDs are deduplicated keeping their first
+    position, so the result only depends on the shard outputs.
+
+    Args:
+        shard_groups (List[List[Dict]]): Groups selected from each shard
+        similarity (float): Minimum title word overlap to merge two groups
+
+    Returns:
+        List[Dict]: Merged groups with title and related_post_ids
+    """
+    merged = []
+    for groups in shard_groups:
+        for group in groups:
+            words = _title_words(group.get("title", ""))
+            target = None
+            for candidate in merged:
+                union = words | candidate["words"]
+                if union and len(words & candidate["words"]) / len(union) >= similarity:
+                    target = candidate
+                    break
+            if target is None:
+                target = {"title": group.get("title", ""), "words": words, "related_post_ids": []}
+                merged.append(target)
+            for post_id in group.get("related_post_ids", []):
+                if post_id not in target["related_post_ids"]:
+                    target["related_post_ids"].append(post_id)
+
+    return [
+        {"title": group["title"], "related_post_ids": group["related_post_ids"]}
+        for group in merged
+        if group["related_post_ids"]
+    ]
+
+def select_posts(posts, focus, tone="Professional", mode=None, shard_tokens=None, max_workers=None,
+                 use_llm_cache=True):
+    """
+    Select and group the posts relevant to a focus topic.
+
+    Small post sets are selected in a single prompt. Larger ones are split
+    into token-bounded shards that are selected concurrently (map) and merged
+    deterministically (reduce), so wall time stays close to that of one shard.
+    A failed shard is logged and skipped unless every shard fails.
+
+    Args:
+        posts (List[Dict]): Posts with post_id, post_content and optionally score and num_comments
+        focus (str): The focus topic
+        tone (str): The tone of the posts
+        mode (str, optional): "auto", "single" or "chunked" (defaults to SELECTOR_MODE)
+        shard_tokens (int, optional): Post tokens per shard (defaults to SELECTOR_SHARD_TOKENS)
+        max_workers (int, optional): Shards selected concurrently (defaults to SELECTOR_MAX_WORKERS)
+        use_llm_cache (bool): Reuse cached responses to identical prompts
+
+    Returns:
+        List[Dict]: Post groups with title and related_post_ids (empty without posts)
+    """
+    mode = mode or SELECTOR_MODE
+    shard_tokens = shard_tokens or SELECTOR_SHARD_TOKENS
+    max_workers = max_workers or SELECTOR_MAX_WORKERS
+
+    if not posts:
+        return []
+
+    if mode == "single":
+        return aggregate_posts(posts, focus, tone, use_llm_cache)
+
+    shards = shard_posts(posts, shard_tokens, MAX_POST_TOKENS)
+    if not shards:
+        return []
+    if len(shards) <= 1 and mode == "auto":
+        return aggregate_posts(posts, focus, tone, use_llm_cache)
+
+    logging.info(f"Selecting {len(posts)} posts in {len(shards)} shards")
+
+    def select_shard(shard):
+        try:
+            return aggregate_posts(shard, focus, tone, use_llm_cache), None
+        except Exception as e:
+            logging.error(f"Error selecting posts from shard: {str(e)}")
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards)))) as executor:
+        results = list(executor.map(select_shard, shards))
+
+    shard_groups = [groups for groups, _ in results if groups is not None]
+    if not shard_groups:
+        raise results[-1][1]
+
+    merged = merge_post_groups(shard_groups)
+    logging.info(
+        f"Merged {sum(len(groups) for groups in shard_groups)} groups from "
+        f"{len(shard_groups)}/{len(shards)} shards into {len(merged)}"
+    )
+    return merged
@@ -0,0 +1,126 @@
+"""
+Local relevance prefilter run ahead of the LLM post selector.
+
+Scores posts against the pipeline focus with BM25 so only the most relevant
+posts are sent to the selector prompt.
+"""
+import logging
+import math
+import re
+from collections import Counter
+
+from .prompt_packer import estimate_tokens
+
+# BM25 term frequency saturation and length normalisation
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+def tokenize(text):
+    """
+    Split a text into normalised terms.
+
+    Terms are lowercase alphanumeric words without stopwords, with a plural
+    "s" stripped so "jobs" matches "job".
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Terms in order of appearance
+    """
+    terms = []
+    for word in re.findall(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.isalpha() and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+def bm25_scores(documents, query):
+    """
+    Score documents against a query with Okapi BM25.
+
+    Document frequencies are computed over the given documents, so scores are
+    relative to this batch of posts.
+
+    Args:
+        documents (List[str]): Texts to score
+        query (str): Query text
+
+    Returns:
+        List[float]: One score per document
+    """
+    query_terms = set(tokenize(query))
+    if not documents or not query_terms:
+        return [0.0] * len(documents)
+
+    term_counts = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = sum(lengths) / len(lengths) or 1.0
+
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(term for term in query_terms if term in counts)
+
+    n = len(documents)
+    idf = {
+        term: math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in query_terms
+    }
+
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        score = 0.0
+        for term in query_terms:
+            frequency = counts.get(term)
+            if frequency:
+                score += idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+        scores.append(score)
+    return scores
+
+def prefilter_posts(posts, focus, top_n):
+    """
+    Keep the top_n posts most relevant to the focus.
+
+    Posts are ranked by BM25 score against the focus, with score plus comment
+    count breaking ties (including posts that share no terms with the focus).
+    Kept posts stay in their original order.
+
+    Args:
+        posts (List[Dict]): Posts with post_id, post_content and optionally score and num_comments
+        focus (str): The focus topic
+        top_n (int): Number of posts to keep (0 or None keeps every post)
+
+    Returns:
+        List[Dict]: The kept posts
+    """
+    if not top_n or len(posts) <= top_n:
+        return posts
+
+    scores = bm25_scores([post["post_content"] for post in posts], focus)
+    ranked = sorted(
+        range(len(posts)),
+        key=lambda i: (-scores[i], -(posts[i].get("score", 0) + posts[i].get("num_comments", 0)), i)
+    )
+    kept = sorted(ranked[:top_n])
+
+    total_tokens = sum(estimate_tokens(post["post_content"]) for post in posts)
+    kept_tokens = sum(estimate_tokens(posts[i]["post_content"]) for i in kept)
+    matched = sum(1 for score in scores if score > 0)
+    logging.info(
+        f"Prefilter kept {len(kept)}/{len(posts)} posts ({matched} matched the focus), "
+        f"~{total_tokens - kept_tokens} post tokens saved"
+    )
+    return [posts[i] for i in kept]
@@ -0,0 +1,231 @@
+"""
+Prompt packing shared by the agents.
+
+Estimates prompt sizes locally and trims the variable parts of a prompt
+(posts for the selector, discussions for the writer) so every LLM call fits
+the token budget configured for its model.
+"""
+import hashlib
+import logging
+import os
+
+# Per-model context window and the share of it a single prompt may use
+MODEL_BUDGETS = {
+    "gemini-2.0-flash-lite": {"context_tokens": 1048576, "prompt_budget": 24000},
+    "gemini-2.0-flash": {"context_tokens": 1048576, "prompt_budget": 24000},
+    "gpt-4o-mini": {"context_tokens": 128000, "prompt_budget": 24000},
+    "gpt-4o": {"context_tokens": 128000, "prompt_budget": 24000},
+}
+DEFAULT_MODEL_BUDGET = {"context_tokens": 128000, "prompt_budget": 16000}
+
+# Overrides the prompt budget of every model when set
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 0)) or None
+
+# Maximum tokens of a single post in the selector prompt
+MAX_POST_TOKENS = int(os.getenv("MAX_POST_TOKENS", 300))
+
+# Average characters per token for English text
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text without calling a tokenizer.
+
+    Uses the larger of a character-based and a word-based estimate, which
+    stays close to BPE tokenizers for English prose and errs high for
+    punctuation-heavy or non-English text.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    by_chars = len(text) / CHARS_PER_TOKEN
+    by_words = len(text.split()) * 4 / 3
+    return int(max(by_chars, by_words)) + 1
+
+def get_prompt_budget(model_name):
+    """
+    Get the maximum number of prompt tokens for a model.
+
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        int: Prompt token budget
+    """
+    if PROMPT_TOKEN_BUDGET:
+        return PROMPT_TOKEN_BUDGET
+    return MODEL_BUDGETS.get(model_name, DEFAULT_MODEL_BUDGET)["prompt_budget"]
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Truncate a text to roughly the given number of tokens.
+
+    Args:
+        text (str): Text to truncate
+        max_tokens (int): Maximum number of tokens
+
+    Returns:
+        str: The text, cut at a word boundary with "..." appended if it was too long
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    cut = text[:max_chars]
+    if " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    # The word-based estimate can still be over; trim further by words
+    words = cut.split(" ")
+    while words and estimate_tokens(" ".join(words)) > max_tokens:
+        words = words[:int(len(words) * 0.9)]
+    return " ".join(words) + "..."
+
+def _content_key(text):
+    """Hash of a text with case and whitespace normalised, for deduplication."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+def pack_posts(posts, token_budget, max_post_tokens=MAX_POST_TOKENS):
+    """
+    Fit posts into a token budget for the post selector.
+
+    Posts with identical content are dropped, each post is truncated to
+    max_post_tokens, and posts are admitted by score plus comment count
+    until the budget is used up. Kept posts stay in their original order.
+
+    Args:
+        posts (List[Dict]): Posts with post_id and post_content, optionally score and num_comments
+        token_budget (int): Tokens available for all posts
+        max_post_tokens (int): Maximum tokens per post
+
+    Returns:
+        List[Dict]: Packed posts with post_id and (possibly truncated) post_content
+    """
+    seen = set()
+    candidates = []
+    for index, post in enumerate(posts):
+        key = _content_key(post["post_content"])
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append((index, post))
+
+    candidates.sort(key=lambda item: -(item[1].get("score", 0) + item[1].get("num_comments", 0)))
+
+    packed = []
+    used = 0
+    for index, post in candidates:
+        content = truncate_to_tokens(post["post_content"], max_post_tokens)
+        # Account for the post ID and dict punctuation around each entry
+        tokens = estimate_tokens(content) + estimate_tokens(post["post_id"]) + 4
+        if used + tokens > token_budget:
+            continue
+        used += tokens
+        packed.append((index, {"post_id": post["post_id"], "post_content": content}))
+
+    packed.sort(key=lambda item: item[0])
+
+    dropped = len(posts) - len(packed)
+    if dropped:
+        logging.info(f"Prompt packer kept {len(packed)}/{len(posts)} posts ({used}/{token_budget} tokens)")
+    return [post for _, post in packed]
+
+def shard_posts(posts, shard_tokens, max_post_tokens=MAX_POST_TOKENS):
+    """
+    Split posts into consecutive shards that each fit a token budget.
+
+    Args:
+        posts (List[Dict]): Posts with post_id and post_content
+        shard_tokens (int): Maximum estimated tokens of the posts in one shard
+        max_post_tokens (int): Maximum tokens per post, as truncated by pack_posts
+
+    Returns:
+        List[List[Dict]]: Non-empty shards in the original post order
+    """
+    shards = []
+    current = []
+    used = 0
+    for post in posts:
+        content_tokens = min(estimate_tokens(post["post_content"]), max_post_tokens + 1)
+        tokens = content_tokens + estimate_tokens(post["post_id"]) + 4
+        if current and used + tokens > shard_tokens:
+            shards.append(current)
+            current = []
+            used = 0
+        current.append(post)
+        used += tokens
+    if current:
+        shards.append(current)
+    return shards
+
+def pack_discussions(discussions, token_budget):
+    """
+    Fit discussions into a token budget for the writer.
+
+    The budget is shared fairly: short discussions keep their full text and
+    the rest of the budget is split evenly among the longer ones, which are
+    truncated to their share.
+
+    Args:
+        discussions (List[Dict]): Discussions with title, text and permalink
+        token_budget (int): Tokens available for all discussions
+
+    Returns:
+        List[Dict]: Discussions with text truncated to fit
+    """
+    if not discussions:
+        return []
+
+    sizes = [
+        estimate_tokens(d.get("text", "")) + estimate_tokens(d.get("title", "")) + estimate_tokens(d.get("permalink", ""))
+        for d in discussions
+    ]
+
+    # Water-filling: grant small discussions what they need, split the rest
+    allowances = [0] * len(discussions)
+    remaining_budget = token_budget
+    remaining = sorted(range(len(discussions)), key=lambda i: sizes[i])
+    while remaining:
+        share = remaining_budget // len(remaining)
+        index = remaining[0]
+        if sizes[index] <= share:
+            allowances[index] = sizes[index]
+            remaining_budget -= sizes[index]
+            remaining.pop(0)
+        else:
+            for index in remaining:
+                allowances[index] = share
+            break
+
+    packed = []
+    for discussion, size, allowance in zip(discussions, sizes, allowances):
+        if size <= allowance:
+            packed.append(discussion)
+            continue
+        overhead = size - estimate_tokens(discussion.get("text", ""))
+        packed.append({
+            **discussion,
+            "text": truncate_to_tokens(discussion.get("text", ""), max(allowance - overhead, 0))
+        })
+    return packed
+
+def log_budget_usage(call_name, model_name, estimated_tokens, budget_tokens, actual_tokens=None):
+    """
+    Log how much of its prompt budget an LLM call used.
+
+    Args:
+        call_name (str): Name of the call (e.g. "post_selector")
+        model_name (str): Name of the model
+        estimated_tokens (int): Locally estimated prompt tokens
+        budget_tokens (int): Prompt token budget
+        actual_tokens (int, optional): Prompt tokens reported by the provider
+    """
+    usage = estimated_tokens / budget_tokens * 100 if budget_tokens else 0
+    message = f"Prompt budget [{call_name}] {model_name}: ~{estimated_tokens}/{budget_tokens} tokens ({usage:.0f}%)"
+    if actual_tokens:
+        message += f", provider reported {actual_tokens}"
+    logging.info(message)
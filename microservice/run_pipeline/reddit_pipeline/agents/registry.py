@@ -0,0 +1,98 @@
+"""
+Process-wide registry of LLM clients and chains shared by the agents.
+
+Each model and chain is built once and reused by every call, so client setup
+and HTTP connection pools are not recreated for every post group. LangChain
+chat models and runnables are safe to invoke from several threads at once.
+"""
+import logging
+import threading
+
+from langchain_openai import ChatOpenAI
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+_models = {}
+_chains = {}
+_lock = threading.Lock()
+
+def get_provider(model_name):
+    """
+    Get the LLM provider serving a model.
+
+    Args:
+        model_name (str): Name of the model
+
+    Returns:
+        str: "gemini" or "openai"
+    """
+    return "gemini" if "gemini" in model_name else "openai"
+
+def create_model(model_name, json_mode=False, **options):
+    """
+    Create a chat model client.
+
+    Args:
+        model_name (str): Name of the model
+        json_mode (bool): Make the provider return a valid JSON object
+            (Gemini's JSON response MIME type, OpenAI's JSON response format)
+        **options: Extra keyword arguments for the client
+
+    Returns:
+        BaseChatModel: New chat model
+    """
+    if get_provider(model_name) == "gemini":
+        if json_mode:
+            options["response_mime_type"] = "application/json"
+        return ChatGoogleGenerativeAI(temperature=0, model=model_name, **options)
+    if json_mode:
+        options["model_kwargs"] = {"response_format": {"type": "json_object"}}
+    return ChatOpenAI(model_name=model_name, **options)
+
+def get_model(model_name, **options):
+    """
+    Get the shared chat model client for a model and options.
+
+    Args:
+        model_name (str): Name of the model
+        **options: Options for create_model, such as json_mode (must be hashable)
+
+    Returns:
+        BaseChatModel: Chat model built on first use
+    """
+    key = (model_name, tuple(sorted(options.items())))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                logging.info(f"Creating LLM client for {model_name}")
+                model = create_model(model_name, **options)
+                _models[key] = model
+    return model
+
+def get_chain(name, model_name, build, **options):
+    """
+    Get a shared chain, building it on first use.
+
+    Chains must take all per-call values from their input, since the same
+    chain object serves every call.
+
+    Args:
+        name (str): Name of the chain (e.g. "post_selector")
+        model_name (str): Name of the model the chain runs on
+        build (callable): Called with the model to build the chain
+        **options: Options for create_model, such as json_mode
+
+    Returns:
+        Runnable: The chain
+    """
+    key = (name, model_name, tuple(sorted(options.items())))
+    chain = _chains.get(key)
+    if chain is None:
+        llm = get_model(model_name, **options)
+        with _lock:
+            chain = _chains.get(key)
+            if chain is None:
+                chain = build(llm)
+                _chains[key] = chain
+    return chain
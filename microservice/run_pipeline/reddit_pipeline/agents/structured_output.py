@@ -0,0 +1,348 @@
+"""
+Structured output parsing shared by the agents.
+
+Parses model responses into Pydantic models without failing the whole call
+on near-valid output: JSON is extracted and repaired locally first, and only
+the fragments that still fail validation are sent back to the model.
+"""
+import json
+import logging
+import os
+import re
+
+from pydantic import ValidationError
+
+from .registry import get_model
+from .llm_cache import record_llm_cache_keys, discard_llm_cache_entries
+
+# Use the provider's native JSON response mode where available
+STRUCTURED_OUTPUT_JSON_MODE = os.getenv("STRUCTURED_OUTPUT_JSON_MODE", "True").lower() == "true"
+
+# Rounds of fragment re-asks before a response is rejected
+STRUCTURED_OUTPUT_MAX_REASKS = int(os.getenv("STRUCTURED_OUTPUT_MAX_REASKS", 1))
+
+CLOSERS = {"{": "}", "[": "]"}
+
+fragment_reask_prompt = """You previously returned JSON that failed validation. Below is one fragment of that JSON, its location, the validation errors and the JSON schema of the whole response.
+Return ONLY the corrected JSON value for this fragment, with no explanation. Keep every valid value unchanged.
+
+Location: {path}
+Errors:
+{errors}
+
+Fragment:
+{fragment}
+
+Schema:
+{schema}"""
+
+def extract_json(text):
+    """
+    Get the JSON part of a model response.
+
+    Strips Markdown code fences and any text before the first object or array.
+
+    Args:
+        text (str): Model response
+
+    Returns:
+        str: Text starting at the first '{' or '['
+    """
+    fence = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.S)
+    if fence:
+        text = fence.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return text[min(starts):] if starts else text.strip()
+
+def _close(chars, stack, in_string):
+    """Complete a truncated JSON prefix by closing its open string and brackets."""
+    text = "".join(chars)
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(":"):
+        text += " null"
+    text = text.rstrip(",")
+    return text + "".join(CLOSERS[opener] for opener in reversed(stack))
+
+def repair_json(text):
+    """
+    Repair common defects of model-generated JSON in a single pass.
+
+    Fixes trailing commas, text after the top-level value and truncated
+    output (unterminated strings, missing closing brackets). When the last
+    entry of a truncated response cannot be completed it is dropped, so a
+    partial response still yields every complete item.
+
+    Args:
+        text (str): JSON text, starting at the first '{' or '['
+
+    Returns:
+        str: Repaired JSON text
+    """
+    chars = []
+    stack = []
+    in_string = False
+    escaped = False
+    cut_points = []  # (length of chars, stack) after each top-level-safe comma
+
+    for char in text:
+        if in_string:
+            chars.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                chars[-1] = "\\n"
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            # Drop a trailing comma before the closing bracket
+            while chars and chars[-1] in " \t\r\n":
+                chars.pop()
+            if chars and chars[-1] == ",":
+                chars.pop()
+                while cut_points and cut_points[-1][0] >= len(chars):
+                    cut_points.pop()
+            if stack:
+                stack.pop()
+            chars.append(char)
+            if not stack:
+                return "".join(chars)
+            continue
+        elif char == ",":
+            cut_points.append((len(chars), list(stack)))
+        chars.append(char)
+
+    candidate = _close(chars, stack, in_string)
+    try:
+        json.loads(candidate)
+        return candidate
+    except ValueError:
+        pass
+
+    # Drop incomplete trailing entries until the prefix closes cleanly
+    for length, cut_stack in reversed(cut_points):
+        candidate = _close(chars[:length], cut_stack, False)
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    return candidate
+
+class JsonStreamScanner:
+    """
+    Detects when a streamed response has completed its top-level JSON value.
+
+    Scans each chunk once, so a stream can be stopped as soon as the value
+    closes instead of waiting for trailing text.
+    """
+
+    def __init__(self):
+        """Initialize the scanner."""
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+
+    def feed(self, chunk):
+        """
+        Scan the next chunk of the response.
+
+        Args:
+            chunk (str): Next part of the response
+
+        Returns:
+            bool: True once the top-level object or array has closed
+        """
+        for char in chunk:
+            if self.complete:
+                break
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.started:
+                self.in_string = True
+            elif char in CLOSERS:
+                self.started = True
+                self.depth += 1
+            elif char in "}]" and self.started:
+                self.depth -= 1
+                self.complete = self.depth == 0
+        return self.complete
+
+def parse_json(text):
+    """
+    Parse a model response as JSON, repairing it if needed.
+
+    Args:
+        text (str): Model response
+
+    Returns:
+        Any: Parsed JSON value
+
+    Raises:
+        ValueError: If the response cannot be parsed even after repair
+    """
+    json_text = extract_json(text)
+    try:
+        return json.loads(json_text)
+    except ValueError:
+        pass
+
+    repaired = repair_json(json_text)
+    data = json.loads(repaired)
+    logging.info("Repaired malformed JSON in model response")
+    return data
+
+def _get_path(data, path):
+    """Get the value at a path of keys and indices, or None if missing."""
+    for key in path:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+def _set_path(data, path, value):
+    """Set the value at a path of keys and indices."""
+    for key in path[:-1]:
+        data = data[key]
+    data[path[-1]] = value
+
+def _fragment_path(error_loc, data):
+    """
+    Get the smallest fragment worth re-asking for a validation error.
+
+    List items are re-asked on their own, otherwise the top-level field.
+    """
+    loc = list(error_loc)
+    if len(loc) >= 2 and isinstance(loc[1], int) and isinstance(_get_path(data, loc[:1]), list):
+        return tuple(loc[:2])
+    return tuple(loc[:1])
+
+def _is_missing_content(error_item, data):
+    """
+    Check whether a validation error is about content the response lacks.
+
+    A missing or empty value (such as an empty list of sources) cannot be
+    fixed without the source material, unlike a malformed one.
+    """
+    if error_item["type"] == "missing" or error_item["type"].endswith("too_short"):
+        return True
+    return _get_path(data, error_item["loc"]) in (None, "", [], {})
+
+def reask_fragments(data, error, model_class, model_name):
+    """
+    Ask the model to fix only the fragments that failed validation.
+
+    Each malformed list item or top-level field is re-asked on its own with
+    the schema and error messages, instead of resending the whole prompt.
+    Fragments lacking required content are never re-asked, since the model
+    would have to invent it without the source material; such list items,
+    and items that still cannot be fixed, are dropped when the list has
+    other items. Anything else is left to fail validation.
+
+    Args:
+        data (dict): Parsed response
+        error (ValidationError): Validation error of the response
+        model_class (type): Pydantic model of the response
+        model_name (str): Name of the model to re-ask
+
+    Returns:
+        dict: Response with the fragments replaced
+    """
+    fragments = {}
+    lacking_content = set()
+    for item in error.errors():
+        path = _fragment_path(item["loc"], data)
+        if not path:
+            continue
+        fragments.setdefault(path, []).append(f"- {'.'.join(map(str, item['loc']))}: {item['msg']}")
+        if _is_missing_content(item, data):
+            lacking_content.add(path)
+
+    llm = get_model(model_name, json_mode=STRUCTURED_OUTPUT_JSON_MODE)
+    schema = json.dumps(model_class.model_json_schema())
+    dropped = []
+    for path, messages in fragments.items():
+        if path in lacking_content:
+            logging.warning(f"Fragment {'.'.join(map(str, path))} of {model_class.__name__} lacks required content, not re-asking it")
+            if len(path) == 2:
+                dropped.append(path)
+            continue
+
+        prompt = fragment_reask_prompt.format(
+            path=".".join(map(str, path)),
+            errors="\n".join(messages),
+            fragment=json.dumps(_get_path(data, path)),
+            schema=schema
+        )
+        with record_llm_cache_keys() as cache_keys:
+            try:
+                response = llm.invoke([("human", prompt)])
+                content = response.content if hasattr(response, "content") else str(response)
+                _set_path(data, path, parse_json(content))
+                logging.info(f"Re-asked fragment {'.'.join(map(str, path))} of {model_class.__name__}")
+            except Exception as e:
+                # Never serve the rejected fragment to the next re-ask
+                discard_llm_cache_entries(cache_keys)
+                logging.error(f"Error re-asking fragment {'.'.join(map(str, path))}: {str(e)}")
+                if len(path) == 2:
+                    dropped.append(path)
+
+    # Drop unfixable list items, highest index first so indices stay valid
+    for field, index in sorted(dropped, key=lambda path: -path[1]):
+        items = data.get(field)
+        if isinstance(items, list) and len(items) > 1:
+            del items[index]
+    return data
+
+def parse_structured(text, model_class, model_name, max_reasks=STRUCTURED_OUTPUT_MAX_REASKS):
+    """
+    Parse a model response into a Pydantic model.
+
+    The JSON is repaired locally if needed, a bare list is wrapped for models
+    with a single list field, and malformed fields are re-asked fragment by
+    fragment up to max_reasks times (see reask_fragments).
+
+    Args:
+        text (str): Model response
+        model_class (type): Pydantic model to parse into
+        model_name (str): Name of the model to re-ask
+        max_reasks (int): Maximum rounds of fragment re-asks
+
+    Returns:
+        BaseModel: Validated model instance
+
+    Raises:
+        ValueError: If the response is not JSON even after repair
+        ValidationError: If the response still fails validation after the re-asks
+    """
+    data = parse_json(text)
+
+    fields = list(model_class.model_fields)
+    if isinstance(data, list) and len(fields) == 1:
+        data = {fields[0]: data}
+
+    for attempt in range(max_reasks + 1):
+        try:
+            return model_class.model_validate(data)
+        except ValidationError as e:
+            if attempt == max_reasks or not isinstance(data, dict):
+                raise
+            logging.warning(f"{model_class.__name__} failed validation with {e.error_count()} errors, re-asking fragments")
+            data = reask_fragments(data, e, model_class, model_name)
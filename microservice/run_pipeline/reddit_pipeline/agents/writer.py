@@ -1,8 +1,10 @@
 
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import langchain
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableSequence
@@ -11,23 +13,51 @@ from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from .llm_cache import (
+    install_llm_cache,
+    llm_cache_bypass,
+    record_llm_cache_keys,
+    discard_llm_cache_entries
+)
+from .registry import get_model, get_chain, get_provider
+from .structured_output import parse_structured, JsonStreamScanner, STRUCTURED_OUTPUT_JSON_MODE
+from .prompt_packer import estimate_tokens, get_prompt_budget, pack_discussions, log_budget_usage
+
 load_dotenv()
 
 # Configure langchain settings
 langchain.verbose = False
 langchain.debug = False
-langchain.llm_cache = False
+
+# Answer repeated identical LLM calls from the persistent cache
+install_llm_cache()
 
 
 MODEL_NAME = "gemini-2.0-flash-lite"
 
-def choose_model(model_name):
-    if "gemini" in model_name:
-        llm = ChatGoogleGenerativeAI(temperature=0, model=MODEL_NAME)
-    else:
-        llm = ChatOpenAI(model_name=MODEL_NAME)
+# Maximum concurrent writer calls per LLM provider, shared by every pipeline in the process
+PROVIDER_MAX_CONCURRENCY = {
+    "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", 4)),
+    "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", 4)),
+}
+
+# Attempts per post group before it is left out of the issue
+WRITER_MAX_ATTEMPTS = int(os.getenv("WRITER_MAX_ATTEMPTS", 3))
+
+# Delay before the first retry of a group, doubled on every further retry
+WRITER_RETRY_BACKOFF_SECONDS = float(os.getenv("WRITER_RETRY_BACKOFF_SECONDS", 2))
+
+# Stream writer responses and stop reading once the topic's JSON closes.
+# LangChain's stream path does not consult the LLM cache, so this is opt-in.
+WRITER_STREAM = os.getenv("WRITER_STREAM", "False").lower() == "true"
 
-    return llm
+_provider_semaphores = {
+    provider: threading.BoundedSemaphore(max(1, limit))
+    for provider, limit in PROVIDER_MAX_CONCURRENCY.items()
+}
+
+def choose_model(model_name):
+    return get_model(model_name)
 
 
 # ================================
@@ -141,43 +171,107 @@ discussion_topics_prompt = ChatPromptTemplate.from_messages([
     ("human", "Focus: {focus}\nTheme: {theme}\n Tone: {tone}\n Selected discussions: {discussions}"),
 ])
 
+def build_writer_chain(llm):
+    """
+    Build the writer chain on a model.
+    """
+    return RunnableSequence(
+        {
+            "format_instructions": lambda x: x["format_instructions"],
+            "focus": lambda x: x["focus"],
+            "theme": lambda x: x["theme"],
+            "tone": lambda x: x["tone"],
+            "discussions": lambda x: x["discussions"]
+        } | discussion_topics_prompt | llm
+    )
+
 def parse_chain_output(llm_output, parser):
     """
     Parse the output of a chain.
+
+    Near-valid JSON is repaired locally and fields that fail validation are
+    re-asked on their own (see structured_output.parse_structured).
     """
     content = llm_output.content if hasattr(llm_output, 'content') else str(llm_output)
-    return parser.parse(content)
+    return parse_structured(content, parser.pydantic_object, MODEL_NAME)
+
+
+def stream_chain_output(chain, inputs):
+    """
+    Stream a chain's response until its top-level JSON value is complete.
+
+    Args:
+        chain (Runnable): Chain to stream
+        inputs (Dict): Chain inputs
+
+    Returns:
+        str: The streamed response text
+    """
+    scanner = JsonStreamScanner()
+    chunks = []
+    for chunk in chain.stream(inputs):
+        text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+        chunks.append(text)
+        if scanner.feed(text):
+            break
+    return "".join(chunks)
 
 
 # Then modify your function to use the new parser and return the result directly
-def write_summary(focus, theme, tone, discussions):
+def write_summary(focus, theme, tone, discussions, use_llm_cache=True):
     """
     Write a summary for a given focus, theme, and tone.
-    """
-    llm = choose_model(MODEL_NAME)
 
-    chain = RunnableSequence(
-        {
-            "format_instructions": lambda _: discussion_topic_parser.get_format_instructions(),
-            "focus": lambda x: x["focus"],
-            "theme": lambda x: x["theme"],
-            "tone": lambda x: x["tone"],
-            "discussions": lambda x: x["discussions"]
-        } | discussion_topics_prompt | llm
+    The discussions are packed into the model's prompt budget first, sharing
+    it fairly so one long thread cannot crowd out the others. An identical
+    prompt is answered from the LLM cache unless use_llm_cache is False.
+    """
+    format_instructions = discussion_topic_parser.get_format_instructions()
+
+    # Fit the discussions into what is left of the budget after the fixed prompt
+    budget = get_prompt_budget(MODEL_NAME)
+    fixed_prompt = discussion_topics_prompt.format(
+        format_instructions=format_instructions,
+        focus=focus,
+        theme=theme,
+        tone=tone,
+        discussions=""
     )
+    discussions = pack_discussions(discussions, budget - estimate_tokens(fixed_prompt))
+
+    chain = get_chain("writer", MODEL_NAME, build_writer_chain, json_mode=STRUCTURED_OUTPUT_JSON_MODE)
     
-    with get_openai_callback() as cb:
-        chain_output = chain.invoke(
-            {
-                "focus": focus,
-                "theme": theme,
-                "tone": tone,
-                "discussions": discussions
-            }
-        )
-
-    # Parse the output and keep the Pydantic model
-    discussion_topic = parse_chain_output(chain_output, discussion_topic_parser)
+    inputs = {
+        "format_instructions": format_instructions,
+        "focus": focus,
+        "theme": theme,
+        "tone": tone,
+        "discussions": discussions
+    }
+    with get_openai_callback() as cb, llm_cache_bypass(not use_llm_cache), record_llm_cache_keys() as cache_keys:
+        if WRITER_STREAM:
+            chain_output = stream_chain_output(chain, inputs)
+        else:
+            chain_output = chain.invoke(inputs)
+        # Fragment re-asks made while parsing are not part of the packed prompt
+        prompt_tokens = cb.prompt_tokens
+
+        # Parse the output and keep the Pydantic model. Parsing stays in the
+        # block so re-asks follow the bypass and are recorded too
+        try:
+            discussion_topic = parse_chain_output(chain_output, discussion_topic_parser)
+        except Exception:
+            # Never serve a rejected response to a retry or a later run
+            discard_llm_cache_entries(cache_keys)
+            raise
+
+    log_budget_usage(
+        "writer",
+        MODEL_NAME,
+        estimate_tokens(fixed_prompt) + estimate_tokens(str(discussions)),
+        budget,
+        prompt_tokens
+    )
 
     # Return the Pydantic model as a dict
     result = discussion_topic.model_dump()
@@ -188,4 +282,106 @@ def write_summary(focus, theme, tone, discussions):
     print(f"Total Cost (USD): ${cb.total_cost}")
     print("-"*100)
 
-    return result
\ No newline at end of file
+    return result
+
+def get_group_discussions(group):
+    """
+    Build the writer discussions of a post group.
+
+    Args:
+        group (Dict): Group with title and posts, as returned by get_comments_for_posts
+
+    Returns:
+        List[Dict]: Discussions with title, text and permalink
+    """
+    discussions = []
+    for post_with_comments in group.get("posts", []):
+        comments_data = post_with_comments.get("comments", {})
+        discussions.append({
+            "title": group.get("title", ""),
+            "text": comments_data.get("text", ""),
+            "permalink": comments_data.get("permalink", "")
+        })
+    return discussions
+
+def write_group_summary(group, focus, tone="Professional", use_llm_cache=True, cancel=None):
+    """
+    Write the summary of one post group, retrying failed LLM calls.
+
+    Each attempt holds a slot of the provider's concurrency cap only while
+    the LLM call runs, not while backing off.
+
+    Args:
+        group (Dict): Group with title and posts, as returned by get_comments_for_posts
+        focus (str): The focus topic
+        tone (str): The tone of the summary
+        use_llm_cache (bool): Reuse a cached response to an identical prompt
+        cancel (threading.Event, optional): Stops further attempts once set
+
+    Returns:
+        Dict: The discussion topic, or None if every attempt failed or it was cancelled
+    """
+    discussions = get_group_discussions(group)
+    if not discussions:
+        return None
+
+    semaphore = _provider_semaphores[get_provider(MODEL_NAME)]
+    for attempt in range(1, WRITER_MAX_ATTEMPTS + 1):
+        if cancel is not None and cancel.is_set():
+            return None
+        try:
+            with semaphore:
+                return write_summary(focus, group.get("title", ""), tone, discussions, use_llm_cache)
+        except Exception as e:
+            logging.error(f"Error writing group '{group.get('title', '')}' (attempt {attempt}/{WRITER_MAX_ATTEMPTS}): {str(e)}")
+            if attempt < WRITER_MAX_ATTEMPTS:
+                time.sleep(WRITER_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    return None
+
+def generate_content(posts_with_comments, focus, tone="Professional", use_llm_cache=True, on_topic=None, cancel=None):
+    """
+    Write the summaries of every post group of an issue concurrently.
+
+    Groups run in parallel, bounded by the provider's concurrency cap, so the
+    issue takes about as long as its slowest group. A failing group is retried
+    on its own and left out if it keeps failing. Each topic is handed to
+    on_topic as soon as it is written, so it can be published before the
+    rest of the issue is done. Once cancel is set, for example because the
+    run gave up on this attempt, no further LLM calls are made and finished
+    topics are no longer handed out.
+
+    Args:
+        posts_with_comments (List[Dict]): Groups with title and posts, as returned by get_comments_for_posts
+        focus (str): The focus topic
+        tone (str): The tone of the summaries
+        use_llm_cache (bool): Reuse cached responses to identical prompts
+        on_topic (callable, optional): Called with the group index and topic as
+            each topic completes, from the worker threads; errors are logged
+        cancel (threading.Event, optional): Set to stop writing
+
+    Returns:
+        List[Dict]: Discussion topics in the order of the groups
+    """
+    if not posts_with_comments:
+        return []
+
+    def write(index, group):
+        topic = write_group_summary(group, focus, tone, use_llm_cache, cancel)
+        if cancel is not None and cancel.is_set():
+            return None
+        if topic is not None and on_topic is not None:
+            try:
+                on_topic(index, topic)
+            except Exception as e:
+                logging.error(f"Error publishing topic '{topic.get('title', '')}': {str(e)}")
+        return topic
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=len(posts_with_comments)) as executor:
+        results = list(executor.map(write, range(len(posts_with_comments)), posts_with_comments))
+
+    content = [result for result in results if result is not None]
+    logging.info(
+        f"Wrote {len(content)}/{len(posts_with_comments)} groups in {time.time() - start_time:.1f}s"
+    )
+    return content
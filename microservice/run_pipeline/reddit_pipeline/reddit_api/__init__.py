@@ -1,19 +1,34 @@
 """
 Reddit Posts Fetcher Package
 
-This package provides functionality to fetch posts from Reddit subreddits
-using Reddit's official API with OAuth2 authentication.
+This package provides functionality to fetch posts and comments from Reddit
+subreddits using Reddit's official API with OAuth2 authentication.
 """
 
-from .auth import RedditAuth
+from .auth import RedditAuth, get_shared_auth
+from .cache import TTLCache
 from .client import RedditClient
 from .posts import SubredditPosts
+from .comments import PostComments
+from .comment_tree import CommentTree
+from .rate_limit import RateLimiter, get_rate_limiter, configure_rate_limiter
+from .session import get_session, configure_session, close_session
 from .utils import create_reddit_client, get_posts_from_env
 
 __all__ = [
     'RedditAuth',
+    'get_shared_auth',
     'RedditClient',
+    'TTLCache',
     'SubredditPosts',
+    'PostComments',
+    'CommentTree',
+    'RateLimiter',
+    'get_rate_limiter',
+    'configure_rate_limiter',
+    'get_session',
+    'configure_session',
+    'close_session',
     'create_reddit_client',
     'get_posts_from_env',
 ]
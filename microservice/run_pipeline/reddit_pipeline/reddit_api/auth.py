@@ -5,10 +5,16 @@ Reddit Authentication Module
 This module handles authentication with Reddit's API using OAuth2.
 """
 
+import os
+import json
 import time
+import hashlib
 import logging
+import threading
 import requests
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+from .session import get_session, DEFAULT_REQUEST_TIMEOUT
 
 # Configure logging
 logging.basicConfig(
@@ -23,13 +29,22 @@ class RedditAuth:
     # Reddit API endpoints
     AUTH_URL = "https://www.reddit.com/api/v1/access_token"
     
+    # Seconds before expiry at which the token is refreshed in the background
+    DEFAULT_REFRESH_MARGIN = 300
+
+    # Seconds to wait before retrying a failed background refresh
+    REFRESH_RETRY_INTERVAL = 30
+
     def __init__(
         self, 
         client_id: str, 
         client_secret: str, 
         user_agent: str,
         username: Optional[str] = None,
-        password: Optional[str] = None
+        password: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        token_cache_path: Optional[str] = None,
+        refresh_margin: Optional[float] = None
     ):
         """
         Initialize the Reddit authentication handler.
@@ -40,14 +55,26 @@ class RedditAuth:
             user_agent: User agent string for API requests
             username: Reddit username (optional, for script apps)
             password: Reddit password (optional, for script apps)
+            session: HTTP session to use (defaults to the shared pooled session)
+            token_cache_path: File to persist the token in across restarts (optional)
+            refresh_margin: Seconds before expiry to refresh the token in the
+                background (optional, None or 0 disables background refresh)
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.user_agent = user_agent
         self.username = username
         self.password = password
+        self.session = session
+        self.token_cache_path = token_cache_path
+        self.refresh_margin = refresh_margin
         self.token = None
         self.token_expiry = 0
+        self._lock = threading.Lock()
+        self._refresh_timer: Optional[threading.Timer] = None
+
+        if self.token_cache_path:
+            self._load_cached_token()
         
     def get_auth_headers(self) -> Dict[str, str]:
         """
@@ -56,16 +83,38 @@ class RedditAuth:
         Returns:
             Dict containing the authorization headers
         """
-        if not self.token or time.time() > self.token_expiry:
-            self._refresh_token()
+        if not self._token_valid():
+            with self._lock:
+                # Another caller may have refreshed while we waited for the lock
+                if not self._token_valid():
+                    self._refresh_token()
             
         return {
             "Authorization": f"Bearer {self.token}",
             "User-Agent": self.user_agent
         }
     
+    def close(self) -> None:
+        """Cancel any scheduled background refresh."""
+        with self._lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+
+    def _token_valid(self, margin: float = 0) -> bool:
+        """
+        Check whether the current token is usable.
+
+        Args:
+            margin: Seconds the token must remain valid for
+
+        Returns:
+            True if a token is held and does not expire within the margin
+        """
+        return bool(self.token) and time.time() + margin < self.token_expiry
+
     def _refresh_token(self) -> None:
-        """Refresh the OAuth token."""
+        """Refresh the OAuth token. Caller must hold self._lock."""
         auth = (self.client_id, self.client_secret)
         
         if self.username and self.password:
@@ -82,11 +131,13 @@ class RedditAuth:
         headers = {"User-Agent": self.user_agent}
         
         try:
-            response = requests.post(
+            http = self.session or get_session()
+            response = http.post(
                 self.AUTH_URL, 
                 auth=auth, 
                 data=data, 
-                headers=headers
+                headers=headers,
+                timeout=DEFAULT_REQUEST_TIMEOUT
             )
             response.raise_for_status()
             
@@ -100,3 +151,147 @@ class RedditAuth:
         except requests.RequestException as e:
             logger.error(f"Failed to refresh token: {str(e)}")
             raise
+
+        if self.token_cache_path:
+            self._save_cached_token()
+        self._schedule_refresh(self.token_expiry - self.refresh_margin - time.time() if self.refresh_margin else None)
+
+    def _schedule_refresh(self, delay: Optional[float]) -> None:
+        """
+        Schedule a background token refresh. Caller must hold self._lock.
+
+        Args:
+            delay: Seconds until the refresh, or None to cancel any pending refresh
+        """
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+        if delay is None:
+            return
+
+        self._refresh_timer = threading.Timer(max(delay, 0), self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self) -> None:
+        """Refresh the token ahead of expiry so callers never block on it."""
+        with self._lock:
+            # Skip if the token was already refreshed on demand
+            if self._token_valid(margin=self.refresh_margin):
+                return
+            try:
+                self._refresh_token()
+            except Exception as e:
+                logger.warning(f"Background token refresh failed: {str(e)}")
+                # Retry while the current token is still usable; after that
+                # the next get_auth_headers() call refreshes on demand
+                if self._token_valid(margin=self.REFRESH_RETRY_INTERVAL):
+                    self._schedule_refresh(self.REFRESH_RETRY_INTERVAL)
+
+    def _cache_key(self) -> str:
+        """
+        Get the key identifying this credential set in the token cache file.
+
+        Returns:
+            Hex digest of the client ID and username (secrets are not stored)
+        """
+        identity = f"{self.client_id}:{self.username or ''}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _read_cache_file(self) -> Dict[str, Dict]:
+        """
+        Read the token cache file.
+
+        Returns:
+            Mapping of cache keys to token entries (empty if unreadable)
+        """
+        try:
+            with open(self.token_cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load_cached_token(self) -> None:
+        """Load a still-valid token from the token cache file, if present."""
+        entry = self._read_cache_file().get(self._cache_key())
+        if not entry:
+            return
+
+        token = entry.get("access_token")
+        expiry = entry.get("expires_at", 0)
+        if token and time.time() < expiry:
+            self.token = token
+            self.token_expiry = expiry
+            logger.info("Loaded cached Reddit API token")
+            with self._lock:
+                self._schedule_refresh(self.token_expiry - self.refresh_margin - time.time() if self.refresh_margin else None)
+
+    def _save_cached_token(self) -> None:
+        """Write the current token to the token cache file."""
+        try:
+            data = self._read_cache_file()
+            data[self._cache_key()] = {
+                "access_token": self.token,
+                "expires_at": self.token_expiry
+            }
+
+            directory = os.path.dirname(os.path.abspath(self.token_cache_path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.token_cache_path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.token_cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist Reddit API token: {str(e)}")
+
+
+_shared_auths: Dict[Tuple, RedditAuth] = {}
+_shared_auths_lock = threading.Lock()
+
+
+def get_shared_auth(
+    client_id: str,
+    client_secret: str,
+    user_agent: str,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    token_cache_path: Optional[str] = None,
+    refresh_margin: Optional[float] = RedditAuth.DEFAULT_REFRESH_MARGIN
+) -> RedditAuth:
+    """
+    Get the process-wide RedditAuth for a credential set.
+
+    Every caller with the same credentials shares one RedditAuth, so a token
+    is fetched once per process and refreshed in the background before it
+    expires instead of once per pipeline run.
+
+    Args:
+        client_id: Reddit API client ID
+        client_secret: Reddit API client secret
+        user_agent: User agent string for API requests
+        username: Reddit username (optional, for script apps)
+        password: Reddit password (optional, for script apps)
+        token_cache_path: File to persist the token in across restarts (optional)
+        refresh_margin: Seconds before expiry to refresh the token in the background
+
+    Returns:
+        Shared RedditAuth instance
+    """
+    key = (client_id, client_secret, user_agent, username, password)
+    with _shared_auths_lock:
+        auth = _shared_auths.get(key)
+        if auth is None:
+            auth = RedditAuth(
+                client_id,
+                client_secret,
+                user_agent,
+                username=username,
+                password=password,
+                token_cache_path=token_cache_path,
+                refresh_margin=refresh_margin
+            )
+            _shared_auths[key] = auth
+    return auth
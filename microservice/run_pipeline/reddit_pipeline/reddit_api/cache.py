@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Reddit Response Cache Module
+
+This module provides a thread-safe in-memory cache with per-entry TTLs,
+LRU eviction bounded by an approximate memory budget, coalescing of
+concurrent loads for the same key, and hit/miss counters.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Lookup outcomes reported by TTLCache.fetch()
+HIT = "hit"
+COALESCED = "coalesced"
+MISS = "miss"
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a JSON-like value.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Approximate size in bytes (length of its JSON encoding)
+    """
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class _Entry:
+    """A cached value with its expiry time and estimated size."""
+
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class _PendingLoad:
+    """A load in progress that concurrent callers can wait on."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    In-memory cache with TTL expiry, memory-bounded LRU eviction and
+    in-flight request coalescing.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: float = 300,
+        sizeof: Callable[[Any], int] = estimate_size,
+        name: str = "cache"
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Approximate memory budget for cached values
+            default_ttl: TTL in seconds used when none is given
+            sizeof: Function estimating the size of a value in bytes
+            name: Name used in log messages and stats
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sizeof = sizeof
+        self.name = name
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._pending: Dict[Hashable, _PendingLoad] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def fetch(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None
+    ) -> Tuple[Any, str]:
+        """
+        Get a value, loading it on a miss.
+
+        If another caller is already loading the same key, this call waits for
+        that load instead of starting a second one. Exceptions raised by the
+        loader are propagated to every waiting caller and nothing is cached.
+
+        Args:
+            key: Cache key
+            loader: Function returning the value on a miss
+            ttl: TTL in seconds for a newly loaded value
+
+        Returns:
+            Tuple of (value, outcome) where outcome is HIT, COALESCED or MISS
+        """
+        with self._lock:
+            entry = self._get_locked(key)
+            if entry is not None:
+                self.hits += 1
+                return entry.value, HIT
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                pending = _PendingLoad()
+                self._pending[key] = pending
+                owner = True
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value, COALESCED
+
+        try:
+            value = loader()
+        except BaseException as e:
+            pending.error = e
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.event.set()
+            raise
+
+        pending.value = value
+        with self._lock:
+            self._pending.pop(key, None)
+            self._set_locked(key, value, ttl)
+        pending.event.set()
+        return value, MISS
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Get a value, loading it on a miss.
+
+        Args:
+            key: Cache key
+            loader: Function returning the value on a miss
+            ttl: TTL in seconds for a newly loaded value
+
+        Returns:
+            The cached or loaded value
+        """
+        return self.fetch(key, loader, ttl)[0]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value without loading it.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._get_locked(key)
+            return entry.value if entry is not None else default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: TTL in seconds (defaults to default_ttl)
+        """
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Remove a value if present.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with entry count, memory use and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+    def _get_locked(self, key: Hashable) -> Optional[_Entry]:
+        """Get a live entry and mark it recently used. Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self._bytes -= entry.size
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        """Store an entry and evict least recently used ones. Caller must hold the lock."""
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            logger.warning(f"{self.name}: value of {size} bytes exceeds cache budget, not caching")
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = _Entry(value, expires_at, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
@@ -5,12 +5,13 @@ Reddit Client Module
 This module provides a client for interacting with Reddit's API.
 """
 
-import time
 import logging
 import requests
 from typing import Dict, Optional, Any
 
 from .auth import RedditAuth
+from .rate_limit import RateLimiter, get_rate_limiter
+from .session import get_session, DEFAULT_REQUEST_TIMEOUT
 
 # Configure logging
 logging.basicConfig(
@@ -25,16 +26,29 @@ class RedditClient:
     # Reddit API base URL
     BASE_URL = "https://oauth.reddit.com"
     
-    def __init__(self, auth: RedditAuth):
+    # Number of times a request is retried after a 429 response
+    MAX_RATE_LIMIT_RETRIES = 2
+    
+    def __init__(
+        self,
+        auth: RedditAuth,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT
+    ):
         """
         Initialize the Reddit client.
         
         Args:
             auth: RedditAuth instance for authentication
+            session: HTTP session to use (defaults to the shared pooled session)
+            rate_limiter: Rate limiter to use (defaults to the process-wide limiter)
+            timeout: Seconds to wait for each request before it fails
         """
         self.auth = auth
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # Minimum time between requests (seconds)
+        self.session = session
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.timeout = timeout
         
     def make_request(
         self, 
@@ -46,6 +60,10 @@ class RedditClient:
         """
         Make a request to the Reddit API with rate limiting.
         
+        Requests go through the shared adaptive rate limiter and are retried
+        after a back-off when Reddit responds with 429 Too Many Requests.
+        Each request fails after the client's timeout.
+        
         Args:
             endpoint: API endpoint to request
             method: HTTP method (GET, POST, etc.)
@@ -55,23 +73,28 @@ class RedditClient:
         Returns:
             JSON response as a dictionary
         """
-        # Implement simple rate limiting
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-            
         url = f"{self.BASE_URL}{endpoint}"
-        headers = self.auth.get_auth_headers()
+        http = self.session or get_session()
+        
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
         try:
-            self.last_request_time = time.time()
-            
-            if method.upper() == "GET":
-                response = requests.get(url, headers=headers, params=params)
-            elif method.upper() == "POST":
-                response = requests.post(url, headers=headers, params=params, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                self.rate_limiter.acquire()
+                headers = self.auth.get_auth_headers()
+                
+                if method.upper() == "GET":
+                    response = http.get(url, headers=headers, params=params, timeout=self.timeout)
+                else:
+                    response = http.post(url, headers=headers, params=params, json=data, timeout=self.timeout)
+                
+                self.rate_limiter.update_from_headers(response.headers)
+                
+                if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    break
+                
+                self.rate_limiter.penalize(self._retry_after(response))
                 
             response.raise_for_status()
             return response.json()
@@ -81,3 +104,21 @@ class RedditClient:
             if hasattr(e.response, 'text'):
                 logger.error(f"Response: {e.response.text}")
             raise
+    
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        """
+        Get the number of seconds to wait after a 429 response.
+        
+        Args:
+            response: The rate limited response
+            
+        Returns:
+            Seconds to wait before retrying
+        """
+        for header in ("Retry-After", "X-Ratelimit-Reset"):
+            try:
+                return max(float(response.headers[header]), 1.0)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return 60.0
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Reddit Comment Tree Module
+
+This module provides a compact, array-backed comment tree that can be pruned
+by score, depth, fan-out and size and serialized to a minimal text form for
+LLM prompts.
+"""
+
+import heapq
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class CommentTree:
+    """
+    Comment tree stored as parallel arrays in depth-first order.
+
+    Node i has ids[i], parents[i] (index of its parent, -1 for top-level
+    comments), scores[i], depths[i] and bodies[i].
+    """
+
+    __slots__ = ("ids", "parents", "scores", "depths", "bodies")
+
+    def __init__(self):
+        """Initialize an empty tree."""
+        self.ids: List[str] = []
+        self.parents: List[int] = []
+        self.scores: List[int] = []
+        self.depths: List[int] = []
+        self.bodies: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_comments(cls, comments: Iterable[Dict[str, Any]]) -> "CommentTree":
+        """
+        Build a tree from flat, depth-first comments as returned by PostComments.
+
+        Parents are resolved from depth rather than parent_id, so replies to a
+        deleted comment attach to its nearest surviving ancestor.
+
+        Args:
+            comments: Comments with id, score, depth and body
+
+        Returns:
+            CommentTree instance
+        """
+        tree = cls()
+        stack: List[int] = []  # Index of the latest node at each depth
+        for comment in comments:
+            depth = comment.get("depth", 0)
+            del stack[depth:]
+            parent = stack[-1] if stack else -1
+
+            index = len(tree.ids)
+            tree.ids.append(comment.get("id") or "")
+            tree.parents.append(parent)
+            tree.scores.append(comment.get("score", 0) or 0)
+            tree.depths.append(len(stack))
+            tree.bodies.append(" ".join((comment.get("body") or "").split()))
+            stack.append(index)
+        return tree
+
+    def children(self) -> List[List[int]]:
+        """
+        Get the child indices of every node.
+
+        Returns:
+            List where item i holds the children of node i, with one extra
+            final item holding the top-level comments
+        """
+        children: List[List[int]] = [[] for _ in range(len(self.ids) + 1)]
+        for index, parent in enumerate(self.parents):
+            children[parent].append(index)
+        return children
+
+    def line_length(self, index: int) -> int:
+        """
+        Get the length of a node's line in the text form, including the newline.
+
+        Args:
+            index: Node index
+
+        Returns:
+            Number of characters
+        """
+        return 2 * self.depths[index] + len(str(self.scores[index])) + 3 + len(self.bodies[index]) + 1
+
+    def prune(
+        self,
+        min_score: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        top_k_children: Optional[int] = None,
+        char_budget: Optional[int] = None
+    ) -> "CommentTree":
+        """
+        Get a pruned copy of the tree.
+
+        A comment is kept only if its parent is kept. Within the char budget
+        comments are added best-first (highest score among those whose parent
+        is already included), so the budget is spent on the most upvoted
+        threads rather than on whatever comes first.
+
+        Args:
+            min_score: Drop comments scoring below this
+            max_depth: Drop comments at this depth or deeper (0 = top-level)
+            top_k_children: Keep only the highest scoring k replies of each comment
+                (and the k highest scoring top-level comments)
+            char_budget: Maximum length of the text form
+
+        Returns:
+            New CommentTree with the kept comments in depth-first order
+        """
+        children = self.children()
+
+        # Top-k highest scoring children of every node that pass the filters
+        eligible: List[List[int]] = []
+        for siblings in children:
+            kept = [
+                i for i in siblings
+                if (min_score is None or self.scores[i] >= min_score)
+                and (max_depth is None or self.depths[i] < max_depth)
+            ]
+            if top_k_children is not None:
+                kept = sorted(kept, key=lambda i: -self.scores[i])[:top_k_children]
+            eligible.append(kept)
+
+        # Best-first expansion from the top-level comments
+        included = set()
+        remaining = char_budget
+        heap = [(-self.scores[i], i) for i in eligible[-1]]
+        heapq.heapify(heap)
+        while heap:
+            _, index = heapq.heappop(heap)
+            if remaining is not None:
+                length = self.line_length(index)
+                if length > remaining:
+                    continue
+                remaining -= length
+            included.add(index)
+            for child in eligible[index]:
+                heapq.heappush(heap, (-self.scores[child], child))
+
+        pruned = CommentTree()
+        new_index: Dict[int, int] = {}
+        for index in sorted(included):
+            new_index[index] = len(pruned.ids)
+            pruned.ids.append(self.ids[index])
+            pruned.parents.append(new_index.get(self.parents[index], -1))
+            pruned.scores.append(self.scores[index])
+            pruned.depths.append(self.depths[index])
+            pruned.bodies.append(self.bodies[index])
+        return pruned
+
+    def to_text(self) -> str:
+        """
+        Serialize the tree to a minimal indented text form.
+
+        Each comment is one line: two spaces per depth level, its score in
+        brackets, then its body with whitespace collapsed.
+
+        Returns:
+            Text representation of the tree
+        """
+        return "\n".join(
+            f"{'  ' * self.depths[i]}[{self.scores[i]}] {self.bodies[i]}"
+            for i in range(len(self.ids))
+        )
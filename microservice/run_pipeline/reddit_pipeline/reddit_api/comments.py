@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Reddit Comments Module
+
+This module provides functionality to fetch the comment tree of a Reddit post
+and flatten it into a compact structure.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+from .client import RedditClient
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class PostComments:
+    """Handles fetching and processing the comments of a post."""
+
+    # Comment bodies that carry no content
+    REMOVED_BODIES = ("[deleted]", "[removed]")
+
+    def __init__(self, client: RedditClient):
+        """
+        Initialize the post comments handler.
+
+        Args:
+            client: RedditClient instance
+        """
+        self.client = client
+
+    def get_comments(
+        self,
+        post_id: str,
+        subreddit: Optional[str] = None,
+        depth: int = 5,
+        limit: int = 100,
+        sort: str = "top"
+    ) -> Dict[str, Any]:
+        """
+        Get a post and its comment tree.
+
+        Args:
+            post_id: ID of the post, with or without the t3_ prefix
+            subreddit: Name of the subreddit (without r/, optional)
+            depth: Maximum depth of the comment tree
+            limit: Maximum number of comments to retrieve (max 500)
+            sort: Sort method ('confidence', 'top', 'new', 'controversial', 'old', 'qa')
+
+        Returns:
+            Dictionary with the processed 'post' and a flat, depth-first list of
+            'comments' (each with id, parent_id, score, depth and body)
+        """
+        # Validate parameters
+        if limit > 500:
+            logger.warning("Limit exceeds maximum of 500, setting to 500")
+            limit = 500
+
+        valid_sorts = ["confidence", "top", "new", "controversial", "old", "qa"]
+        if sort not in valid_sorts:
+            raise ValueError(f"Invalid sort method. Must be one of: {', '.join(valid_sorts)}")
+
+        if post_id.startswith("t3_"):
+            post_id = post_id[3:]
+
+        # Build request parameters
+        params = {
+            "depth": depth,
+            "limit": limit,
+            "sort": sort,
+            "raw_json": 1,
+        }
+
+        # Make the request
+        endpoint = f"/r/{subreddit}/comments/{post_id}" if subreddit else f"/comments/{post_id}"
+        response = self.client.make_request(endpoint, params=params)
+
+        # The response is a pair of listings: the post, then its comments
+        if not isinstance(response, list) or len(response) < 2:
+            raise ValueError(f"Unexpected comments response for post {post_id}")
+
+        post_children = response[0].get("data", {}).get("children", [])
+        post_data = post_children[0].get("data", {}) if post_children else {}
+
+        comments: List[Dict[str, Any]] = []
+        self._flatten(response[1].get("data", {}).get("children", []), 0, depth, comments)
+
+        return {
+            "post": self._process_post(post_data),
+            "comments": comments,
+        }
+
+    def _flatten(
+        self,
+        children: List[Dict[str, Any]],
+        level: int,
+        max_depth: int,
+        comments: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Append comments to a list in depth-first order.
+
+        Args:
+            children: Raw listing children at this level
+            level: Depth of the children (0 for top-level comments)
+            max_depth: Maximum depth to include
+            comments: List the processed comments are appended to
+        """
+        if level >= max_depth:
+            return
+
+        for child in children:
+            # Skip "load more comments" stubs
+            if child.get("kind") != "t1":
+                continue
+
+            comment_data = child.get("data", {})
+            body = comment_data.get("body", "")
+
+            if body and body not in self.REMOVED_BODIES:
+                comments.append({
+                    "id": comment_data.get("id"),
+                    "parent_id": comment_data.get("parent_id"),
+                    "score": comment_data.get("score", 0),
+                    "depth": level,
+                    "body": body,
+                })
+
+            # Replies are an empty string when there are none
+            replies = comment_data.get("replies")
+            if isinstance(replies, dict):
+                self._flatten(replies.get("data", {}).get("children", []), level + 1, max_depth, comments)
+
+    def _process_post(self, post_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a raw post into the fields needed alongside its comments.
+
+        Args:
+            post_data: Raw post data from the API
+
+        Returns:
+            Processed post dictionary
+        """
+        return {
+            "id": post_data.get("id"),
+            "subreddit": post_data.get("subreddit"),
+            "title": post_data.get("title"),
+            "selftext": post_data.get("selftext", ""),
+            "score": post_data.get("score", 0),
+            "num_comments": post_data.get("num_comments", 0),
+            "permalink": post_data.get("permalink"),
+        }
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Reddit Rate Limiting Module
+
+This module provides a thread-safe token-bucket rate limiter that adapts to
+the X-Ratelimit-* headers returned by Reddit's API.
+"""
+
+import time
+import logging
+import threading
+from typing import Mapping, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Reddit's documented OAuth quota, used until the first response headers arrive
+DEFAULT_REQUESTS_PER_WINDOW = 60
+DEFAULT_WINDOW_SECONDS = 60.0
+DEFAULT_BURST = 10
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter driven by Reddit's rate limit headers.
+
+    The bucket holds up to ``burst`` tokens and refills at the rate that
+    spreads the remaining server quota evenly over the rest of the current
+    window. While plenty of quota is left requests go out back to back; as
+    it runs low the refill rate drops so requests are spaced just enough to
+    last until the window resets. Once the server reports no quota left,
+    callers wait for the reset.
+
+    Waiting is done by reservation: each call takes a token (the balance may
+    go negative) under the lock and sleeps outside it, so concurrent callers
+    are queued fairly without holding the lock while sleeping.
+    """
+
+    def __init__(
+        self,
+        requests_per_window: int = DEFAULT_REQUESTS_PER_WINDOW,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        burst: int = DEFAULT_BURST
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_window: Requests allowed per window before headers are seen
+            window_seconds: Length of the quota window in seconds
+            burst: Maximum number of requests sent back to back
+        """
+        self.default_rate = requests_per_window / window_seconds
+        self.burst = burst
+        self.rate = self.default_rate
+        self.tokens = float(burst)
+        self.remaining: Optional[float] = None  # Server-reported quota left in the window
+        self.reset_at = 0.0  # Monotonic time at which the server quota resets
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.remaining is not None and now >= self.reset_at:
+                # The server window rolled over; fall back to the default quota
+                self.remaining = None
+                self.rate = self.default_rate
+
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+            if self.remaining is not None:
+                self.remaining -= 1
+                if self.remaining < 0:
+                    wait = max(wait, self.reset_at - now)
+
+        if wait > 0:
+            logger.debug(f"Rate limiter waiting {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adjust the limiter using Reddit's rate limit response headers.
+
+        Args:
+            headers: Response headers containing X-Ratelimit-Remaining and
+                X-Ratelimit-Reset
+        """
+        try:
+            remaining = float(headers["X-Ratelimit-Remaining"])
+            reset = float(headers["X-Ratelimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.remaining = remaining
+            self.reset_at = now + reset
+            if remaining >= 1 and reset > 0:
+                self.rate = remaining / reset
+            else:
+                self.rate = self.default_rate
+            # Never hold more tokens than the server will honour
+            self.tokens = min(self.tokens, remaining)
+
+    def penalize(self, retry_after: float) -> None:
+        """
+        Stop sending requests for a while after a 429 response.
+
+        Args:
+            retry_after: Seconds to wait before the next request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, now + retry_after)
+            self.tokens = min(self.tokens, 0.0)
+        logger.warning(f"Rate limited by Reddit, backing off for {retry_after:.1f}s")
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last refill. Caller must hold the lock."""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the rate limiter shared by every RedditClient in the process.
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def configure_rate_limiter(
+    requests_per_window: int = DEFAULT_REQUESTS_PER_WINDOW,
+    window_seconds: float = DEFAULT_WINDOW_SECONDS,
+    burst: int = DEFAULT_BURST
+) -> RateLimiter:
+    """
+    Replace the shared rate limiter with one using the given settings.
+
+    Args:
+        requests_per_window: Requests allowed per window before headers are seen
+        window_seconds: Length of the quota window in seconds
+        burst: Maximum number of requests sent back to back
+
+    Returns:
+        The new shared RateLimiter instance
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = RateLimiter(requests_per_window, window_seconds, burst)
+    return _rate_limiter
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Reddit HTTP Session Module
+
+This module manages the pooled, keep-alive HTTP session shared by every
+Reddit API client in the process.
+"""
+
+import atexit
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Default connection pool settings
+DEFAULT_POOL_CONNECTIONS = 10  # Number of per-host pools to keep
+DEFAULT_POOL_MAXSIZE = 20  # Maximum connections kept alive per host
+DEFAULT_POOL_BLOCK = True  # Wait for a free connection instead of opening extra ones
+
+# Seconds to wait for a connection or response before a request fails; with
+# pool_block a hung request would otherwise hold its connection forever
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_settings = {
+    "pool_connections": DEFAULT_POOL_CONNECTIONS,
+    "pool_maxsize": DEFAULT_POOL_MAXSIZE,
+    "pool_block": DEFAULT_POOL_BLOCK,
+}
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = DEFAULT_POOL_BLOCK
+) -> requests.Session:
+    """
+    Create a requests session backed by a keep-alive connection pool.
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept per host
+        pool_block: Whether to block when a host's pool is exhausted
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def configure_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None
+) -> None:
+    """
+    Update the settings used for the shared session.
+
+    The current session (if any) is closed so the next call to
+    get_session() builds a new pool with the updated settings.
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept per host
+        pool_block: Whether to block when a host's pool is exhausted
+    """
+    with _session_lock:
+        if pool_connections is not None:
+            _pool_settings["pool_connections"] = pool_connections
+        if pool_maxsize is not None:
+            _pool_settings["pool_maxsize"] = pool_maxsize
+        if pool_block is not None:
+            _pool_settings["pool_block"] = pool_block
+        _close_locked()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide pooled session, creating it on first use.
+
+    Returns:
+        Shared requests.Session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(**_pool_settings)
+                logger.info(
+                    f"Created Reddit HTTP session pool "
+                    f"(pool_connections={_pool_settings['pool_connections']}, "
+                    f"pool_maxsize={_pool_settings['pool_maxsize']})"
+                )
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and release its pooled connections."""
+    with _session_lock:
+        _close_locked()
+
+
+def _close_locked() -> None:
+    """Close the shared session. Caller must hold _session_lock."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+        logger.info("Closed Reddit HTTP session pool")
+
+
+atexit.register(close_session)
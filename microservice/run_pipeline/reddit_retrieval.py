@@ -4,13 +4,54 @@ Reddit retrieval module for the pipeline.
 import logging
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to sys.path to import the reddit_api module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from run_pipeline.reddit_pipeline.reddit_api.client import RedditClient
-from run_pipeline.reddit_pipeline.reddit_api.auth import RedditAuth
+from run_pipeline.reddit_pipeline.reddit_api.auth import get_shared_auth
+from run_pipeline.reddit_pipeline.reddit_api.session import configure_session
+from run_pipeline.reddit_pipeline.reddit_api.rate_limit import configure_rate_limiter
+from run_pipeline.reddit_pipeline.reddit_api.cache import TTLCache
+from near_duplicates import collapse_near_duplicates
 import config
 
+# Size the shared keep-alive connection pool used by every Reddit client
+configure_session(
+    pool_connections=config.REDDIT_POOL_CONNECTIONS,
+    pool_maxsize=config.REDDIT_POOL_MAXSIZE
+)
+
+# Rate limiter shared by every Reddit client in the process
+configure_rate_limiter(
+    requests_per_window=config.REDDIT_RATE_LIMIT_REQUESTS,
+    window_seconds=config.REDDIT_RATE_LIMIT_WINDOW_SECONDS,
+    burst=config.REDDIT_RATE_LIMIT_BURST
+)
+
+# Subreddit listings shared across pipelines, keyed by (subreddit, sort, time_filter, limit)
+listing_cache = TTLCache(
+    max_bytes=config.LISTING_CACHE_MAX_BYTES,
+    default_ttl=config.LISTING_CACHE_TTLS['day'],
+    name='listing_cache'
+)
+
+def get_reddit_client():
+    """
+    Get a Reddit client backed by the process-wide OAuth token.
+    
+    Returns:
+        RedditClient: Reddit client instance
+    """
+    auth = get_shared_auth(
+        client_id=config.REDDIT_CLIENT_ID,
+        client_secret=config.REDDIT_CLIENT_SECRET,
+        user_agent=config.REDDIT_USER_AGENT,
+        token_cache_path=config.REDDIT_TOKEN_CACHE_PATH,
+        refresh_margin=config.REDDIT_TOKEN_REFRESH_MARGIN
+    )
+    return RedditClient(auth, timeout=config.REDDIT_REQUEST_TIMEOUT_SECONDS)
+
 def get_time_filter(schedule):
     """
     Convert schedule to Reddit time filter.
@@ -30,10 +71,25 @@ def get_time_filter(schedule):
     else:
         return 'day'  # Default to day
 
+def get_listing_ttl(time_filter):
+    """
+    Get how long a listing for the given time filter stays cached.
+    
+    Args:
+        time_filter (str): Time filter (hour, day, week, month, year, all)
+        
+    Returns:
+        int: TTL in seconds
+    """
+    return config.LISTING_CACHE_TTLS.get(time_filter, config.LISTING_CACHE_TTLS['day'])
+
 def get_top_posts(reddit_client, subreddit, time_filter='day', limit=25):
     """
     Get top posts from a subreddit.
     
+    Listings are served from the process-wide listing cache, so pipelines
+    sharing a subreddit within the TTL reuse a single fetch.
+    
     Args:
         reddit_client (RedditClient): Reddit client instance
         subreddit (str): Subreddit name
@@ -41,9 +97,9 @@ def get_top_posts(reddit_client, subreddit, time_filter='day', limit=25):
         limit (int): Maximum number of posts to retrieve
         
     Returns:
-        list: List of post data
+        list: List of post data (shared with the cache, do not modify)
     """
-    try:
+    def fetch_listing():
         # Construct the API endpoint
         endpoint = f"/r/{subreddit}/top"
         
@@ -63,44 +119,180 @@ def get_top_posts(reddit_client, subreddit, time_filter='day', limit=25):
             posts.append(post_data)
             
         return posts
+    
+    try:
+        key = (subreddit.lower(), 'top', time_filter, limit)
+        return listing_cache.get_or_set(key, fetch_listing, ttl=get_listing_ttl(time_filter))
     except Exception as e:
         logging.error(f"Error getting top posts from r/{subreddit}: {str(e)}")
         return []
 
-def retrieve_reddit_posts(subreddits, schedule, comment_threshold=10):
+def format_post(post):
+    """
+    Format a raw Reddit post into the structure used by the pipeline.
+    
+    Args:
+        post (dict): Raw post data from the Reddit API
+        
+    Returns:
+        dict: Formatted post data
+    """
+    return {
+        "subreddit": post.get('subreddit', ''),
+        "score": post.get('score', 0),
+        "subreddit_id": post.get('subreddit_id', ''),
+        "num_comments": post.get('num_comments', 0),
+        "permalink": post.get('permalink', ''),
+        "created_utc": post.get('created_utc', 0),
+        "post_id": post.get('name', ''),  # 'name' field contains the post ID (e.g., t3_1jb1eez)
+        "post_content": f"{post.get('title', '')}\n{post.get('selftext', '')}"
+    }
+
+def get_subreddit_posts(reddit_client, subreddit, time_filter, comment_threshold, listings=None):
+    """
+    Retrieve and format the top posts of a single subreddit.
+    
+    Args:
+        reddit_client (RedditClient): Reddit client instance
+        subreddit (str): Subreddit name
+        time_filter (str): Time filter (day, week, month, year, all)
+        comment_threshold (int): Minimum number of comments required
+        listings (dict, optional): Prefetched listings from fetch_listings()
+        
+    Returns:
+        list: List of formatted post data
+    """
+    try:
+        listing_key = (subreddit.lower(), time_filter)
+        if listings is not None and listing_key in listings:
+            posts = listings[listing_key]
+        else:
+            posts = get_top_posts(reddit_client, subreddit, time_filter=time_filter)
+        
+        # Format posts according to required structure
+        return [
+            format_post(post)
+            for post in posts
+            if post.get('num_comments', 0) >= comment_threshold
+        ]
+    except Exception as e:
+        logging.error(f"Error retrieving posts from r/{subreddit}: {str(e)}")
+        return []
+
+def parse_subreddits(subreddits):
+    """
+    Clean a pipeline's subreddit configuration into a list of names.
+    
+    Args:
+        subreddits (list): Subreddit names or comma-separated strings of names
+        
+    Returns:
+        list: Subreddit names without the r/ prefix
+    """
+    subreddit_list = []
+    for subreddit in subreddits or []:
+        # Handle comma-separated strings or lists
+        if isinstance(subreddit, str):
+            for s in subreddit.split(','):
+                cleaned = s.strip().replace('r/', '')
+                if cleaned:
+                    subreddit_list.append(cleaned)
+        else:
+            cleaned = str(subreddit).strip().replace('r/', '')
+            if cleaned:
+                subreddit_list.append(cleaned)
+    return subreddit_list
+
+def _map_concurrently(fn, items, max_workers):
+    """
+    Apply fn to every item with a bounded thread pool, keeping input order.
+    
+    Args:
+        fn (callable): Function to apply
+        items (list): Items to process
+        max_workers (int, optional): Maximum concurrent calls
+            (defaults to config.REDDIT_FETCH_MAX_WORKERS, 1 runs sequentially)
+        
+    Returns:
+        list: Results in the order of items
+    """
+    if max_workers is None:
+        max_workers = config.REDDIT_FETCH_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(items)))
+    
+    if max_workers == 1:
+        return [fn(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fn, items))
+
+def fetch_listings(listing_requests, max_workers=None):
+    """
+    Fetch each unique subreddit listing once.
+    
+    Used by the scheduler to fetch the union of the subreddits of every due
+    pipeline up front and fan the listings out to the pipelines.
+    
+    Args:
+        listing_requests (iterable): (subreddit, time_filter) pairs, duplicates allowed
+        max_workers (int, optional): Maximum concurrent subreddit fetches
+        
+    Returns:
+        dict: Raw posts keyed by (lowercased subreddit, time_filter). Listings
+            that failed to fetch are left out so pipelines retry them.
+    """
+    unique_requests = {}
+    for subreddit, time_filter in listing_requests:
+        unique_requests.setdefault((subreddit.lower(), time_filter), subreddit)
+    
+    if not unique_requests:
+        return {}
+    
+    reddit_client = get_reddit_client()
+    keys = list(unique_requests.keys())
+    
+    def fetch(key):
+        subreddit, time_filter = unique_requests[key], key[1]
+        return get_top_posts(reddit_client, subreddit, time_filter=time_filter)
+    
+    results = _map_concurrently(fetch, keys, max_workers)
+    
+    listings = {key: posts for key, posts in zip(keys, results) if posts}
+    logging.info(f"Fetched {len(listings)}/{len(keys)} unique subreddit listings")
+    return listings
+
+def retrieve_reddit_posts(subreddits, schedule, comment_threshold=10, max_workers=None, listings=None,
+                          collapse_duplicates=None):
     """
     Retrieve top posts from specified subreddits.
     
+    Subreddit listings are fetched concurrently. Every RedditClient shares the
+    process-wide rate limiter, so the quota still applies across the whole fetch.
+    
+    Cross-posts and near-identical posts are collapsed into the best scoring
+    one, which carries their merged score and num_comments and lists the
+    collapsed posts in duplicate_post_ids (see near_duplicates.py).
+    
     Args:
         subreddits (list): List of subreddit names
         schedule (str): The schedule type ('daily', 'weekly', or 'monthly')
         comment_threshold (int): Minimum number of comments required
+        max_workers (int, optional): Maximum concurrent subreddit fetches
+            (defaults to config.REDDIT_FETCH_MAX_WORKERS, 1 fetches sequentially)
+        listings (dict, optional): Prefetched listings from fetch_listings();
+            subreddits missing from it are fetched as usual
+        collapse_duplicates (bool, optional): Collapse near-duplicate posts
+            (defaults to config.COLLAPSE_NEAR_DUPLICATES)
         
     Returns:
-        list: List of post data
+        list: List of post data, in the order of the given subreddits
     """
     try:
         # Initialize Reddit client
-        auth = RedditAuth(
-            client_id=config.REDDIT_CLIENT_ID,
-            client_secret=config.REDDIT_CLIENT_SECRET,
-            user_agent=config.REDDIT_USER_AGENT
-        )
-        reddit_client = RedditClient(auth)
+        reddit_client = get_reddit_client()
         
         # Clean and prepare subreddit list
-        subreddit_list = []
-        for subreddit in subreddits:
-            # Handle comma-separated strings or lists
-            if isinstance(subreddit, str):
-                for s in subreddit.split(','):
-                    cleaned = s.strip().replace('r/', '')
-                    if cleaned:
-                        subreddit_list.append(cleaned)
-            else:
-                cleaned = str(subreddit).strip().replace('r/', '')
-                if cleaned:
-                    subreddit_list.append(cleaned)
+        subreddit_list = parse_subreddits(subreddits)
         
         if not subreddit_list:
             logging.warning("No valid subreddits provided")
@@ -110,29 +302,29 @@ def retrieve_reddit_posts(subreddits, schedule, comment_threshold=10):
         time_filter = get_time_filter(schedule)
         
         # Retrieve posts from each subreddit
+        results = _map_concurrently(
+            lambda subreddit: get_subreddit_posts(
+                reddit_client, subreddit, time_filter, comment_threshold, listings=listings
+            ),
+            subreddit_list,
+            max_workers
+        )
+        
         all_posts = []
-        for subreddit in subreddit_list:
-            try:
-                posts = get_top_posts(reddit_client, subreddit, time_filter=time_filter)
-
-                if posts:
-                    # Format posts according to required structure
-                    for post in posts:
-                        if post.get('num_comments', 0) >= comment_threshold:
-                            formatted_post = {
-                                "subreddit": post.get('subreddit', ''),
-                                "score": post.get('score', 0),
-                                "subreddit_id": post.get('subreddit_id', ''),
-                                "num_comments": post.get('num_comments', 0),
-                                "permalink": post.get('permalink', ''),
-                                "created_utc": post.get('created_utc', 0),
-                                "post_id": post.get('name', ''),  # 'name' field contains the post ID (e.g., t3_1jb1eez)
-                                "post_content": f"{post.get('title', '')}\n{post.get('selftext', '')}"
-                            }
-                        all_posts.append(formatted_post)
-            except Exception as e:
-                logging.error(f"Error retrieving posts from r/{subreddit}: {str(e)}")
-                continue
+        for posts in results:
+            all_posts.extend(posts)
+        
+        if collapse_duplicates is None:
+            collapse_duplicates = config.COLLAPSE_NEAR_DUPLICATES
+        if collapse_duplicates:
+            post_count = len(all_posts)
+            all_posts = collapse_near_duplicates(
+                all_posts,
+                max_distance=config.NEAR_DUPLICATE_MAX_DISTANCE,
+                min_words=config.NEAR_DUPLICATE_MIN_WORDS
+            )
+            if len(all_posts) < post_count:
+                logging.info(f"Collapsed {post_count - len(all_posts)} near-duplicate posts")
         
         return all_posts
     except Exception as e:
@@ -0,0 +1,247 @@
+"""
+Small dependency-graph engine for running pipeline stages.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class StageError(Exception):
+    """
+    Raised by a stage to stop the run with an expected outcome, such as no
+    posts being retrieved. Never retried, and reported as 'stopped' rather
+    than 'failed'.
+    """
+
+class StageTimeout(Exception):
+    """Raised when a stage attempt exceeds its timeout."""
+
+class Stage:
+    """
+    A pipeline stage that declares the values it reads and produces.
+
+    The stage function is called with its inputs as keyword arguments and
+    returns a dict with its outputs (or a single value if it has exactly one
+    output).
+
+    Retries only follow errors the stage raised, so they suit stages that are
+    safe to run twice. An attempt that times out is abandoned but may still
+    be running and have side effects, so it is never retried.
+    """
+
+    def __init__(self, name, fn, inputs=(), outputs=(), timeout=None, retries=0, retry_delay=1.0):
+        """
+        Initialize the stage.
+
+        Args:
+            name (str): Unique stage name, also its checkpoint key
+            fn (callable): Stage function
+            inputs (tuple): Names of the values the stage reads
+            outputs (tuple): Names of the values the stage produces
+            timeout (float, optional): Seconds an attempt may take
+            retries (int): Extra attempts after a failure (not after a timeout)
+            retry_delay (float): Seconds before the first retry, doubled on every further retry
+        """
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+def _call_with_timeout(fn, kwargs, timeout):
+    """
+    Call a function, giving up after timeout seconds.
+
+    The call runs on a daemon thread; a timed-out call is abandoned, not
+    interrupted, so stages should bound their own network calls as well.
+    """
+    if timeout is None:
+        return fn(**kwargs)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['value'] = fn(**kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise StageTimeout(f"timed out after {timeout}s")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('value')
+
+class StageGraph:
+    """
+    Runs stages as soon as their inputs are available.
+
+    Independent stages run concurrently. Each stage has its own timeout and
+    retries on failure, and its wall time, attempts and status are reported. Completed
+    stages can be checkpointed and restored, so a rerun only runs the stages
+    that did not complete before. An optional deadline bounds the whole run.
+    """
+
+    def __init__(self, stages, max_workers=4):
+        """
+        Initialize the graph.
+
+        Args:
+            stages (list): Stage instances
+            max_workers (int): Maximum stages running at once
+
+        Raises:
+            ValueError: If stage names or outputs are duplicated, or an input
+                is produced by no stage
+        """
+        self.stages = list(stages)
+        self.max_workers = max_workers
+
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate stage names")
+
+        self.producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output {output} is produced by several stages")
+                self.producers[output] = stage.name
+
+    def run(self, initial=None, checkpoint=None, save_checkpoint=None, deadline=None):
+        """
+        Run every stage.
+
+        Args:
+            initial (dict, optional): Values available before any stage runs
+            checkpoint (dict, optional): Outputs of stages completed by an
+                earlier run, keyed by stage name; those stages are not run again
+            save_checkpoint (callable, optional): Called with the stage name
+                and its outputs after each stage completes
+            deadline (float, optional): Epoch seconds by which the run ends.
+                Stage attempts are cut short at the deadline like a timeout,
+                and stages not started by then never start
+
+        Returns:
+            dict: With keys:
+                - success (bool): Whether every stage completed
+                - values (dict): Every value produced
+                - timings (dict): Seconds, attempts and status of each stage
+                - failed_stage (str): Name of the stage that stopped the run, if any
+                - error (str): Why it stopped, if it did
+                - stopped (bool): Whether a stage stopped it with StageError
+        """
+        values = dict(initial or {})
+        checkpoint = checkpoint or {}
+        timings = {}
+        pending = {stage.name: stage for stage in self.stages}
+
+        for name in [name for name, stage in pending.items() if name in checkpoint]:
+            values.update(checkpoint[name])
+            timings[name] = {'seconds': 0.0, 'attempts': 0, 'status': 'resumed'}
+            del pending[name]
+
+        for stage in pending.values():
+            missing = [name for name in stage.inputs if name not in values and name not in self.producers]
+            if missing:
+                raise ValueError(f"Stage {stage.name} needs {', '.join(missing)}, which no stage produces")
+
+        failure = None
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as executor:
+            while pending or running:
+                if failure is None:
+                    for name, stage in list(pending.items()):
+                        if all(value in values for value in stage.inputs):
+                            if deadline is not None and time.time() >= deadline:
+                                failure = (name, "Run deadline reached", False)
+                                break
+                            kwargs = {value: values[value] for value in stage.inputs}
+                            running[executor.submit(self._run_stage, stage, kwargs, deadline)] = stage
+                            del pending[name]
+
+                if not running:
+                    if failure is None and pending:
+                        failure = (next(iter(pending)), "Inputs never became available", False)
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    outputs, timing, error = future.result()
+                    timings[stage.name] = timing
+                    if error is not None:
+                        if failure is None:
+                            failure = (stage.name, error, timing['status'] == 'stopped')
+                        continue
+                    values.update(outputs)
+                    if save_checkpoint is not None and failure is None:
+                        save_checkpoint(stage.name, outputs)
+
+        for name in pending:
+            timings[name] = {'seconds': 0.0, 'attempts': 0, 'status': 'skipped'}
+
+        return {
+            'success': failure is None,
+            'values': values,
+            'timings': timings,
+            'failed_stage': failure[0] if failure else None,
+            'error': failure[1] if failure else None,
+            'stopped': failure[2] if failure else False
+        }
+
+    def _run_stage(self, stage, kwargs, deadline=None):
+        """
+        Run a stage with its timeout and retries, within the run's deadline.
+
+        Returns:
+            tuple: (outputs dict, timing dict, error message or None)
+        """
+        start_time = time.time()
+        attempts = 0
+        error = None
+        stopped = False
+        while True:
+            attempts += 1
+            timeout = stage.timeout
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    error = "Run deadline reached"
+                    break
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                result = _call_with_timeout(stage.fn, kwargs, timeout)
+                outputs = result if len(stage.outputs) != 1 else {stage.outputs[0]: result}
+                outputs = {name: outputs[name] for name in stage.outputs} if stage.outputs else {}
+                error = None
+                break
+            except StageError as e:
+                error = str(e)
+                stopped = True
+                break
+            except StageTimeout as e:
+                # The abandoned attempt may still be running; a retry would race it
+                error = f"{type(e).__name__}: {str(e)}" if timeout == stage.timeout else "Run deadline reached"
+                logging.error(f"Stage {stage.name} {error}, not retrying")
+                break
+            except Exception as e:
+                error = str(e)
+                logging.error(f"Stage {stage.name} failed (attempt {attempts}/{stage.retries + 1}): {error}")
+                delay = stage.retry_delay * 2 ** (attempts - 1)
+                if attempts > stage.retries or (deadline is not None and time.time() + delay >= deadline):
+                    break
+                time.sleep(delay)
+
+        timing = {
+            'seconds': round(time.time() - start_time, 3),
+            'attempts': attempts,
+            'status': 'stopped' if stopped else 'failed' if error is not None else 'completed'
+        }
+        logging.info(f"Stage {stage.name} {timing['status']} in {timing['seconds']}s")
+        return ({} if error is not None else outputs), timing, error
@@ -70,7 +70,15 @@ def test_pipeline(pipeline_id):
 
         # Step 2: Process posts for post_selector
         print("\nStep 2: Processing posts for post_selector...")
-        post_data = [{'post_id': post['post_id'], 'post_content': post['post_content']} for post in posts]
+        post_data = [
+            {
+                'post_id': post['post_id'],
+                'post_content': post['post_content'],
+                'score': post.get('score', 0),
+                'num_comments': post.get('num_comments', 0)
+            }
+            for post in posts
+        ]
         
         # Step 3: Run post selector with aggregate_posts
         print("\nStep 3: Running post selector...")
@@ -0,0 +1,11 @@
+"""
+Shared test setup: makes the service modules importable the way app.py does.
+"""
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level modules (stage_graph, time_utils, ...) and run_pipeline.* packages
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.dirname(SERVICE_DIR))
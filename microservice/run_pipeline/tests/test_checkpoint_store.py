@@ -0,0 +1,97 @@
+"""
+Tests for the stage checkpoint store.
+"""
+import time
+
+from checkpoint_store import CheckpointStore
+from stage_graph import Stage, StageGraph, StageError
+
+def make_store(tmp_path, ttl_seconds=3600):
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=ttl_seconds)
+
+def test_loads_saved_stage_outputs(tmp_path):
+    store = make_store(tmp_path)
+
+    store.save('pipeline', 3, 'collect_posts', {'posts': [{'post_id': 't3_a'}]})
+    store.save('pipeline', 3, 'issue', {'read_id': 42})
+
+    assert store.load('pipeline', 3) == {
+        'collect_posts': {'posts': [{'post_id': 't3_a'}]},
+        'issue': {'read_id': 42}
+    }
+
+def test_other_runs_are_discarded(tmp_path):
+    store = make_store(tmp_path)
+    store.save('pipeline', 3, 'collect_posts', {'posts': []})
+
+    assert store.load('pipeline', 4) == {}
+    assert store.load('pipeline', 3) == {}
+
+def test_pipelines_are_independent(tmp_path):
+    store = make_store(tmp_path)
+    store.save('first', 1, 'collect_posts', {'posts': []})
+    store.save('second', 1, 'collect_posts', {'posts': []})
+
+    store.clear('first')
+
+    assert store.load('first', 1) == {}
+    assert store.load('second', 1) == {'collect_posts': {'posts': []}}
+
+def test_expired_checkpoints_are_ignored(tmp_path, monkeypatch):
+    store = make_store(tmp_path, ttl_seconds=60)
+    store.save('pipeline', 1, 'collect_posts', {'posts': []})
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+
+    assert store.load('pipeline', 1) == {}
+
+def test_unserializable_output_is_not_saved(tmp_path):
+    store = make_store(tmp_path)
+
+    assert not store.save('pipeline', 1, 'collect_posts', {'posts': object()})
+    assert store.load('pipeline', 1) == {}
+
+def test_clear_keeps_listed_stages(tmp_path):
+    store = make_store(tmp_path)
+    store.save('pipeline', 1, 'reddit_posts', {'reddit_posts': []})
+    store.save('pipeline', 1, 'issue', {'read_id': 42})
+
+    store.clear('pipeline', keep=('issue',))
+
+    assert store.load('pipeline', 1) == {'issue': {'read_id': 42}}
+
+def test_run_stopped_on_empty_retrieval_retrieves_again(tmp_path):
+    store = make_store(tmp_path)
+    calls = []
+
+    def retrieve():
+        calls.append('retrieve')
+        # Retrieval reports an outage on the first call as no posts
+        return ['post'] if len(calls) > 1 else []
+
+    def collect(reddit_posts):
+        if not reddit_posts:
+            raise StageError('No posts retrieved')
+        return reddit_posts
+
+    def run_once():
+        graph = StageGraph([
+            Stage('reddit_posts', retrieve, outputs=('reddit_posts',)),
+            Stage('collect_posts', collect, inputs=('reddit_posts',), outputs=('posts',)),
+        ])
+        run = graph.run(
+            checkpoint=store.load('pipeline', 1),
+            save_checkpoint=lambda stage, outputs: store.save('pipeline', 1, stage, outputs)
+        )
+        # As execute_pipeline does when a stage stops the run
+        if run['stopped']:
+            store.clear('pipeline', keep=('issue',))
+        return run
+
+    assert not run_once()['success']
+    run = run_once()
+
+    assert run['success']
+    assert run['values']['posts'] == ['post']
+    assert calls == ['retrieve', 'retrieve']
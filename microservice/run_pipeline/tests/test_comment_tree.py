@@ -0,0 +1,58 @@
+"""
+Tests for comment tree pruning and rendering.
+"""
+import pytest
+
+pytest.importorskip("requests")
+
+from run_pipeline.reddit_pipeline.reddit_api.comment_tree import CommentTree
+
+COMMENTS = [
+    {'id': 'a', 'score': 50, 'depth': 0, 'body': 'Top   comment'},
+    {'id': 'a1', 'score': 20, 'depth': 1, 'body': 'Good reply'},
+    {'id': 'a1x', 'score': 15, 'depth': 2, 'body': 'Deep reply'},
+    {'id': 'a2', 'score': 2, 'depth': 1, 'body': 'Weak reply'},
+    {'id': 'b', 'score': 30, 'depth': 0, 'body': 'Second comment'},
+    {'id': 'b1', 'score': 40, 'depth': 1, 'body': 'Popular reply'},
+    {'id': 'c', 'score': -5, 'depth': 0, 'body': 'Downvoted'},
+]
+
+def test_builds_parents_from_depth():
+    tree = CommentTree.from_comments(COMMENTS)
+
+    assert tree.parents == [-1, 0, 1, 0, -1, 4, -1]
+    assert tree.bodies[0] == 'Top comment'
+
+def test_reply_to_deleted_comment_attaches_to_nearest_ancestor():
+    tree = CommentTree.from_comments([
+        {'id': 'a', 'score': 1, 'depth': 0, 'body': 'Top'},
+        {'id': 'a1x', 'score': 1, 'depth': 2, 'body': 'Orphan'},
+    ])
+
+    assert tree.parents == [-1, 0]
+    assert tree.depths == [0, 1]
+
+def test_prune_by_score_and_depth():
+    pruned = CommentTree.from_comments(COMMENTS).prune(min_score=10, max_depth=2)
+
+    assert pruned.ids == ['a', 'a1', 'b', 'b1']
+    assert pruned.parents == [-1, 0, -1, 2]
+
+def test_prune_keeps_top_k_children():
+    pruned = CommentTree.from_comments(COMMENTS).prune(top_k_children=1)
+
+    assert pruned.ids == ['a', 'a1', 'a1x']
+
+def test_char_budget_is_spent_best_first():
+    tree = CommentTree.from_comments(COMMENTS)
+    budget = sum(tree.line_length(i) for i in (0, 4, 5))
+
+    pruned = tree.prune(char_budget=budget)
+
+    assert pruned.ids == ['a', 'b', 'b1']
+    assert len(pruned.to_text()) + 1 <= budget
+
+def test_to_text_indents_by_depth():
+    tree = CommentTree.from_comments(COMMENTS[:3])
+
+    assert tree.to_text() == "[50] Top comment\n  [20] Good reply\n    [15] Deep reply"
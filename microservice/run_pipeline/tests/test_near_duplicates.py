@@ -0,0 +1,71 @@
+"""
+Tests for SimHash near-duplicate detection.
+"""
+from near_duplicates import simhash, find_near_duplicates, collapse_near_duplicates
+
+TEXT = "Title: New open source database beats Postgres on write heavy benchmarks\nContent: Results inside"
+CROSS_POST = "Title: New open source database beats Postgres on write heavy benchmarks\nContent: Results inside!"
+OTHER = "Title: Ask HN what is your favourite keyboard layout for programming and why\nContent: Curious"
+
+def post(post_id, content, score, num_comments):
+    return {'post_id': post_id, 'post_content': content, 'score': score, 'num_comments': num_comments}
+
+def test_simhash_is_stable_and_close_for_near_identical_texts():
+    assert simhash(TEXT) == simhash(TEXT)
+    assert bin(simhash(TEXT) ^ simhash(CROSS_POST)).count("1") <= 3
+    assert bin(simhash(TEXT) ^ simhash(OTHER)).count("1") > 3
+
+def test_finds_groups_of_near_duplicates():
+    assert find_near_duplicates([TEXT, OTHER, CROSS_POST]) == [[0, 2]]
+
+def test_short_texts_are_never_grouped():
+    assert find_near_duplicates(["Daily thread", "Daily thread"]) == []
+
+def test_collapse_keeps_best_post_with_summed_stats():
+    posts = [
+        post('t3_a', TEXT, 10, 2),
+        post('t3_b', OTHER, 5, 5),
+        post('t3_c', CROSS_POST, 100, 40),
+    ]
+
+    collapsed = collapse_near_duplicates(posts)
+
+    assert [p['post_id'] for p in collapsed] == ['t3_c', 't3_b']
+    assert collapsed[0]['score'] == 110
+    assert collapsed[0]['num_comments'] == 42
+    assert collapsed[0]['duplicate_post_ids'] == ['t3_a']
+
+def test_collapse_returns_posts_unchanged_without_duplicates():
+    posts = [post('t3_a', TEXT, 1, 1), post('t3_b', OTHER, 1, 1)]
+
+    assert collapse_near_duplicates(posts) is posts
+
+def test_groups_short_link_posts_with_the_same_title():
+    texts = ["Rust 2.0 announced\n", "Rust 2.0 announced\n", "Rust 2.0 announced\nMy thoughts on it"]
+
+    groups = find_near_duplicates(texts, titles=[text.split("\n")[0] for text in texts])
+
+    assert groups == [[0, 1, 2]]
+
+def test_same_short_title_with_different_bodies_is_not_grouped():
+    texts = ["Daily thread\nToday's topic: keyboards", "Daily thread\nToday's topic: monitors"]
+
+    assert find_near_duplicates(texts, titles=["Daily thread", "Daily thread"]) == []
+
+def test_collapses_cross_posts_of_a_link_post():
+    posts = [
+        post('t3_a', "Postgres 18 released\n", 50, 10),
+        post('t3_b', "Postgres 18 released\n", 20, 4),
+    ]
+
+    collapsed = collapse_near_duplicates(posts)
+
+    assert [p['post_id'] for p in collapsed] == ['t3_a']
+    assert collapsed[0]['duplicate_post_ids'] == ['t3_b']
+
+def test_many_copies_form_one_group():
+    texts = [TEXT] * 500 + [OTHER]
+
+    groups = find_near_duplicates(texts)
+
+    assert groups == [list(range(500))]
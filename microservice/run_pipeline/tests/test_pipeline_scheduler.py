@@ -0,0 +1,61 @@
+"""
+Tests for the in-memory pipeline scheduler.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from pipeline_scheduler import PipelineScheduler
+
+def make_pipeline(pipeline_id, minutes_from_now, **fields):
+    next_run_at = datetime.now(timezone.utc) + timedelta(minutes=minutes_from_now)
+    return {'pipeline_id': pipeline_id, 'next_run_at': next_run_at.isoformat(), **fields}
+
+def make_scheduler():
+    return PipelineScheduler(dispatch=lambda pipelines: None, lead_time_minutes=0)
+
+def test_pops_due_pipelines_only():
+    scheduler = make_scheduler()
+    scheduler.load([make_pipeline('due', -1), make_pipeline('later', 60)])
+
+    assert [pipeline['pipeline_id'] for pipeline in scheduler.pop_due()] == ['due']
+    assert scheduler.pop_due() == []
+
+def test_upsert_replaces_entry():
+    scheduler = make_scheduler()
+    scheduler.load([make_pipeline('pipeline', -1)])
+
+    scheduler.upsert(make_pipeline('pipeline', 60))
+
+    assert scheduler.pop_due() == []
+
+def test_load_keeps_retry_delay():
+    scheduler = make_scheduler()
+    scheduler.upsert(make_pipeline('pipeline', -1), not_before=time.time() + 60)
+
+    scheduler.load([make_pipeline('pipeline', -1)])
+
+    assert scheduler.pop_due() == []
+    assert [pipeline['pipeline_id'] for pipeline in scheduler.pop_due(now=time.time() + 61)] == ['pipeline']
+
+def test_load_leaves_skipped_pipelines_alone():
+    scheduler = make_scheduler()
+    # Rescheduled from a fresh config by a run that just finished
+    scheduler.upsert(make_pipeline('ran', 60, delivery_count=2))
+
+    scheduler.load(
+        [make_pipeline('ran', -1, delivery_count=1), make_pipeline('idle', -1)],
+        skip=lambda pipeline_id: pipeline_id == 'ran'
+    )
+
+    assert [pipeline['pipeline_id'] for pipeline in scheduler.pop_due()] == ['idle']
+    due_later = scheduler.pop_due(now=time.time() + 3601)
+    assert [(pipeline['pipeline_id'], pipeline['delivery_count']) for pipeline in due_later] == [('ran', 2)]
+
+def test_load_removes_pipelines_no_longer_listed():
+    scheduler = make_scheduler()
+    scheduler.load([make_pipeline('removed', -1)])
+
+    scheduler.load([])
+
+    assert scheduler.pop_due() == []
+    assert scheduler.next_run_in() is None
@@ -0,0 +1,68 @@
+"""
+Tests for map-reduce post selection.
+"""
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langchain_google_genai")
+
+from run_pipeline.reddit_pipeline.agents import post_selector
+
+def test_merges_groups_with_similar_titles():
+    shard_groups = [
+        [{"title": "Rust async runtimes compared", "related_post_ids": ["t3_a", "t3_b"]}],
+        [
+            {"title": "Comparing Rust async runtimes", "related_post_ids": ["t3_b", "t3_c"]},
+            {"title": "Go generics in practice", "related_post_ids": ["t3_d"]},
+        ],
+    ]
+
+    merged = post_selector.merge_post_groups(shard_groups, similarity=0.5)
+
+    assert merged == [
+        {"title": "Rust async runtimes compared", "related_post_ids": ["t3_a", "t3_b", "t3_c"]},
+        {"title": "Go generics in practice", "related_post_ids": ["t3_d"]},
+    ]
+
+def test_merge_drops_groups_without_posts():
+    assert post_selector.merge_post_groups([[{"title": "Empty", "related_post_ids": []}]]) == []
+
+@pytest.mark.parametrize("mode", ["auto", "single", "chunked"])
+def test_select_without_posts_returns_nothing(mode, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the selector must not be called")
+
+    monkeypatch.setattr(post_selector, "aggregate_posts", fail)
+
+    assert post_selector.select_posts([], "rust", mode=mode) == []
+
+def test_chunked_selection_merges_shards(monkeypatch):
+    posts = [{"post_id": f"t3_{i}", "post_content": "word " * 50} for i in range(4)]
+
+    def aggregate(shard, focus, tone, use_llm_cache):
+        return [{"title": "Rust news", "related_post_ids": [post["post_id"] for post in shard]}]
+
+    monkeypatch.setattr(post_selector, "aggregate_posts", aggregate)
+
+    groups = post_selector.select_posts(posts, "rust", mode="chunked", shard_tokens=120)
+
+    assert groups == [{"title": "Rust news", "related_post_ids": ["t3_0", "t3_1", "t3_2", "t3_3"]}]
+
+def test_chunked_selection_skips_failed_shard(monkeypatch):
+    posts = [{"post_id": f"t3_{i}", "post_content": "word " * 50} for i in range(2)]
+
+    def aggregate(shard, focus, tone, use_llm_cache):
+        if shard[0]["post_id"] == "t3_0":
+            raise RuntimeError("rate limited")
+        return [{"title": "Rust news", "related_post_ids": [post["post_id"] for post in shard]}]
+
+    monkeypatch.setattr(post_selector, "aggregate_posts", aggregate)
+
+    groups = post_selector.select_posts(posts, "rust", mode="chunked", shard_tokens=80)
+
+    assert groups == [{"title": "Rust news", "related_post_ids": ["t3_1"]}]
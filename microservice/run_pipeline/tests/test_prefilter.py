@@ -0,0 +1,55 @@
+"""
+Tests for the BM25 relevance prefilter.
+"""
+from run_pipeline.reddit_pipeline.agents.prefilter import tokenize, bm25_scores, prefilter_posts
+
+def post(post_id, content, score=0, num_comments=0):
+    return {'post_id': post_id, 'post_content': content, 'score': score, 'num_comments': num_comments}
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("The jobs in C++ and C# are here") == ['job', 'c++', 'c#']
+
+def test_tokenize_keeps_short_and_double_s_words():
+    assert tokenize("bus class gas") == ['bus', 'class', 'gas']
+
+def test_bm25_ranks_matching_documents_higher():
+    scores = bm25_scores(
+        ["Rust compiler release notes", "Gardening tips for spring", "Rust and Rust again in Rust"],
+        "rust compiler"
+    )
+
+    assert scores[1] == 0.0
+    assert scores[0] > scores[2] > 0
+
+def test_bm25_without_query_terms_scores_zero():
+    assert bm25_scores(["Rust compiler"], "the and of") == [0.0]
+    assert bm25_scores([], "rust") == []
+
+def test_prefilter_keeps_most_relevant_posts_in_order():
+    posts = [
+        post('t3_a', "Gardening tips for spring"),
+        post('t3_b', "Rust compiler release notes"),
+        post('t3_c', "Cooking pasta at home"),
+        post('t3_d', "Why the Rust borrow checker rejects this"),
+    ]
+
+    kept = prefilter_posts(posts, "rust", top_n=2)
+
+    assert [p['post_id'] for p in kept] == ['t3_b', 't3_d']
+
+def test_prefilter_breaks_ties_by_engagement():
+    posts = [
+        post('t3_a', "Gardening tips", score=1),
+        post('t3_b', "Cooking pasta", score=10, num_comments=5),
+        post('t3_c', "Knitting patterns", score=3),
+    ]
+
+    kept = prefilter_posts(posts, "rust", top_n=1)
+
+    assert [p['post_id'] for p in kept] == ['t3_b']
+
+def test_prefilter_disabled_or_small_batch_returns_posts():
+    posts = [post('t3_a', "Gardening tips")]
+
+    assert prefilter_posts(posts, "rust", top_n=0) is posts
+    assert prefilter_posts(posts, "rust", top_n=5) is posts
@@ -0,0 +1,92 @@
+"""
+Tests for prompt token budgeting and packing.
+"""
+from run_pipeline.reddit_pipeline.agents.prompt_packer import (
+    estimate_tokens,
+    truncate_to_tokens,
+    pack_posts,
+    shard_posts,
+    pack_discussions
+)
+
+def post(post_id, content, score=0, num_comments=0):
+    return {'post_id': post_id, 'post_content': content, 'score': score, 'num_comments': num_comments}
+
+def test_estimate_tokens_uses_larger_estimate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 400) == 101
+    assert estimate_tokens("a b c d e f") == 9
+
+def test_truncate_leaves_short_text_alone():
+    assert truncate_to_tokens("short text", 10) == "short text"
+
+def test_truncate_cuts_at_word_boundary():
+    text = " ".join(["word"] * 200)
+
+    truncated = truncate_to_tokens(text, 20)
+
+    assert truncated.endswith("word...")
+    assert estimate_tokens(truncated[:-3]) <= 20
+
+def test_pack_posts_drops_duplicates_and_keeps_order():
+    posts = [
+        post('t3_a', "Rust 2.0 announced", score=5),
+        post('t3_b', "rust 2.0   ANNOUNCED", score=50),
+        post('t3_c', "Go 2.0 announced", score=1),
+    ]
+
+    packed = pack_posts(posts, token_budget=1000)
+
+    assert [p['post_id'] for p in packed] == ['t3_a', 't3_c']
+    assert set(packed[0]) == {'post_id', 'post_content'}
+
+def test_pack_posts_admits_best_posts_within_budget():
+    posts = [
+        post('t3_a', "word " * 30, score=1),
+        post('t3_b', "wore " * 30, score=100),
+        post('t3_c', "ward " * 30, score=10),
+    ]
+
+    packed = pack_posts(posts, token_budget=100)
+
+    assert [p['post_id'] for p in packed] == ['t3_b', 't3_c']
+
+def test_pack_posts_truncates_long_posts():
+    packed = pack_posts([post('t3_a', "word " * 1000)], token_budget=1000, max_post_tokens=50)
+
+    assert estimate_tokens(packed[0]['post_content']) <= 51
+
+def test_shard_posts_splits_in_order_within_budget():
+    posts = [post(f"t3_{i}", "word " * 30) for i in range(5)]
+
+    shards = shard_posts(posts, shard_tokens=100)
+
+    assert [[p['post_id'] for p in shard] for shard in shards] == [
+        ['t3_0', 't3_1'], ['t3_2', 't3_3'], ['t3_4']
+    ]
+
+def test_shard_posts_keeps_oversized_post_in_own_shard():
+    shards = shard_posts([post('t3_a', "word " * 500), post('t3_b', "word")], shard_tokens=50)
+
+    assert [[p['post_id'] for p in shard] for shard in shards] == [['t3_a'], ['t3_b']]
+
+def test_pack_discussions_keeps_short_and_shares_rest():
+    discussions = [
+        {'title': 'short', 'text': 'a few words', 'permalink': '/r/x/1'},
+        {'title': 'long', 'text': 'word ' * 1000, 'permalink': '/r/x/2'},
+        {'title': 'longer', 'text': 'word ' * 2000, 'permalink': '/r/x/3'},
+    ]
+
+    packed = pack_discussions(discussions, token_budget=400)
+
+    assert packed[0] == discussions[0]
+    long_tokens = [estimate_tokens(d['text']) for d in packed[1:]]
+    assert all(tokens < 200 for tokens in long_tokens)
+    assert abs(long_tokens[0] - long_tokens[1]) <= 5
+    assert [d['permalink'] for d in packed] == ['/r/x/1', '/r/x/2', '/r/x/3']
+
+def test_pack_discussions_leaves_fitting_discussions_alone():
+    discussions = [{'title': 't', 'text': 'some text', 'permalink': '/r/x/1'}]
+
+    assert pack_discussions(discussions, token_budget=1000) == discussions
+    assert pack_discussions([], token_budget=1000) == []
@@ -0,0 +1,224 @@
+"""
+Tests for the stage graph engine.
+"""
+import threading
+import time
+
+import pytest
+
+from stage_graph import Stage, StageGraph, StageError
+
+def test_runs_stages_in_dependency_order():
+    graph = StageGraph([
+        Stage('double', lambda number: number * 2, inputs=('number',), outputs=('doubled',)),
+        Stage('report', lambda doubled, number: {'total': doubled + number, 'label': f"{number}x3"},
+              inputs=('doubled', 'number'), outputs=('total', 'label')),
+    ])
+
+    run = graph.run({'number': 4})
+
+    assert run['success']
+    assert run['values']['total'] == 12
+    assert run['values']['label'] == '4x3'
+    assert run['timings']['double']['status'] == 'completed'
+    assert run['timings']['report']['attempts'] == 1
+
+def test_runs_independent_stages_concurrently():
+    both_started = threading.Barrier(2, timeout=2)
+
+    def wait_for_other():
+        both_started.wait()
+        return True
+
+    graph = StageGraph([
+        Stage('left', wait_for_other, outputs=('left',)),
+        Stage('right', wait_for_other, outputs=('right',)),
+    ], max_workers=2)
+
+    run = graph.run()
+
+    assert run['success']
+
+def test_retries_failed_stage():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError('temporary failure')
+        return 'done'
+
+    graph = StageGraph([Stage('flaky', flaky, outputs=('result',), retries=2, retry_delay=0.01)])
+
+    run = graph.run()
+
+    assert run['success']
+    assert run['values']['result'] == 'done'
+    assert run['timings']['flaky']['attempts'] == 3
+
+def test_fails_after_last_retry_and_skips_dependents():
+    def broken():
+        raise RuntimeError('Failed to save content')
+
+    graph = StageGraph([
+        Stage('save', broken, outputs=('saved',), retries=1, retry_delay=0.01),
+        Stage('notify', lambda saved: True, inputs=('saved',), outputs=('notified',)),
+    ])
+
+    run = graph.run()
+
+    assert not run['success']
+    assert run['failed_stage'] == 'save'
+    assert run['error'] == 'Failed to save content'
+    assert run['timings']['save']['attempts'] == 2
+    assert run['timings']['save']['status'] == 'failed'
+    assert run['timings']['notify']['status'] == 'skipped'
+
+def test_stage_error_is_not_retried():
+    calls = []
+
+    def no_posts():
+        calls.append(1)
+        raise StageError('No posts retrieved')
+
+    graph = StageGraph([Stage('collect', no_posts, outputs=('posts',), retries=3, retry_delay=0.01)])
+
+    run = graph.run()
+
+    assert not run['success']
+    assert run['error'] == 'No posts retrieved'
+    assert len(calls) == 1
+
+def test_times_out_slow_stage():
+    graph = StageGraph([Stage('slow', lambda: time.sleep(1), outputs=('slow',), timeout=0.05)])
+
+    start_time = time.time()
+    run = graph.run()
+
+    assert time.time() - start_time < 0.5
+    assert not run['success']
+    assert run['failed_stage'] == 'slow'
+    assert 'timed out' in run['error']
+
+def test_resumes_from_checkpoint():
+    calls = []
+    saved = {}
+
+    def retrieve():
+        calls.append('retrieve')
+        return ['post']
+
+    def select(posts):
+        calls.append('select')
+        return posts[:1]
+
+    graph = StageGraph([
+        Stage('retrieve', retrieve, outputs=('posts',)),
+        Stage('select', select, inputs=('posts',), outputs=('selected',)),
+    ])
+
+    run = graph.run(
+        checkpoint={'retrieve': {'posts': ['checkpointed post']}},
+        save_checkpoint=lambda stage, outputs: saved.update({stage: outputs})
+    )
+
+    assert run['success']
+    assert calls == ['select']
+    assert run['values']['selected'] == ['checkpointed post']
+    assert run['timings']['retrieve']['status'] == 'resumed'
+    assert saved == {'select': {'selected': ['checkpointed post']}}
+
+def test_does_not_checkpoint_failed_stage():
+    saved = {}
+
+    def broken(posts):
+        raise RuntimeError('boom')
+
+    graph = StageGraph([
+        Stage('retrieve', lambda: ['post'], outputs=('posts',)),
+        Stage('select', broken, inputs=('posts',), outputs=('selected',)),
+    ])
+
+    graph.run(save_checkpoint=lambda stage, outputs: saved.update({stage: outputs}))
+
+    assert list(saved) == ['retrieve']
+
+def test_rejects_duplicate_outputs():
+    with pytest.raises(ValueError):
+        StageGraph([
+            Stage('first', lambda: 1, outputs=('value',)),
+            Stage('second', lambda: 2, outputs=('value',)),
+        ])
+
+def test_rejects_inputs_no_stage_produces():
+    graph = StageGraph([Stage('select', lambda posts: posts, inputs=('posts',), outputs=('selected',))])
+
+    with pytest.raises(ValueError):
+        graph.run()
+
+def test_stage_error_is_reported_as_stopped():
+    def no_posts():
+        raise StageError('No posts retrieved')
+
+    graph = StageGraph([Stage('collect', no_posts, outputs=('posts',))])
+
+    run = graph.run()
+
+    assert run['stopped']
+    assert run['timings']['collect']['status'] == 'stopped'
+
+def test_failure_is_not_reported_as_stopped():
+    def broken():
+        raise RuntimeError('boom')
+
+    run = StageGraph([Stage('save', broken, outputs=('saved',))]).run()
+
+    assert not run['stopped']
+    assert run['timings']['save']['status'] == 'failed'
+
+def test_timed_out_stage_is_not_retried():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.5)
+
+    graph = StageGraph([Stage('save', slow, outputs=('saved',), timeout=0.05, retries=2, retry_delay=0.01)])
+
+    run = graph.run()
+
+    assert not run['success']
+    assert run['timings']['save']['attempts'] == 1
+    assert len(calls) == 1
+
+def test_deadline_cuts_run_short():
+    calls = []
+
+    def slow():
+        time.sleep(1)
+
+    graph = StageGraph([
+        Stage('write', slow, outputs=('content',), timeout=5),
+        Stage('save', lambda content: calls.append(content), inputs=('content',), outputs=('saved',)),
+    ])
+
+    start_time = time.time()
+    run = graph.run(deadline=time.time() + 0.1)
+
+    assert time.time() - start_time < 0.5
+    assert not run['success']
+    assert run['failed_stage'] == 'write'
+    assert run['error'] == 'Run deadline reached'
+    assert run['timings']['save']['status'] == 'skipped'
+    assert calls == []
+
+def test_no_stage_starts_after_deadline():
+    calls = []
+
+    graph = StageGraph([Stage('retrieve', lambda: calls.append(1), outputs=('posts',))])
+
+    run = graph.run(deadline=time.time() - 1)
+
+    assert not run['success']
+    assert run['error'] == 'Run deadline reached'
+    assert calls == []
@@ -0,0 +1,145 @@
+"""
+Tests for structured output parsing, JSON repair and fragment re-asks.
+"""
+import json
+from typing import List
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langchain_google_genai")
+
+from pydantic import BaseModel, Field, ValidationError
+
+from run_pipeline.reddit_pipeline.agents import structured_output
+
+class Item(BaseModel):
+    name: str
+    count: int
+
+class Response(BaseModel):
+    items: List[Item] = Field(min_length=1)
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+class FakeModel:
+    """Answers every re-ask with the next canned response."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[0][1])
+        return FakeResponse(self.responses.pop(0))
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    def install(*responses):
+        model = FakeModel(*responses)
+        monkeypatch.setattr(structured_output, "get_model", lambda *args, **kwargs: model)
+        return model
+    return install
+
+def test_extract_json_strips_fences_and_preamble():
+    text = 'Here you go:\n```json\n{"items": []}\n```\nThanks'
+
+    assert structured_output.extract_json(text).strip() == '{"items": []}'
+    assert structured_output.extract_json('Sure! [1, 2]') == '[1, 2]'
+
+def test_repair_json_drops_trailing_commas():
+    assert json.loads(structured_output.repair_json('{"a": [1, 2,], "b": 3,}')) == {"a": [1, 2], "b": 3}
+
+def test_repair_json_stops_after_top_level_value():
+    assert json.loads(structured_output.repair_json('{"a": 1} and some notes')) == {"a": 1}
+
+def test_repair_json_closes_truncated_output():
+    assert json.loads(structured_output.repair_json('{"a": "unterminated')) == {"a": "unterminated"}
+    assert json.loads(structured_output.repair_json('{"a": [1, 2')) == {"a": [1, 2]}
+
+def test_repair_json_drops_truncated_entry():
+    text = '{"items": [{"name": "a", "count": 1}, {"name": "b", "cou'
+
+    assert json.loads(structured_output.repair_json(text)) == {"items": [{"name": "a", "count": 1}, {"name": "b"}]}
+
+def test_parse_json_rejects_text_without_json():
+    with pytest.raises(ValueError):
+        structured_output.parse_json("I could not find any posts.")
+
+def test_parse_structured_wraps_bare_list(fake_model):
+    model = fake_model()
+
+    result = structured_output.parse_structured('[{"name": "a", "count": 1}]', Response, "gpt-4o-mini")
+
+    assert result.items == [Item(name="a", count=1)]
+    assert model.prompts == []
+
+def test_parse_structured_reasks_only_malformed_item(fake_model):
+    model = fake_model('{"name": "b", "count": 3}')
+    text = '{"items": [{"name": "a", "count": 1}, {"name": "b", "count": "three"}]}'
+
+    result = structured_output.parse_structured(text, Response, "gpt-4o-mini")
+
+    assert result.items == [Item(name="a", count=1), Item(name="b", count=3)]
+    assert len(model.prompts) == 1
+    assert "items.1" in model.prompts[0]
+
+def test_parse_structured_drops_item_lacking_content_without_reasking(fake_model):
+    model = fake_model()
+    text = '{"items": [{"name": "a", "count": 1}, {"count": 2}]}'
+
+    result = structured_output.parse_structured(text, Response, "gpt-4o-mini")
+
+    assert result.items == [Item(name="a", count=1)]
+    assert model.prompts == []
+
+def test_parse_structured_keeps_complete_items_of_truncated_response(fake_model):
+    model = fake_model()
+    text = '{"items": [{"name": "a", "count": 1}, {"name": "b", "cou'
+
+    result = structured_output.parse_structured(text, Response, "gpt-4o-mini")
+
+    assert result.items == [Item(name="a", count=1)]
+    assert model.prompts == []
+
+def test_parse_structured_rejects_missing_required_content(fake_model):
+    model = fake_model()
+
+    with pytest.raises(ValidationError):
+        structured_output.parse_structured('{"items": []}', Response, "gpt-4o-mini")
+    assert model.prompts == []
+
+def test_parse_structured_drops_item_that_stays_invalid(fake_model):
+    fake_model("not json at all")
+    text = '{"items": [{"name": "a", "count": 1}, {"name": "b", "count": "three"}]}'
+
+    result = structured_output.parse_structured(text, Response, "gpt-4o-mini", max_reasks=2)
+
+    assert result.items == [Item(name="a", count=1)]
+
+def test_reask_discards_rejected_fragment_response(fake_model, monkeypatch):
+    from run_pipeline.reddit_pipeline.agents import llm_cache
+
+    model = fake_model('not json at all')
+    invoke = model.invoke
+
+    def cached_invoke(messages):
+        # As the LLM cache does when it stores the response
+        llm_cache._record_key("reask")
+        return invoke(messages)
+
+    model.invoke = cached_invoke
+    discarded = []
+    monkeypatch.setattr(structured_output, "discard_llm_cache_entries", discarded.append)
+    text = '{"items": [{"name": "a", "count": 1}, {"name": "b", "count": "three"}]}'
+
+    with llm_cache.record_llm_cache_keys() as keys:
+        result = structured_output.parse_structured(text, Response, "gpt-4o-mini")
+
+    assert result.items == [Item(name="a", count=1)]
+    assert discarded == [["reask"]]
+    assert keys == ["reask"]
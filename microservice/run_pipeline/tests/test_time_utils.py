@@ -0,0 +1,51 @@
+"""
+Tests for schedule computations.
+"""
+from datetime import datetime, timedelta
+
+import pytz
+
+import time_utils
+
+def utc(*args):
+    return pytz.UTC.localize(datetime(*args))
+
+def test_parse_timestamp_handles_z_and_naive_timestamps():
+    assert time_utils.parse_timestamp('2025-03-01T09:00:00Z') == utc(2025, 3, 1, 9)
+    assert time_utils.parse_timestamp('2025-03-01T09:00:00') == utc(2025, 3, 1, 9)
+    assert time_utils.parse_timestamp('2025-03-01T10:00:00+01:00') == utc(2025, 3, 1, 9)
+
+def test_next_run_is_one_interval_after_last_delivery():
+    last_delivered = '2025-03-01T08:40:00+00:00'
+
+    assert time_utils.get_next_run_at('daily', '09:00:00', last_delivered) == utc(2025, 3, 2, 9)
+    assert time_utils.get_next_run_at('weekly', '09:00:00', last_delivered) == utc(2025, 3, 8, 9)
+    assert time_utils.get_next_run_at('monthly', '09:00:00', last_delivered) == utc(2025, 3, 31, 9)
+
+def test_next_run_skips_slot_already_covered_by_early_run():
+    # Delivered at 23:50 for a 00:10 slot: the next day's run would start
+    # (30 minutes ahead) before the last delivery, so it moves a day on
+    next_run_at = time_utils.get_next_run_at('daily', '00:10:00', '2025-03-01T23:50:00+00:00')
+
+    assert next_run_at == utc(2025, 3, 3, 0, 10)
+
+def test_next_run_uses_utc_date_of_last_delivery():
+    next_run_at = time_utils.get_next_run_at('daily', '09:00:00', '2025-03-01T23:30:00-05:00')
+
+    assert next_run_at == utc(2025, 3, 3, 9)
+
+def test_never_delivered_pipeline_is_due_now():
+    next_run_at = time_utils.get_next_run_at('daily', '09:00:00', None)
+
+    assert abs(datetime.now(pytz.UTC) - next_run_at) < timedelta(seconds=5)
+    assert time_utils.is_due(next_run_at)
+
+def test_unknown_schedule_is_never_due():
+    assert time_utils.get_next_run_at('hourly', '09:00:00', '2025-03-01T09:00:00+00:00') is None
+    assert not time_utils.is_due(None)
+
+def test_is_due_within_lead_time():
+    now = datetime.now(pytz.UTC)
+
+    assert time_utils.is_due(now + timedelta(minutes=20), lead_time_minutes=30)
+    assert not time_utils.is_due(now + timedelta(minutes=40), lead_time_minutes=30)
@@ -4,9 +4,36 @@ Utility functions for handling time and schedule-related operations.
 from datetime import datetime, timedelta
 import pytz
 
-def should_run_pipeline(schedule, delivery_time, last_delivered, lead_time_minutes=30):
+# Minimum time between deliveries for each schedule type
+SCHEDULE_INTERVALS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+    'monthly': timedelta(days=30),
+}
+
+def parse_timestamp(timestamp):
     """
-    Determine if a pipeline should be run based on its schedule and last delivery time.
+    Parse an ISO format timestamp as returned by Supabase.
+    
+    Args:
+        timestamp (str): ISO format datetime
+        
+    Returns:
+        datetime: Timezone-aware datetime (UTC if no offset was given)
+    """
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = pytz.UTC.localize(parsed)
+    return parsed
+
+def get_next_run_at(schedule, delivery_time, last_delivered, lead_time_minutes=30):
+    """
+    Get the next delivery time of a pipeline.
+    
+    The next delivery is at delivery_time on the day one schedule interval
+    (1, 7 or 30 days) after the last delivery. Days are skipped while the run
+    would start before the last delivery, so a pipeline run ahead of its
+    delivery time is not picked up again for the same slot.
     
     Args:
         schedule (str): The schedule type ('daily', 'weekly', or 'monthly')
@@ -15,48 +42,63 @@ def should_run_pipeline(schedule, delivery_time, last_delivered, lead_time_minut
         lead_time_minutes (int): Minutes before delivery time to run the pipeline
         
     Returns:
-        bool: True if the pipeline should be run, False otherwise
+        datetime: Next delivery time in UTC (now if never delivered),
+            or None for an unknown schedule
     """
-    now = datetime.now(pytz.UTC)
-    
-    # Parse delivery time
-    hour, minute, second = map(int, delivery_time.split(':'))
+    interval = SCHEDULE_INTERVALS.get(schedule)
+    if interval is None:
+        return None
     
-    # Calculate target delivery datetime
-    target_date = now.date()
-    target_time = datetime.combine(target_date, datetime.min.time().replace(hour=hour, minute=minute, second=second))
-    target_time = pytz.UTC.localize(target_time)
+    # If never delivered, it is due right away
+    if not last_delivered:
+        return datetime.now(pytz.UTC)
     
-    # Adjust for lead time
-    run_time = target_time - timedelta(minutes=lead_time_minutes)
+    last_delivered_dt = parse_timestamp(last_delivered).astimezone(pytz.UTC)
     
-    # If run_time is in the past for today, it means we're looking at tomorrow's delivery
-    if run_time < now:
-        run_time += timedelta(days=1)
+    # Parse delivery time
+    hour, minute, second = map(int, delivery_time.split(':'))
     
-    # Parse last delivered time
-    if last_delivered:
-        last_delivered_dt = datetime.fromisoformat(last_delivered.replace('Z', '+00:00'))
-    else:
-        # If never delivered, return True to run it
-        return True
+    next_date = last_delivered_dt.date() + interval
+    next_run_at = pytz.UTC.localize(
+        datetime.combine(next_date, datetime.min.time().replace(hour=hour, minute=minute, second=second))
+    )
     
-    # Check if it's time to run based on schedule
-    if schedule == 'daily':
-        # Check if it's been delivered today already
-        return last_delivered_dt.date() < now.date() and now >= run_time
+    lead_time = timedelta(minutes=lead_time_minutes)
+    while next_run_at - lead_time <= last_delivered_dt:
+        next_run_at += timedelta(days=1)
     
-    elif schedule == 'weekly':
-        # Check if it's been a week since last delivery
-        week_ago = now - timedelta(days=7)
-        return last_delivered_dt <= week_ago and now >= run_time
+    return next_run_at
+
+def is_due(next_run_at, lead_time_minutes=30):
+    """
+    Check whether a pipeline with the given next delivery time should start.
     
-    elif schedule == 'monthly':
-        # Check if it's been a month (30 days) since last delivery
-        month_ago = now - timedelta(days=30)
-        return last_delivered_dt <= month_ago and now >= run_time
+    Args:
+        next_run_at (datetime): Next delivery time
+        lead_time_minutes (int): Minutes before delivery time to run the pipeline
+        
+    Returns:
+        bool: True if the pipeline should be run now
+    """
+    if next_run_at is None:
+        return False
+    return datetime.now(pytz.UTC) >= next_run_at - timedelta(minutes=lead_time_minutes)
+
+def should_run_pipeline(schedule, delivery_time, last_delivered, lead_time_minutes=30):
+    """
+    Determine if a pipeline should be run based on its schedule and last delivery time.
     
-    return False
+    Args:
+        schedule (str): The schedule type ('daily', 'weekly', or 'monthly')
+        delivery_time (str): The time of day for delivery (format: 'HH:MM:SS')
+        last_delivered (str): ISO format datetime of last delivery
+        lead_time_minutes (int): Minutes before delivery time to run the pipeline
+        
+    Returns:
+        bool: True if the pipeline should be run, False otherwise
+    """
+    next_run_at = get_next_run_at(schedule, delivery_time, last_delivered, lead_time_minutes)
+    return is_due(next_run_at, lead_time_minutes)
 
 def get_current_utc_timestamp():
     """
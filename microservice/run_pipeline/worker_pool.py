@@ -0,0 +1,166 @@
+"""
+Bounded worker pool for running pipelines concurrently.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class PipelineWorkerPool:
+    """
+    Runs pipeline executions on a bounded thread pool.
+
+    A pipeline that is queued or running is tracked as in flight until its
+    execution actually finishes, so it can never be submitted twice, even
+    after a caller has stopped waiting for it because it timed out.
+    """
+
+    def __init__(self, max_workers):
+        """
+        Initialize the worker pool.
+
+        Args:
+            max_workers (int): Maximum number of pipelines running at once
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline')
+        self._in_flight = {}
+        self._started_at = {}
+        self._finished_at = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pipeline_id, fn, *args, **kwargs):
+        """
+        Submit a pipeline execution unless that pipeline is already in flight.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+            fn (callable): Function executing the pipeline
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            Future: Future for the execution, or None if the pipeline is already in flight
+        """
+        with self._lock:
+            if pipeline_id in self._in_flight:
+                logging.info(f"Pipeline {pipeline_id} is already in flight, not starting it again")
+                return None
+            future = self._executor.submit(self._run, pipeline_id, fn, *args, **kwargs)
+            self._in_flight[pipeline_id] = future
+
+        future.add_done_callback(lambda f: self._release(pipeline_id, f))
+        return future
+
+    def is_in_flight(self, pipeline_id):
+        """
+        Check whether a pipeline is queued or running.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+
+        Returns:
+            bool: True if the pipeline is in flight
+        """
+        with self._lock:
+            return pipeline_id in self._in_flight
+
+    def get_in_flight(self, pipeline_id):
+        """
+        Get the execution of a pipeline that is queued or running.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+
+        Returns:
+            Future: The execution, or None if the pipeline is not in flight
+        """
+        with self._lock:
+            return self._in_flight.get(pipeline_id)
+
+    def last_finished(self, pipeline_id):
+        """
+        Get when the last execution of a pipeline finished.
+
+        Args:
+            pipeline_id (str): The ID of the pipeline
+
+        Returns:
+            float: time.monotonic() value, or None if it never finished
+        """
+        with self._lock:
+            return self._finished_at.get(pipeline_id)
+
+    def in_flight(self):
+        """
+        Get the IDs of all pipelines that are queued or running.
+
+        Returns:
+            list: Pipeline IDs
+        """
+        with self._lock:
+            return list(self._in_flight.keys())
+
+    def wait_for(self, futures, timeout, poll_interval=1.0):
+        """
+        Wait for submitted executions, giving each at most timeout seconds of run time.
+
+        The timeout of a pipeline counts from when it starts running, not
+        from when it was queued.
+
+        Args:
+            futures (dict): Futures keyed by pipeline ID
+            timeout (float): Maximum run time in seconds per pipeline
+            poll_interval (float): Seconds between timeout checks
+
+        Returns:
+            tuple: (dict of results keyed by pipeline ID, list of timed out pipeline IDs).
+                Executions that raised are returned as their exception.
+        """
+        pending = dict(futures)
+        results = {}
+        timed_out = []
+
+        while pending:
+            wait(list(pending.values()), timeout=poll_interval, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for pipeline_id, future in list(pending.items()):
+                if future.done():
+                    try:
+                        results[pipeline_id] = future.result()
+                    except Exception as e:
+                        results[pipeline_id] = e
+                    del pending[pipeline_id]
+                    continue
+
+                with self._lock:
+                    started_at = self._started_at.get(pipeline_id)
+                if started_at is not None and now - started_at > timeout:
+                    logging.error(f"Pipeline {pipeline_id} timed out after {timeout}s, leaving it to finish in the background")
+                    timed_out.append(pipeline_id)
+                    del pending[pipeline_id]
+
+        return results, timed_out
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the pool.
+
+        Args:
+            wait (bool): Whether to wait for running pipelines to finish
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, pipeline_id, fn, *args, **kwargs):
+        """Run a pipeline, recording when it started."""
+        with self._lock:
+            self._started_at[pipeline_id] = time.monotonic()
+        return fn(*args, **kwargs)
+
+    def _release(self, pipeline_id, future):
+        """Mark a pipeline as no longer in flight once its execution is done."""
+        with self._lock:
+            if self._in_flight.get(pipeline_id) is future:
+                del self._in_flight[pipeline_id]
+                self._started_at.pop(pipeline_id, None)
+                self._finished_at[pipeline_id] = time.monotonic()
@@ -10,6 +10,7 @@ import { Pencil, Trash2, Clock, Mail, Globe, RefreshCw } from "lucide-react";
 import { formatDistanceToNow } from "date-fns";
 import { supabase } from "@/lib/supabase";
 import { cn } from "@/lib/utils";
+import { notifyPipelineUpdated } from "@/components/pipeline/utils/api";
 
 export interface PipelineConfig {
   id: string;
@@ -71,6 +72,7 @@ export function PipelineCard({ pipeline, onUpdate }: PipelineCardProps) {
       
       if (error) throw error;
       
+      await notifyPipelineUpdated(pipeline.pipeline_id);
       onUpdate();
     } catch (error) {
       console.error("Error updating pipeline:", error);
@@ -98,6 +100,7 @@ export function PipelineCard({ pipeline, onUpdate }: PipelineCardProps) {
       
       if (error) throw error;
       
+      await notifyPipelineUpdated(pipeline.pipeline_id);
       onUpdate();
     } catch (error) {
       console.error("Error deleting pipeline:", error);
@@ -56,6 +56,7 @@ export function PipelineContentList({ pipelineId }: PipelineContentListProps) {
         .select('id, title, created_at, issue')
         .eq('pipeline_id', pipelineData.pipeline_id)
         .eq('user_id', user.id)
+        .neq('status', 'failed')
         .order('created_at', { ascending: false });
       
       if (readsError) throw new Error(readsError.message);
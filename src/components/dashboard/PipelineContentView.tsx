@@ -4,7 +4,7 @@ import { useState, useEffect, useCallback } from "react";
 import { useAuth } from "@/components/providers/AuthProvider";
 import { supabase } from "@/lib/supabase";
 import { Skeleton } from "@/components/ui/skeleton";
-import { AlertCircle, ArrowLeft, RefreshCw, FileText, Calendar, ExternalLink } from "lucide-react";
+import { AlertCircle, ArrowLeft, RefreshCw, FileText, Calendar, ExternalLink, Loader2 } from "lucide-react";
 import { Alert, AlertDescription, AlertTitle } from "@/components/ui/alert";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -29,8 +29,12 @@ interface PipelineRead {
   user_id: string;
   pipeline_id: string;
   issue: number;
+  status?: "generating" | "complete" | "failed";
 }
 
+// How often to check for new topics while an issue is still being written
+const GENERATING_POLL_INTERVAL_MS = 3000;
+
 interface PipelineContentViewProps {
   pipelineId: string;
   contentId: number;
@@ -90,6 +94,30 @@ export function PipelineContentView({ pipelineId, contentId }: PipelineContentVi
     }
   }, [pipelineId, fetchPipelineData]);
 
+  const isGenerating = pipelineReads?.some((read) => read.status === "generating") ?? false;
+
+  // Topics are published as they are written; pick up new ones until the issue is complete
+  useEffect(() => {
+    if (!user || !isGenerating) return;
+
+    const interval = setInterval(async () => {
+      const { data: readData, error: readError } = await supabase
+        .from('pipeline_reads')
+        .select('*')
+        .eq('id', contentId)
+        .eq('user_id', user.id)
+        .single();
+
+      if (readError) {
+        console.error("Error refreshing pipeline content:", readError);
+        return;
+      }
+      if (readData) setPipelineReads([readData]);
+    }, GENERATING_POLL_INTERVAL_MS);
+
+    return () => clearInterval(interval);
+  }, [user, contentId, isGenerating]);
+
   const handleBack = () => {
     router.push(`/dashboard/content/${pipelineId}`);
   };
@@ -261,11 +289,22 @@ export function PipelineContentView({ pipelineId, contentId }: PipelineContentVi
                       }
                     })}
                   </div>
-                ) : (
+                ) : read.status === "complete" && (
                   <div className="p-6 text-center">
                     <p className="text-muted-foreground">No content items available</p>
                   </div>
                 )}
+                {read.status === "generating" && (
+                  <div className="flex items-center justify-center gap-2 p-6 text-sm text-muted-foreground">
+                    <Loader2 className="h-4 w-4 animate-spin" />
+                    Writing more topics...
+                  </div>
+                )}
+                {read.status === "failed" && (
+                  <div className="p-6 text-center text-sm text-muted-foreground">
+                    This issue could not be finished. It will be completed on the next run.
+                  </div>
+                )}
               </CardContent>
             </Card>
           ))}
@@ -42,6 +42,27 @@ const notifyFirstArticle = async (pipelineId: string) => {
   }
 };
 
+// Base URL of the pipeline service; config change notifications are skipped when unset
+const PIPELINE_SERVICE_URL = process.env.NEXT_PUBLIC_PIPELINE_SERVICE_URL;
+
+/**
+ * Tells the pipeline service that a pipeline was created, changed or deleted,
+ * so it is rescheduled right away instead of at the service's next resync
+ * @param pipelineId The pipeline_id of the pipeline (not its UUID)
+ */
+export const notifyPipelineUpdated = async (pipelineId: string) => {
+  if (!PIPELINE_SERVICE_URL) return;
+  try {
+    await axios.get(`${PIPELINE_SERVICE_URL}/pipeline_updated`, {
+      params: {
+        pipeline_id: pipelineId
+      }
+    });
+  } catch (error) {
+    console.error("Error notifying the pipeline service of the update:", error);
+  }
+};
+
 /**
  * Creates a new pipeline in the database
  * @param userId The user ID
@@ -136,6 +157,8 @@ export const createPipeline = async (
     // If pipeline was created successfully, check if this is the first pipeline (delivery_count = 0)
     // and send webhook notification
     if (result && result.length > 0) {
+      await notifyPipelineUpdated(pipelineId);
+      
       const { data: pipelineData } = await supabase
         .from('pipeline_configs')
         .select('delivery_count')
@@ -239,6 +262,8 @@ export const updatePipeline = async (
     // If pipeline was updated successfully, check if delivery_count is 0
     // and send webhook notification
     if (result && result.length > 0) {
+      await notifyPipelineUpdated(result[0].pipeline_id);
+      
       const { data: pipelineData } = await supabase
         .from('pipeline_configs')
         .select('delivery_count')
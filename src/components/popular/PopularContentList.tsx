@@ -80,6 +80,7 @@ export function PopularContentList({ pipelineId }: PopularContentListProps) {
         .select('id, title, created_at, issue')
         .eq('pipeline_id', pipelineData.pipeline_id)
         .eq('user_id', SYSTEM_USER_ID)
+        .neq('status', 'failed')
         .order('created_at', { ascending: false });
       
       if (readsError) throw new Error(readsError.message);
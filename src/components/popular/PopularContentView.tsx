@@ -86,6 +86,7 @@ export function PopularContentView({ pipelineId, contentId }: PopularContentView
         .select('id, created_at')
         .eq('pipeline_id', pipelineData.pipeline_id)
         .eq('user_id', SYSTEM_USER_ID)
+        .neq('status', 'failed')
         .order('created_at', { ascending: false });
       
       if (allReadsError) throw new Error(allReadsError.message);
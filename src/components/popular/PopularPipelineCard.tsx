@@ -40,6 +40,7 @@ export function PopularPipelineCard({ id, name }: PopularPipelineCardProps) {
           .select('created_at')
           .eq('pipeline_id', pipelineData.pipeline_id)
           .eq('user_id', SYSTEM_USER_ID)
+          .neq('status', 'failed')
           .order('created_at', { ascending: false });
         
         if (contentError || !contentData) return;
@@ -87,6 +87,7 @@ export function ContentList({ pipelineId, isPopular = false, userId, hideBackBut
         .from('pipeline_reads')
         .select('id, title, created_at, issue')
         .eq('pipeline_id', pipeline.pipeline_id)
+        .neq('status', 'failed')
         .order('created_at', { ascending: false });
       
       if (readsError) throw new Error(readsError.message);
@@ -62,6 +62,7 @@ export function ContentView({ pipelineId, contentId, isPopular = false, userId }
         .from('pipeline_reads')
         .select('id, created_at')
         .eq('pipeline_id', pipeline.pipeline_id)
+        .neq('status', 'failed')
         .order('created_at', { ascending: false });
       
       if (allReadsError) throw new Error(allReadsError.message);
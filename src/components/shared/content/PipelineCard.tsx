@@ -63,6 +63,7 @@ export function PipelineCard({ id, name, isPopular = false, userId, isLoading =
           .select('created_at')
           .eq('pipeline_id', pipeline.pipeline_id)
           .eq('user_id', effectiveUserId)
+          .neq('status', 'failed')
           .order('created_at', { ascending: false });
         
         if (contentError || !contentData) return;
@@ -0,0 +1,15 @@
+CREATE OR REPLACE FUNCTION public.reset_pipeline_next_run_at()
+ RETURNS trigger
+ LANGUAGE plpgsql
+AS $function$
+BEGIN
+    -- Clear the cached next run time when the schedule changes so the
+    -- run_pipeline scheduler recomputes it on its next check
+    IF NEW.schedule IS DISTINCT FROM OLD.schedule
+       OR NEW.delivery_time IS DISTINCT FROM OLD.delivery_time THEN
+        NEW.next_run_at := NULL;
+    END IF;
+
+    RETURN NEW;
+END;
+$function$
\ No newline at end of file
@@ -16,6 +16,9 @@ create table public.pipeline_configs (
   source text[] null,
   delivery_count bigint not null default '0'::bigint,
   last_delivered_time time with time zone null,
+  next_run_at timestamp with time zone null,
+  prefilter_top_n integer null,
+  bypass_llm_cache boolean not null default false,
   constraint pipeline_configs_pkey primary key (id),
   constraint pipeline_configs_id_key unique (id),
   constraint pipeline_configs_user_id_pipeline_id_key unique (user_id, pipeline_id),
@@ -29,15 +32,25 @@ create table public.pipeline_configs (
       )
     )
   ),
-  constraint max_three_emails check ((array_length(delivery_email, 1) <= 3))
+  constraint max_three_emails check ((array_length(delivery_email, 1) <= 3)),
+  constraint prefilter_top_n_range check ((prefilter_top_n >= 0))
 ) TABLESPACE pg_default;
 
 create index IF not exists pipeline_configs_user_id_idx on public.pipeline_configs using btree (user_id) TABLESPACE pg_default;
 
+create index IF not exists pipeline_configs_next_run_at_idx on public.pipeline_configs using btree (next_run_at) TABLESPACE pg_default
+where
+  (is_active = true);
+
 create trigger update_pipeline_configs_updated_at BEFORE
 update on pipeline_configs for EACH row
 execute FUNCTION update_updated_at_column ();
 
+create trigger reset_pipeline_next_run_at_trigger BEFORE
+update OF schedule,
+delivery_time on pipeline_configs for EACH row
+execute FUNCTION reset_pipeline_next_run_at ();
+
 create trigger update_pipeline_count_trigger
 after INSERT
 or DELETE
@@ -7,5 +7,7 @@ create table public.pipeline_reads (
   pipeline_id text null,
   issue bigint null default '0'::bigint,
   user_id uuid null,
-  constraint popular_pkey primary key (id)
+  status text not null default 'complete'::text,
+  constraint popular_pkey primary key (id),
+  constraint pipeline_reads_status_check check ((status = any (array['generating'::text, 'complete'::text, 'failed'::text])))
 ) TABLESPACE pg_default;
\ No newline at end of file